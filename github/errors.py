@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-__all__ = ("GitHubError", "BaseHTTPError", "HTTPError", "RatelimitReached", "error_from_request")
+__all__ = (
+    "GitHubError",
+    "BaseHTTPError",
+    "HTTPError",
+    "RatelimitReached",
+    "GraphQLError",
+    "error_from_request",
+)
 
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from .utils import human_readable_time_until
 
@@ -22,16 +29,19 @@ class BaseHTTPError(GitHubError):
 class HTTPError(BaseHTTPError):
     """Raised when an HTTP request doesn't respond with a successful code."""
 
-    def __init__(self, response: ClientResponse, /) -> None:
+    def __init__(self, response: ClientResponse, message: Optional[str] = None, /) -> None:
         self.method = response.method
         self.code = response.status
         self.url = response.url
+        # What GitHub said went wrong, if it did
+        self.message = message
         self._response = response
 
     def __str__(self) -> str:
         return (
             f"An HTTP error with the code {self.code} has occurred while trying to do a"
             f" {self.method} request to the URL {self.url}"
+            + (f": {self.message}" if self.message else "")
         )
 
 
@@ -48,6 +58,24 @@ class RatelimitReached(GitHubError):
         )
 
 
-def error_from_request(request: ClientResponse, /) -> BaseHTTPError:
+class GraphQLError(GitHubError):
+    """Raised when a GraphQL query responds with errors.
+
+    ``errors`` are the error objects GitHub returned, with their 'type',
+    'message' and 'path'.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]], /) -> None:
+        self.errors = errors
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.errors[0].get("type") if self.errors else None
+
+    def __str__(self) -> str:
+        return "; ".join(error.get("message", "Unknown error") for error in self.errors)
+
+
+def error_from_request(request: ClientResponse, message: Optional[str] = None, /) -> BaseHTTPError:
     # TODO: Make specific errors
-    return HTTPError(request)
+    return HTTPError(request, message)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+__all__ = ("ArchiveCache", "TarMember", "iter_tar_members")
+
+import asyncio
+import io
+import os
+import tarfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Literal, NamedTuple, Optional, Union
+
+from ..utils import is_sha
+
+if TYPE_CHECKING:
+    from ..internals import HTTPClient
+
+
+class TarMember(NamedTuple):
+    info: tarfile.TarInfo
+    # None for directories, links and files over the size limit
+    data: Optional[bytes]
+
+
+class _Stopped(Exception):
+    pass
+
+
+class _ChunkReader(io.RawIOBase):
+    # A file for tarfile in the parsing thread, fed with the chunks from the loop
+
+    def __init__(self, chunks: asyncio.Queue, loop: asyncio.AbstractEventLoop, stopped: Any):
+        self._chunks = chunks
+        self._loop = loop
+        self._stopped = stopped
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._buffer:
+            if self._stopped.is_set():
+                raise _Stopped
+
+            chunk = asyncio.run_coroutine_threadsafe(self._chunks.get(), self._loop).result()
+            if chunk is None:
+                return 0
+
+            self._buffer = memoryview(chunk)
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+async def iter_tar_members(
+    chunks: AsyncIterator[bytes],
+    /,
+    *,
+    compression: Literal["gz", "bz2", "xz", ""] = "gz",
+    max_member_size: Optional[int] = 64 * 1024 * 1024,
+    queue_size: int = 16,
+) -> AsyncIterator[TarMember]:
+    """Yields the members of a tar archive while it is being downloaded, without a file.
+
+    ``chunks`` is usually ``HTTPClient.iter_repo_archive(..., archive_format="tarball")``.
+    tarfile parses the stream in a thread, with at most ``queue_size`` chunks and
+    members waiting in between, so memory use doesn't grow with the archive. The
+    content of files bigger than ``max_member_size`` bytes is skipped.
+
+    Zip archives have their index at the end, so they can't be read while
+    downloading, save them with ``HTTPClient.save_repo_archive`` and use zipfile.
+    """
+    loop = asyncio.get_running_loop()
+    chunk_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    member_queue: asyncio.Queue = asyncio.Queue(queue_size)
+    stopped = threading.Event()
+
+    def put(item: Any) -> None:
+        if stopped.is_set():
+            raise _Stopped
+
+        asyncio.run_coroutine_threadsafe(member_queue.put(item), loop).result()
+
+    def parse() -> None:
+        try:
+            with tarfile.open(
+                fileobj=_ChunkReader(chunk_queue, loop, stopped),  # type: ignore
+                mode=f"r|{compression}",
+            ) as archive:
+                for info in archive:
+                    data = None
+
+                    if info.isfile() and (max_member_size is None or info.size <= max_member_size):
+                        data = archive.extractfile(info).read()  # type: ignore
+
+                    put(TarMember(info, data))
+
+            put(None)
+        except _Stopped:
+            pass
+        except BaseException as error:
+            try:
+                put(error)
+            except _Stopped:
+                pass
+
+    async def feed() -> None:
+        async for chunk in chunks:
+            await chunk_queue.put(chunk)
+
+        await chunk_queue.put(None)
+
+    feeder = asyncio.ensure_future(feed())
+    parser = threading.Thread(target=parse, name="github-tar-reader", daemon=True)
+    parser.start()
+
+    try:
+        while True:
+            getting = asyncio.ensure_future(member_queue.get())
+            await asyncio.wait((getting, feeder), return_when=asyncio.FIRST_COMPLETED)
+
+            # A failed download, the parser would wait for more chunks forever
+            if not getting.done():
+                if feeder.exception() is not None:
+                    getting.cancel()
+                    raise feeder.exception()  # type: ignore
+
+                await getting
+
+            if (item := getting.result()) is None:
+                break
+            if isinstance(item, BaseException):
+                raise item
+
+            yield item
+    finally:
+        stopped.set()
+        feeder.cancel()
+
+        # Unblock the thread, wherever it waits
+        while parser.is_alive():
+            while not member_queue.empty():
+                member_queue.get_nowait()
+            if not chunk_queue.full():
+                chunk_queue.put_nowait(None)
+
+            await asyncio.sleep(0.01)
+
+
+class ArchiveCache:
+    """Keeps downloaded repository archives on disk, by commit SHA.
+
+    An archive of a commit never changes, so a ref is resolved to its commit
+    SHA (one small request) and the archive is only downloaded if it isn't
+    already in ``directory``. Archives are written to a temporary file and
+    renamed, so many processes can share the directory.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        /,
+        *,
+        archive_format: Literal["tarball", "zipball"] = "tarball",
+    ) -> None:
+        self.directory = Path(directory)
+        self.archive_format = archive_format
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} directory: {str(self.directory)!r}, archive_format:"
+            f" {self.archive_format!r}>"
+        )
+
+    def path_for(self, owner: str, repo: str, sha: str, /) -> Path:
+        extension = "tar.gz" if self.archive_format == "tarball" else "zip"
+        return self.directory / owner.lower() / repo.lower() / f"{sha}.{extension}"
+
+    async def get(self, http: HTTPClient, /, *, owner: str, repo: str, ref: str = "HEAD") -> Path:
+        """The path of the archive of ``ref``, downloaded first if it isn't cached."""
+        sha = ref if is_sha(ref) else await http.get_commit_sha(owner=owner, repo=repo, ref=ref)
+        path = self.path_for(owner, repo, sha)
+
+        loop = asyncio.get_running_loop()
+
+        if await loop.run_in_executor(None, path.exists):
+            return path
+
+        await loop.run_in_executor(None, lambda: path.parent.mkdir(parents=True, exist_ok=True))
+        partial = path.with_name(f"{path.name}.{os.getpid()}.{id(self)}.part")
+
+        try:
+            await http.save_repo_archive(
+                owner=owner, repo=repo, archive_format=self.archive_format, ref=sha, path=partial
+            )
+            await loop.run_in_executor(None, os.replace, partial, path)
+        finally:
+            if await loop.run_in_executor(None, partial.exists):
+                await loop.run_in_executor(None, partial.unlink)
+
+        return path
+
+    async def iter_members(
+        self, http: HTTPClient, /, *, owner: str, repo: str, ref: str = "HEAD", **kwargs: Any
+    ) -> AsyncIterator[TarMember]:
+        """Yields the tar members of a cached archive, keyword arguments go to iter_tar_members."""
+        if self.archive_format != "tarball":
+            raise ValueError("Only tarballs can be iterated.")
+
+        path = await self.get(http, owner=owner, repo=repo, ref=ref)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            loop = asyncio.get_running_loop()
+            file = await loop.run_in_executor(None, open, path, "rb")
+
+            try:
+                while chunk := await loop.run_in_executor(None, file.read, 64 * 1024):
+                    yield chunk
+            finally:
+                await loop.run_in_executor(None, file.close)
+
+        async for member in iter_tar_members(chunks(), **kwargs):
+            yield member
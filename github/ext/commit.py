@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+__all__ = ("BranchMoved", "commit_files", "commit_tree")
+
+import asyncio
+import logging
+import random
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Union
+
+from ..errors import GitHubError, HTTPError
+from ..objects import File
+from ..utils import gather_or_cancel
+
+if TYPE_CHECKING:
+    from ..internals import HTTPClient
+    from ..types import Author, Committer
+
+log = logging.getLogger("github.commit")
+
+
+def _branch_moved(error: HTTPError, /) -> bool:
+    # The ref update isn't a fast forward anymore, someone pushed in between. Other 422s,
+    # like for a commit that doesn't exist, aren't retried.
+    if error.code == 409:
+        return True
+
+    return error.code == 422 and "not a fast forward" in (error.message or "").lower()
+
+
+class BranchMoved(GitHubError):
+    """Raised when the branch kept moving while committing, for every attempt."""
+
+    def __init__(self, branch: str, attempts: int, /) -> None:
+        self.branch = branch
+        self.attempts = attempts
+
+    def __str__(self) -> str:
+        return f"The branch {self.branch!r} was updated by others {self.attempts} times in a row."
+
+
+async def _missing_paths(
+    http: HTTPClient, /, *, owner: str, repo: str, tree_sha: str, paths: List[str]
+) -> List[str]:
+    # The paths that aren't in a tree, each subtree on the way is only listed once
+    trees: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    async def entries(sha: str) -> Dict[str, Dict[str, Any]]:
+        if sha not in trees:
+            tree = await http.get_tree(owner=owner, repo=repo, tree_sha=sha)
+            trees[sha] = {entry["path"]: entry for entry in tree["tree"]}
+
+        return trees[sha]
+
+    missing = []
+
+    for path in paths:
+        *parents, name = path.split("/")
+        sha = tree_sha
+
+        for parent in parents:
+            if (entry := (await entries(sha)).get(parent)) is None or entry["type"] != "tree":
+                missing.append(path)
+                break
+
+            sha = entry["sha"]
+        else:
+            if name not in await entries(sha):
+                missing.append(path)
+
+    return missing
+
+
+async def commit_files(
+    http: HTTPClient,
+    /,
+    *,
+    owner: str,
+    repo: str,
+    branch: str,
+    message: str,
+    files: Mapping[str, Union[File, str, bytes, None]],
+    mode: str = "100644",
+    author: Optional[Author] = None,
+    committer: Optional[Committer] = None,
+    concurrency: int = 8,
+    max_attempts: int = 5,
+    retry_delay: float = 0.5,
+) -> Dict[str, Any]:
+    """Commits many files to a branch at once, as one commit, and returns the commit.
+
+    ``files`` maps paths to their new content: a File, a str of text or
+    bytes. A path mapped to None is deleted, ValueError is raised if it isn't
+    in the branch. The blobs are uploaded
+    ``concurrency`` at a time, then one tree and one commit on top of the
+    branch are made and the branch is moved to it, so the branch never has
+    some of the files and not others.
+
+    If the branch moved in the meantime, the tree and commit are made again
+    on top of the new head, reusing the blobs, up to ``max_attempts`` times,
+    then BranchMoved is raised. When nothing changes, no commit is made and
+    the head commit is returned.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create_blob(path: str, content: Union[File, str, bytes]) -> Dict[str, Any]:
+        # A str is text here, File would take it as a path if such a file exists
+        if isinstance(content, bytes):
+            content = File(content, filename=path)
+
+        async with semaphore:
+            blob = await http.create_blob(owner=owner, repo=repo, content=content)
+
+        return {"path": path, "mode": mode, "type": "blob", "sha": blob["sha"]}
+
+    tree: List[Dict[str, Any]] = await gather_or_cancel(
+        [create_blob(path, content) for path, content in files.items() if content is not None]
+    )
+    tree.extend(
+        {"path": path, "mode": mode, "type": "blob", "sha": None}
+        for path, content in files.items()
+        if content is None
+    )
+
+    return await commit_tree(
+        http,
+        owner=owner,
+        repo=repo,
+        branch=branch,
+        message=message,
+        tree=tree,
+        author=author,
+        committer=committer,
+        max_attempts=max_attempts,
+        retry_delay=retry_delay,
+    )
+
+
+async def commit_tree(
+    http: HTTPClient,
+    /,
+    *,
+    owner: str,
+    repo: str,
+    branch: str,
+    message: str,
+    tree: List[Dict[str, Any]],
+    author: Optional[Author] = None,
+    committer: Optional[Committer] = None,
+    max_attempts: int = 5,
+    retry_delay: float = 0.5,
+) -> Dict[str, Any]:
+    """Commits tree entries, of blobs that were already uploaded, on top of a branch.
+
+    It is the second half of ``commit_files``, for when the blob SHAs are
+    already known, and retries the same way when the branch moves.
+    """
+    ref = f"heads/{branch}"
+
+    for attempt in range(1, max_attempts + 1):
+        head = (await http.get_ref(owner=owner, repo=repo, ref=ref))["object"]["sha"]
+        head_commit = await http.get_commit_object(owner=owner, repo=repo, commit_sha=head)
+        base_tree = head_commit["tree"]["sha"]
+
+        try:
+            new_tree = await http.create_tree(
+                owner=owner, repo=repo, tree=tree, base_tree=base_tree
+            )
+        except HTTPError as error:
+            deleted = [entry["path"] for entry in tree if entry["sha"] is None]
+
+            # GitHub only says the tree couldn't be made, find out which deletion it was
+            if error.code != 422 or not deleted:
+                raise
+
+            if missing := await _missing_paths(
+                http, owner=owner, repo=repo, tree_sha=base_tree, paths=deleted
+            ):
+                raise ValueError(
+                    f"Can't delete paths that aren't in the branch {branch!r}:"
+                    f" {', '.join(missing)}."
+                ) from error
+
+            raise
+
+        if new_tree["sha"] == base_tree:
+            return head_commit
+
+        commit = await http.create_commit_object(
+            owner=owner,
+            repo=repo,
+            message=message,
+            tree=new_tree["sha"],
+            parents=[head],
+            author=author,
+            committer=committer,
+        )
+
+        try:
+            await http.update_ref(owner=owner, repo=repo, ref=ref, sha=commit["sha"], force=False)
+        except HTTPError as error:
+            if not _branch_moved(error):
+                raise
+
+            log.info(f"The branch {branch!r} moved while committing, attempt {attempt}.")
+
+            if attempt < max_attempts:
+                # With jitter, so racing committers don't retry in lockstep
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        else:
+            return commit
+
+    raise BranchMoved(branch, max_attempts)
@@ -0,0 +1,6 @@
+from .backends import *
+from .queue import *
+from .ratelimit import *
+from .resp import *
+from .runner import *
+from .store import *
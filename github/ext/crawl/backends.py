@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+__all__ = ("QueueBackend", "JobRecord", "SQLiteBackend", "RESPBackend")
+
+import asyncio
+import functools
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, TypeVar
+
+from .resp import RESPConnection
+from .store import _SQLiteFile
+
+T = TypeVar("T")
+
+
+class JobRecord(NamedTuple):
+    key: str
+    payload: str
+    attempts: int
+    checkpoint: Optional[str]
+
+
+class QueueBackend(ABC):
+    """Where a WorkQueue keeps its jobs.
+
+    Jobs are keyed, a key is only ever added once, so finished work isn't
+    queued again. A claimed job is leased with a token until the lease runs
+    out, then any worker can claim it again. Every method that changes a
+    leased job only does so if the token still owns the lease, checked and
+    changed atomically, and returns whether it did. Backends implement every
+    abstract method.
+    """
+
+    @abstractmethod
+    async def add(self, key: str, payload: str, /) -> bool:
+        """Queues a job, False if the key was added before."""
+        ...
+
+    @abstractmethod
+    async def claim(self, *, token: str, lease: float) -> Optional[JobRecord]:
+        """Leases a job that is due, None if there is none."""
+        ...
+
+    @abstractmethod
+    async def renew(
+        self, key: str, /, *, token: str, lease: float, checkpoint: Optional[str] = None
+    ) -> bool:
+        """Extends a lease, and saves the checkpoint if given."""
+        ...
+
+    @abstractmethod
+    async def complete(self, key: str, /, *, token: str) -> bool:
+        """Marks a job done, it is never claimed again."""
+        ...
+
+    @abstractmethod
+    async def retry(self, key: str, /, *, token: str, delay: float, error: str) -> bool:
+        """Releases a job to be claimed again after ``delay`` seconds."""
+        ...
+
+    @abstractmethod
+    async def bury(self, key: str, /, *, token: str, error: str) -> bool:
+        """Gives up on a job, it is kept with its error but never claimed again."""
+        ...
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """How many jobs are 'queued' (including leased ones), 'done' and 'dead'."""
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    available REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    checkpoint TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (state, available);
+"""
+
+
+class SQLiteBackend(_SQLiteFile, QueueBackend):
+    """Keeps the jobs in an SQLite file, for the processes of one machine.
+
+    A queued job is due when its ``available`` time passes, claiming it moves
+    that time to the end of the lease. The file is accessed in the default executor.
+    """
+
+    schema = _SCHEMA
+
+    async def _run(self, function: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(function, *args, **kwargs)
+        )
+
+    def _change(self, key: str, token: str, query: str, *args: Any) -> bool:
+        with self._lock:
+            return (
+                self.connection.execute(
+                    f"UPDATE jobs SET {query} WHERE key = ? AND owner = ? AND state = 'queued'",
+                    (*args, key, token),
+                ).rowcount
+                == 1
+            )
+
+    def _add(self, key: str, payload: str) -> bool:
+        with self._lock:
+            return (
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO jobs (key, payload, available) VALUES (?, ?, ?)",
+                    (key, payload, time.time()),
+                ).rowcount
+                == 1
+            )
+
+    def _claim(self, token: str, lease: float) -> Optional[JobRecord]:
+        with self.transaction() as connection:
+            now = time.time()
+
+            row = connection.execute(
+                "SELECT key, payload, attempts, checkpoint FROM jobs"
+                " WHERE state = 'queued' AND available <= ? ORDER BY available LIMIT 1",
+                (now,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            connection.execute(
+                "UPDATE jobs SET owner = ?, available = ?, attempts = attempts + 1 WHERE key = ?",
+                (token, now + lease, row[0]),
+            )
+
+            return JobRecord(row[0], row[1], row[2] + 1, row[3])
+
+    def _counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict.fromkeys(("queued", "done", "dead"), 0)
+            counts.update(
+                self.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state")
+            )
+            return counts
+
+    async def add(self, key: str, payload: str, /) -> bool:
+        return await self._run(self._add, key, payload)
+
+    async def claim(self, *, token: str, lease: float) -> Optional[JobRecord]:
+        return await self._run(self._claim, token, lease)
+
+    async def renew(
+        self, key: str, /, *, token: str, lease: float, checkpoint: Optional[str] = None
+    ) -> bool:
+        return await self._run(
+            self._change,
+            key,
+            token,
+            "available = ?, checkpoint = COALESCE(?, checkpoint)",
+            time.time() + lease,
+            checkpoint,
+        )
+
+    async def complete(self, key: str, /, *, token: str) -> bool:
+        return await self._run(
+            self._change, key, token, "state = 'done', owner = NULL, checkpoint = NULL"
+        )
+
+    async def retry(self, key: str, /, *, token: str, delay: float, error: str) -> bool:
+        return await self._run(
+            self._change,
+            key,
+            token,
+            "available = ?, owner = NULL, error = ?",
+            time.time() + delay,
+            error,
+        )
+
+    async def bury(self, key: str, /, *, token: str, error: str) -> bool:
+        return await self._run(
+            self._change, key, token, "state = 'dead', owner = NULL, error = ?", error
+        )
+
+    async def counts(self) -> Dict[str, int]:
+        return await self._run(self._counts)
+
+    async def close(self) -> None:
+        super().close()
+
+
+def _only_if(call: str, reply: str, /, *calls: str) -> str:
+    # A script that only makes the calls if the first call replies with ``reply``
+    lines = [f"if redis.call({call}) ~= {reply} then return 0 end"]
+    lines.extend(f"redis.call({call})" for call in calls)
+    lines.append("return 1")
+    return "\n".join(lines)
+
+
+def _guarded(*calls: str) -> str:
+    # Only if the lease in KEYS[1] is held by the token in ARGV[1]
+    return _only_if('"GET", KEYS[1]', "ARGV[1]", *calls)
+
+
+# Only new keys are queued, so a key is never in the queue without its payload
+_ADD_SCRIPT = _only_if(
+    '"SADD", KEYS[1], ARGV[1]',
+    "1",
+    '"HSET", KEYS[2], ARGV[1], ARGV[2]',
+    '"ZADD", KEYS[3], "NX", ARGV[3], ARGV[1]',
+)
+
+
+# ARGV[2] is the key of the job in all of them
+_RENEW = ('"PEXPIRE", KEYS[1], ARGV[3]', '"ZADD", KEYS[2], "XX", ARGV[4], ARGV[2]')
+_RENEW_SCRIPT = _guarded(*_RENEW)
+_SAVE_SCRIPT = _guarded(*_RENEW, '"HSET", KEYS[3], ARGV[2], ARGV[5]')
+_COMPLETE_SCRIPT = _guarded(
+    '"SADD", KEYS[2], ARGV[2]',
+    '"ZREM", KEYS[3], ARGV[2]',
+    '"HDEL", KEYS[4], ARGV[2]',
+    '"HDEL", KEYS[5], ARGV[2]',
+    '"HDEL", KEYS[6], ARGV[2]',
+    '"DEL", KEYS[1]',
+)
+_RETRY_SCRIPT = _guarded(
+    '"HSET", KEYS[2], ARGV[2], ARGV[4]', '"ZADD", KEYS[3], "XX", ARGV[3], ARGV[2]', '"DEL", KEYS[1]'
+)
+_BURY_SCRIPT = _guarded(
+    '"HSET", KEYS[2], ARGV[2], ARGV[3]', '"ZREM", KEYS[3], ARGV[2]', '"DEL", KEYS[1]'
+)
+
+
+class RESPBackend(QueueBackend):
+    """Keeps the jobs in a Redis protocol server, for crawls over many machines.
+
+    The queue is a sorted set of keys by the time they are due, a lease is a
+    ``SET NX PX`` lock per key, so a worker that dies while claiming leaves
+    nothing behind that its lease expiring doesn't fix. Changes to a leased
+    job are short Lua scripts, so the lease can't run out and be claimed by
+    another worker between checking the token and making the change. The
+    server needs scripting (``EVAL``).
+
+    Arguments:
+        connection: The connection to the server.
+        prefix: What the names of the keys used start with.
+    """
+
+    def __init__(self, connection: RESPConnection, /, *, prefix: str = "github:crawl") -> None:
+        self.connection = connection
+        self.prefix = prefix
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} connection: {self.connection!r}, prefix: {self.prefix!r}>"
+        )
+
+    def _name(self, name: str, /) -> str:
+        return f"{self.prefix}:{name}"
+
+    async def _change(
+        self, script: str, key: str, token: str, names: Tuple[str, ...], /, *args: Any
+    ) -> bool:
+        keys = (self._name(f"lease:{key}"), *(self._name(name) for name in names))
+        return bool(
+            await self.connection.execute("EVAL", script, len(keys), *keys, token, key, *args)
+        )
+
+    async def add(self, key: str, payload: str, /) -> bool:
+        keys = (self._name("seen"), self._name("payloads"), self._name("queue"))
+        return bool(
+            await self.connection.execute(
+                "EVAL", _ADD_SCRIPT, len(keys), *keys, key, payload, time.time()
+            )
+        )
+
+    async def claim(self, *, token: str, lease: float) -> Optional[JobRecord]:
+        execute = self.connection.execute
+        now = time.time()
+
+        due = await execute("ZRANGEBYSCORE", self._name("queue"), "-inf", now, "LIMIT", 0, 10)
+
+        for key in due:
+            # Only one worker gets the lock, it expires with the lease
+            if not await execute(
+                "SET", self._name(f"lease:{key}"), token, "NX", "PX", int(lease * 1000)
+            ):
+                continue
+
+            # A worker died between finishing the job and removing it from the queue
+            if await execute("SISMEMBER", self._name("done"), key):
+                await execute("ZREM", self._name("queue"), key)
+                continue
+
+            await execute("ZADD", self._name("queue"), "XX", now + lease, key)
+
+            return JobRecord(
+                key,
+                await execute("HGET", self._name("payloads"), key),
+                await execute("HINCRBY", self._name("attempts"), key, 1),
+                await execute("HGET", self._name("checkpoints"), key),
+            )
+
+        return None
+
+    async def renew(
+        self, key: str, /, *, token: str, lease: float, checkpoint: Optional[str] = None
+    ) -> bool:
+        args = (int(lease * 1000), time.time() + lease)
+
+        if checkpoint is None:
+            return await self._change(_RENEW_SCRIPT, key, token, ("queue",), *args)
+
+        return await self._change(
+            _SAVE_SCRIPT, key, token, ("queue", "checkpoints"), *args, checkpoint
+        )
+
+    async def complete(self, key: str, /, *, token: str) -> bool:
+        return await self._change(
+            _COMPLETE_SCRIPT, key, token, ("done", "queue", "payloads", "attempts", "checkpoints")
+        )
+
+    async def retry(self, key: str, /, *, token: str, delay: float, error: str) -> bool:
+        return await self._change(
+            _RETRY_SCRIPT, key, token, ("errors", "queue"), time.time() + delay, error
+        )
+
+    async def bury(self, key: str, /, *, token: str, error: str) -> bool:
+        return await self._change(_BURY_SCRIPT, key, token, ("dead", "queue"), error)
+
+    async def counts(self) -> Dict[str, int]:
+        execute = self.connection.execute
+
+        return {
+            "queued": await execute("ZCARD", self._name("queue")),
+            "done": await execute("SCARD", self._name("done")),
+            "dead": await execute("HLEN", self._name("dead")),
+        }
+
+    async def close(self) -> None:
+        await self.connection.close()
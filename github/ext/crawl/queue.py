@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+__all__ = ("Job", "LeaseLost", "WorkQueue")
+
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from uuid import uuid4
+
+from ...errors import GitHubError
+
+if TYPE_CHECKING:
+    from ...internals import HTTPClient
+    from .backends import JobRecord, QueueBackend
+
+    Handler = Callable[[HTTPClient, "Job"], Awaitable[Any]]
+
+
+log = logging.getLogger("github.ext.crawl")
+
+
+class LeaseLost(GitHubError):
+    """Raised when a job's lease ran out and another worker might have claimed it."""
+
+    def __init__(self, key: str, /) -> None:
+        self.key = key
+
+    def __str__(self) -> str:
+        return f"The lease of the job {self.key!r} was lost."
+
+
+class Job:
+    """A leased unit of work, like one repository or one page cursor.
+
+    ``checkpoint`` is what the last worker saved with ``save``, so a job
+    that was interrupted can continue where it was left.
+    """
+
+    __slots__ = ("key", "payload", "attempts", "checkpoint", "_queue", "_token")
+
+    def __init__(self, queue: WorkQueue, record: JobRecord, token: str, /) -> None:
+        self.key = record.key
+        self.payload: Any = json.loads(record.payload)
+        self.attempts = record.attempts
+        self.checkpoint: Any = None if record.checkpoint is None else json.loads(record.checkpoint)
+
+        self._queue = queue
+        self._token = token
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} key: {self.key!r}, attempts: {self.attempts}>"
+
+    async def save(self, checkpoint: Any, /) -> None:
+        """Saves a JSON serializable checkpoint and extends the lease."""
+        if not await self._queue.backend.renew(
+            self.key, token=self._token, lease=self._queue.lease, checkpoint=json.dumps(checkpoint)
+        ):
+            raise LeaseLost(self.key)
+
+        self.checkpoint = checkpoint
+
+    async def renew(self) -> None:
+        if not await self._queue.backend.renew(
+            self.key, token=self._token, lease=self._queue.lease
+        ):
+            raise LeaseLost(self.key)
+
+
+class WorkQueue:
+    """A crawl queue that survives crashes, shared by many workers and machines.
+
+    Jobs are leased for ``lease`` seconds and the lease is renewed while they
+    run, so the jobs of a worker that died are claimed again once their lease
+    runs out. Failed jobs are retried with an exponential backoff until they
+    were attempted ``max_attempts`` times. A key is only ever queued once.
+
+    Arguments:
+        backend: Where the jobs are kept, e.g. SQLiteBackend or RESPBackend.
+        lease: How many seconds a worker owns a job without renewing it.
+        max_attempts: How many times a job is attempted before it is buried.
+        retry_delay: How many seconds the first retry waits, doubled for each one after.
+        worker: The name of this worker in the leases, the host name and PID by default.
+    """
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        /,
+        *,
+        lease: float = 60.0,
+        max_attempts: int = 5,
+        retry_delay: float = 5.0,
+        worker: Optional[str] = None,
+    ) -> None:
+        self.backend = backend
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} backend: {self.backend!r}, worker: {self.worker!r}>"
+
+    async def put(self, key: str, payload: Any = None, /) -> bool:
+        """Queues a JSON serializable payload, False if ``key`` was queued before."""
+        return await self.backend.add(key, json.dumps(payload))
+
+    async def put_many(self, jobs: Iterable[Tuple[str, Any]], /) -> int:
+        """Queues (key, payload) pairs, returns how many were new."""
+        added = 0
+
+        for key, payload in jobs:
+            added += await self.put(key, payload)
+
+        return added
+
+    async def claim(self) -> Optional[Job]:
+        token = f"{self.worker}:{uuid4().hex}"
+
+        if (record := await self.backend.claim(token=token, lease=self.lease)) is None:
+            return None
+
+        return Job(self, record, token)
+
+    async def complete(self, job: Job, /) -> None:
+        if not await self.backend.complete(job.key, token=job._token):
+            raise LeaseLost(job.key)
+
+    async def fail(self, job: Job, error: BaseException, /) -> None:
+        """Retries the job later, or buries it if it was attempted too many times."""
+        message = f"{type(error).__name__}: {error}"
+
+        if job.attempts >= self.max_attempts:
+            log.warning(
+                "Giving up on the job %r after %d attempts: %s", job.key, job.attempts, message
+            )
+            done = await self.backend.bury(job.key, token=job._token, error=message)
+        else:
+            delay = self.retry_delay * 2 ** (job.attempts - 1)
+            done = await self.backend.retry(job.key, token=job._token, delay=delay, error=message)
+
+        if not done:
+            raise LeaseLost(job.key)
+
+    async def counts(self) -> Dict[str, int]:
+        return await self.backend.counts()
+
+    async def __keep_leased(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            await job.renew()
+
+    async def __process(self, client: HTTPClient, handler: Handler, job: Job) -> None:
+        # The lease is renewed in the background, a lost lease stops the handler
+        handling = asyncio.ensure_future(handler(client, job))
+        renewing = asyncio.ensure_future(self.__keep_leased(job))
+
+        try:
+            await asyncio.wait((handling, renewing), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            renewing.cancel()
+
+        if not handling.done():
+            handling.cancel()
+            await asyncio.gather(handling, return_exceptions=True)
+
+            # Another worker might have the job now either way, only this job is dropped
+            if isinstance(error := renewing.exception(), LeaseLost):
+                log.warning("Lost the lease of the job %r, dropping it", job.key)
+            else:
+                log.warning(
+                    "Couldn't renew the lease of the job %r, dropping it: %r", job.key, error
+                )
+
+            return
+
+        try:
+            handling.result()
+        except Exception as error:
+            log.exception("The job %r failed", job.key)
+            await self.fail(job, error)
+        else:
+            await self.complete(job)
+
+    async def run(
+        self,
+        client: HTTPClient,
+        handler: Handler,
+        /,
+        *,
+        concurrency: int = 10,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """Runs ``await handler(client, job)`` for jobs until nothing is queued.
+
+        Handlers can queue more jobs, and call ``job.save`` to checkpoint. A
+        job is completed when its handler returns, and failed when it raises.
+        While other workers hold the last leases, this waits ``poll_interval``
+        seconds between claims, as their jobs might come back.
+        """
+
+        async def work() -> None:
+            while True:
+                if (job := await self.claim()) is None:
+                    if not (await self.counts())["queued"]:
+                        return
+
+                    await asyncio.sleep(poll_interval)
+                    continue
+
+                try:
+                    await self.__process(client, handler, job)
+                except LeaseLost as error:
+                    log.warning("%s", error)
+
+        await asyncio.gather(*(work() for _ in range(concurrency)))
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+__all__ = ("SharedRateLimiter", "resource_of")
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from ...internals import Middleware
+
+if TYPE_CHECKING:
+    from ...internals import RequestContext, Route
+    from .store import SharedStore
+
+
+log = logging.getLogger("github.ext.crawl")
+
+
+def resource_of(route: Route, /) -> str:
+    """The ratelimit resource a route counts against, before its response says so."""
+    path = route.path
+
+    if path.startswith("/search/"):
+        return "code_search" if path == "/search/code" else "search"
+    if path == "/graphql":
+        return "graphql"
+
+    return "core"
+
+
+class SharedRateLimiter(Middleware):
+    """Keeps many processes (each with its own HTTPClient) under one ratelimit.
+
+    Every request takes one from the bucket in the SharedStore before it is
+    sent, and waits for the reset when the bucket is empty. The buckets are
+    corrected with the ratelimit headers of each response. The store is
+    accessed in the default executor, so a locked file doesn't block the loop.
+
+    Arguments:
+        store: The store shared by the processes.
+        keep: How many requests of each bucket are never used.
+    """
+
+    def __init__(self, store: SharedStore, /, *, keep: int = 1) -> None:
+        self.store = store
+        self.keep = keep
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} store: {self.store!r}, keep: {self.keep}>"
+
+    async def before_send(self, ctx: RequestContext, /) -> None:
+        loop = asyncio.get_running_loop()
+        token = ctx.client.token_id
+        resource = resource_of(ctx.route)
+
+        while wait := await loop.run_in_executor(
+            None, lambda: self.store.reserve(token=token, resource=resource, keep=self.keep)
+        ):
+            log.info("Shared %r ratelimit is used up, waiting %.0f seconds", resource, wait)
+            await asyncio.sleep(wait)
+
+    async def after_receive(self, ctx: RequestContext, /) -> None:
+        await self._update(ctx)
+
+    async def on_error(self, ctx: RequestContext, error: Exception, /) -> None:
+        # Error responses, like hitting the ratelimit, have the headers too
+        await self._update(ctx)
+
+    async def _update(self, ctx: RequestContext, /) -> None:
+        if (headers := ctx.headers) is None:
+            return
+
+        remaining: Optional[str] = headers.get("X-RateLimit-Remaining")
+        reset: Optional[str] = headers.get("X-RateLimit-Reset")
+
+        if remaining is None or reset is None:
+            return
+
+        token = ctx.client.token_id
+        resource = headers.get("X-RateLimit-Resource") or resource_of(ctx.route)
+
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: self.store.update(
+                token=token, resource=resource, remaining=int(remaining), reset=float(reset)
+            ),
+        )
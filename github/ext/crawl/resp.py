@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+__all__ = ("RESPConnection", "RESPError")
+
+import asyncio
+from typing import Any, List, Optional, Union
+
+from ...errors import GitHubError
+
+
+class RESPError(GitHubError):
+    """An error reply from a Redis protocol server."""
+
+
+class RESPConnection:
+    """A minimal client for servers that speak the Redis protocol (RESP2).
+
+    Only what the work queue needs, commands are sent one at a time over one
+    connection, which is made on the first command.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} host: {self.host!r}, port: {self.port}, db: {self.db}>"
+
+    async def __connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        if self.password is not None:
+            await self.__command("AUTH", self.password)
+        if self.db:
+            await self.__command("SELECT", self.db)
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Any:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                await self.__connect()
+
+            try:
+                return await self.__command(*args)
+            except RESPError:
+                raise
+            except BaseException:
+                # A reply might be left unread, start over on the next command
+                if self._writer is not None:
+                    self._writer.close()
+
+                self._reader = self._writer = None
+                raise
+
+    async def __command(self, *args: Union[str, bytes, int, float]) -> Any:
+        assert self._writer is not None
+
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+
+        return await self.__reply()
+
+    async def __reply(self) -> Any:
+        assert self._reader is not None
+
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection.")
+
+        kind, value = line[:1], line[1:-2]
+
+        if kind == b"+":
+            return value.decode()
+        if kind == b"-":
+            raise RESPError(value.decode())
+        if kind == b":":
+            return int(value)
+        if kind == b"$":
+            if (length := int(value)) == -1:
+                return None
+
+            return (await self._reader.readexactly(length + 2))[:-2].decode()
+        if kind == b"*":
+            if (length := int(value)) == -1:
+                return None
+
+            items: List[Any] = [await self.__reply() for _ in range(length)]
+            return items
+
+        raise RESPError(f"Unknown reply type {kind!r}.")
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+
+        self._reader = self._writer = None
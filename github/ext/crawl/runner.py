@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+__all__ = ("CrawlRunner", "WorkerError")
+
+import asyncio
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ...errors import GitHubError
+from ...internals import HTTPClient, new_event_loop
+from .ratelimit import SharedRateLimiter
+from .store import SharedStore
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+    from typing import Iterable
+
+    Job = Callable[[HTTPClient, Any], Awaitable[Any]]
+    # (index, succeeded, result or error)
+    Outcome = Tuple[int, bool, Any]
+
+
+class WorkerError(GitHubError):
+    """Raised (or returned) for a job that failed in a worker process.
+
+    The original error might not be picklable, so only its type name, message
+    and traceback are sent back.
+    """
+
+    def __init__(self, item: Any, error_type: str, message: str, traceback: str, /) -> None:
+        self.item = item
+        self.error_type = error_type
+        self.message = message
+        self.traceback = traceback
+
+    def __reduce__(self) -> Any:
+        return self.__class__, (self.item, self.error_type, self.message, self.traceback)
+
+    def __str__(self) -> str:
+        return f"The job for {self.item!r} failed with {self.error_type}: {self.message}"
+
+
+# The event loop and client of a worker process, made once and kept for every chunk
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[HTTPClient] = None
+
+
+def _close_worker() -> None:
+    if _loop is not None and _client is not None:
+        _loop.run_until_complete(_client.__aexit__(None, None, None))
+        _loop.close()
+
+
+def _start_worker(
+    store: SharedStore, client_options: Dict[str, Any], keep: int, fast_loop: bool
+) -> None:
+    global _loop, _client
+
+    options = dict(client_options)
+    options["middlewares"] = [
+        *options.get("middlewares", ()),
+        SharedRateLimiter(store, keep=keep),
+    ]
+
+    _loop = new_event_loop(fast=fast_loop)
+    asyncio.set_event_loop(_loop)
+    _client = HTTPClient(**options)
+
+    # Worker processes don't run atexit hooks
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+async def _crawl(job: Job, chunk: List[Tuple[int, Any]], concurrency: int) -> List[Outcome]:
+    client = _client
+    assert client is not None
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, item: Any) -> Outcome:
+        async with semaphore:
+            try:
+                return index, True, await job(client, item)
+            except Exception as error:
+                return (
+                    index,
+                    False,
+                    WorkerError(item, type(error).__name__, str(error), traceback.format_exc()),
+                )
+
+    return await asyncio.gather(*(run(index, item) for index, item in chunk))
+
+
+def _run_chunk(job: Job, chunk: List[Tuple[int, Any]], concurrency: int) -> List[Outcome]:
+    assert _loop is not None
+    return _loop.run_until_complete(_crawl(job, chunk, concurrency))
+
+
+class CrawlRunner:
+    """Runs a crawl over many processes, so JSON decoding gets every core.
+
+    Each process keeps its own event loop and HTTPClient (so its own
+    connection pool) for the whole run, while the ratelimit buckets are shared
+    through a SharedStore so together they don't go over the limit.
+
+    The job is called as ``await job(client, item)`` for every item, it and the
+    items have to be picklable, so the job should be a module level function.
+
+    Arguments:
+        job: The coroutine function that crawls one item.
+        store: The SharedStore, or the path of its file.
+        processes: How many worker processes to run, the CPU count by default.
+        concurrency: How many jobs each process runs at once.
+        chunk_size: How many items are sent to a process at once.
+        keep: How many requests of each ratelimit bucket are never used.
+        client_options: Keyword arguments for the HTTPClient of each process.
+        mp_context: The multiprocessing context to start the processes with.
+        fast_loop: Whether the processes run uvloop, if it is installed.
+    """
+
+    def __init__(
+        self,
+        job: Job,
+        /,
+        *,
+        store: Any,
+        processes: Optional[int] = None,
+        concurrency: int = 10,
+        chunk_size: int = 50,
+        keep: int = 1,
+        client_options: Optional[Dict[str, Any]] = None,
+        mp_context: Optional[BaseContext] = None,
+        fast_loop: bool = False,
+    ) -> None:
+        self.job = job
+        self.store = store if isinstance(store, SharedStore) else SharedStore(store)
+        self.processes = processes or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.keep = keep
+        self.client_options = client_options or {}
+        self.mp_context = mp_context
+        self.fast_loop = fast_loop
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} processes: {self.processes}, concurrency:"
+            f" {self.concurrency}, store: {self.store!r}>"
+        )
+
+    def run(self, items: Iterable[Any], /, *, return_exceptions: bool = False) -> List[Any]:
+        """Crawls every item and returns the results in the same order.
+
+        Failed jobs raise a WorkerError after every item is done, or are
+        returned in place of their results with ``return_exceptions``.
+        """
+        indexed = list(enumerate(items))
+        chunks = [
+            indexed[start : start + self.chunk_size]
+            for start in range(0, len(indexed), self.chunk_size)
+        ]
+
+        results: List[Any] = [None] * len(indexed)
+        first_error: Optional[WorkerError] = None
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.processes, len(chunks)) or 1,
+            mp_context=self.mp_context,
+            initializer=_start_worker,
+            initargs=(self.store, self.client_options, self.keep, self.fast_loop),
+        ) as executor:
+            futures = [
+                executor.submit(_run_chunk, self.job, chunk, self.concurrency) for chunk in chunks
+            ]
+
+            for future in futures:
+                for index, succeeded, result in future.result():
+                    results[index] = result
+
+                    if not succeeded and first_error is None:
+                        first_error = result
+
+        if first_error is not None and not return_exceptions:
+            raise first_error
+
+        return results
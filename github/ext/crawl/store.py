@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+__all__ = ("SharedStore",)
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, ClassVar, Iterator, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratelimits (
+    token TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    remaining INTEGER NOT NULL,
+    reset REAL NOT NULL,
+    PRIMARY KEY (token, resource)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires REAL
+);
+"""
+
+
+class _SQLiteFile:
+    """An SQLite file used by many processes, with one connection per process."""
+
+    schema: ClassVar[str]
+
+    def __init__(self, path: str, /, *, timeout: float = 30.0) -> None:
+        self.path = os.fspath(path)
+        self.timeout = timeout
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        # The connection is shared by the threads of a process, one transaction at a time
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path: {self.path!r}>"
+
+    def __getstate__(self) -> Any:
+        # Sent to the workers without the connection
+        return self.path, self.timeout
+
+    def __setstate__(self, state: Any) -> None:
+        self.__init__(state[0], timeout=state[1])
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # A connection can't be used after a fork
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(self.schema)
+            self._pid = os.getpid()
+
+        return self._connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Locks the file for writing until the block ends."""
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            else:
+                connection.execute("COMMIT")
+
+    def close(self) -> None:
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+
+        self._connection = None
+
+
+class SharedStore(_SQLiteFile):
+    """State shared by the processes of a crawl, kept in an SQLite file.
+
+    SQLite locks the file for every write, so the ratelimit buckets can be
+    reserved from many processes at once without going over the limit. The
+    store also has a small key-value table for indexes the workers share,
+    like ETags of already crawled URLs.
+    """
+
+    schema = _SCHEMA
+
+    def reserve(self, *, token: str, resource: str, keep: int = 1) -> float:
+        """Takes one request from the shared bucket.
+
+        Returns 0 if the request can be made, else how many seconds to wait
+        until the bucket resets. ``keep`` requests are never handed out.
+        """
+        with self.transaction() as connection:
+            row = connection.execute(
+                "SELECT remaining, reset FROM ratelimits WHERE token = ? AND resource = ?",
+                (token, resource),
+            ).fetchone()
+
+            now = time.time()
+
+            # Unknown or reset, the response will tell the real state
+            if row is None or row[1] <= now:
+                return 0.0
+
+            remaining, reset = row
+            if remaining <= keep:
+                return reset - now
+
+            connection.execute(
+                "UPDATE ratelimits SET remaining = remaining - 1"
+                " WHERE token = ? AND resource = ?",
+                (token, resource),
+            )
+            return 0.0
+
+    def update(self, *, token: str, resource: str, remaining: int, reset: float) -> None:
+        """Merges the ratelimit headers of a response into the shared bucket."""
+        # Responses arrive out of order, in the same window the lowest count is the newest
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO ratelimits (token, resource, remaining, reset) VALUES (?, ?, ?, ?)
+                ON CONFLICT (token, resource) DO UPDATE SET
+                    remaining = CASE
+                        WHEN excluded.reset > reset THEN excluded.remaining
+                        WHEN excluded.reset = reset THEN MIN(remaining, excluded.remaining)
+                        ELSE remaining
+                    END,
+                    reset = MAX(reset, excluded.reset)
+                """,
+                (token, resource, remaining, reset),
+            )
+
+    def get(self, key: str, /, default: Any = None) -> Any:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any, /, *, ttl: Optional[float] = None) -> None:
+        """Stores a JSON serializable value for every process, for ``ttl`` seconds if given."""
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(value), None if ttl is None else time.time() + ttl),
+            )
+
+    def delete(self, key: str, /) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
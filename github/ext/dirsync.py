@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+__all__ = ("SyncResult", "git_blob_sha", "hash_directory", "list_tree_blobs", "sync_directory")
+
+import asyncio
+import hashlib
+import os
+import stat
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from ..objects import File
+from ..utils import gather_or_cancel
+from .commit import commit_tree
+
+if TYPE_CHECKING:
+    from ..internals import HTTPClient
+    from ..types import Author, Committer
+
+# What git records, other modes (symlinks, submodules) aren't synced
+MODE_FILE = "100644"
+MODE_EXECUTABLE = "100755"
+
+READ_SIZE = 1024 * 1024
+# Files hashed per executor call, small files hash faster than a future is scheduled
+BATCH_SIZE = 64
+
+
+class SyncResult(NamedTuple):
+    # None if the remote already matched the directory
+    commit: Optional[Dict[str, Any]]
+    uploaded: List[str]
+    changed: List[str]
+    deleted: List[str]
+    unchanged: int
+
+
+def git_blob_sha(data: Union[bytes, bytearray, memoryview], /) -> str:
+    """The SHA git and GitHub give a blob with this content."""
+    sha = hashlib.sha1(b"blob %d\0" % len(data))
+    sha.update(data)
+    return sha.hexdigest()
+
+
+def _hash_file(path: str, /) -> Tuple[str, str]:
+    # hashlib releases the GIL for big updates and so does reading, so threads hash in parallel
+    with open(path, "rb") as f:
+        info = os.fstat(f.fileno())
+        sha = hashlib.sha1(b"blob %d\0" % info.st_size)
+
+        while chunk := f.read(READ_SIZE):
+            sha.update(chunk)
+
+    mode = MODE_EXECUTABLE if info.st_mode & stat.S_IXUSR else MODE_FILE
+    return sha.hexdigest(), mode
+
+
+def _hash_files(paths: List[str], /) -> List[Tuple[str, str]]:
+    return [_hash_file(path) for path in paths]
+
+
+def _walk(root: str, /) -> List[Tuple[str, str]]:
+    # (path relative to root with forward slashes, path on disk) of every regular file
+    files = []
+    stack = [("", root)]
+
+    while stack:
+        prefix, directory = stack.pop()
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name == ".git":
+                    continue
+
+                name = prefix + entry.name
+
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((name + "/", entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    files.append((name, entry.path))
+
+    return files
+
+
+async def hash_directory(
+    directory: Union[str, os.PathLike], /, *, executor: Optional[Executor] = None
+) -> Dict[str, Tuple[str, str]]:
+    """Maps the path of every file in ``directory`` to its git blob SHA and mode.
+
+    The files are hashed in parallel in ``executor``, a thread pool by
+    default. Symlinks and '.git' directories are skipped.
+    """
+    loop = asyncio.get_running_loop()
+    files = await loop.run_in_executor(None, _walk, os.fspath(directory))
+    paths = [path for _, path in files]
+
+    own_executor = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(min(32, (os.cpu_count() or 1) * 2))
+
+    try:
+        batches = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _hash_files, paths[start : start + BATCH_SIZE])
+                for start in range(0, len(paths), BATCH_SIZE)
+            )
+        )
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+
+    return {name: hashed for (name, _), hashed in zip(files, chain.from_iterable(batches))}
+
+
+async def list_tree_blobs(
+    http: HTTPClient, /, *, owner: str, repo: str, tree_sha: str, concurrency: int = 8
+) -> Dict[str, Tuple[str, str]]:
+    """Maps the path of every blob under a tree to its SHA and mode.
+
+    One recursive request is enough unless the tree is too big for GitHub to
+    return at once, then the subtrees are listed one by one.
+    """
+    tree = await http.get_tree(owner=owner, repo=repo, tree_sha=tree_sha, recursive=True)
+
+    if not tree.get("truncated"):
+        return {
+            entry["path"]: (entry["sha"], entry["mode"])
+            for entry in tree["tree"]
+            if entry["type"] == "blob"
+        }
+
+    blobs: Dict[str, Tuple[str, str]] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def walk(prefix: str, sha: str) -> None:
+        async with semaphore:
+            tree = await http.get_tree(owner=owner, repo=repo, tree_sha=sha)
+
+        subtrees = []
+
+        for entry in tree["tree"]:
+            if entry["type"] == "blob":
+                blobs[prefix + entry["path"]] = entry["sha"], entry["mode"]
+            elif entry["type"] == "tree":
+                subtrees.append(walk(prefix + entry["path"] + "/", entry["sha"]))
+
+        await gather_or_cancel(subtrees)
+
+    await walk("", tree_sha)
+    return blobs
+
+
+async def sync_directory(
+    http: HTTPClient,
+    directory: Union[str, os.PathLike],
+    /,
+    *,
+    owner: str,
+    repo: str,
+    branch: str,
+    message: str,
+    prefix: str = "",
+    delete: bool = True,
+    author: Optional[Author] = None,
+    committer: Optional[Committer] = None,
+    concurrency: int = 8,
+    executor: Optional[Executor] = None,
+    max_attempts: int = 5,
+) -> SyncResult:
+    """Makes ``prefix`` in a branch match a local directory, with one commit.
+
+    The git blob SHAs of the local files are computed in parallel and compared
+    with the remote tree, fetched in one request. Only blobs the repository
+    doesn't have yet are uploaded, each distinct content once, then the changed
+    and deleted paths are committed with ``commit_tree``. With ``delete``, files
+    that aren't in the directory anymore are removed from the branch, symlinks
+    and submodules in the branch are always kept.
+    """
+    prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    head = (await http.get_ref(owner=owner, repo=repo, ref=f"heads/{branch}"))["object"]["sha"]
+    head_commit = await http.get_commit_object(owner=owner, repo=repo, commit_sha=head)
+
+    local, remote = await asyncio.gather(
+        hash_directory(directory, executor=executor),
+        list_tree_blobs(
+            http,
+            owner=owner,
+            repo=repo,
+            tree_sha=head_commit["tree"]["sha"],
+            concurrency=concurrency,
+        ),
+    )
+
+    # Symlinks and submodules can't be in the directory, they are left as they are
+    files = {
+        path: entry for path, entry in remote.items() if entry[1] in (MODE_FILE, MODE_EXECUTABLE)
+    }
+
+    changed = []
+    unchanged = 0
+
+    for name, hashed in local.items():
+        if files.get(prefix + name) == hashed:
+            unchanged += 1
+        else:
+            changed.append(name)
+
+    deleted = []
+    if delete:
+        deleted = [
+            path[len(prefix) :]
+            for path in files
+            if path.startswith(prefix) and path[len(prefix) :] not in local
+        ]
+
+    if not changed and not deleted:
+        return SyncResult(None, [], [], [], unchanged)
+
+    # Blobs the repository has anywhere don't need uploading, like renamed or copied files
+    present = {sha for sha, _ in remote.values()}
+    to_upload: Dict[str, str] = {}
+
+    for name in changed:
+        sha = local[name][0]
+        if sha not in present and sha not in to_upload:
+            to_upload[sha] = name
+
+    semaphore = asyncio.Semaphore(concurrency)
+    root = Path(directory)
+
+    async def upload(sha: str, name: str) -> None:
+        async with semaphore:
+            blob = await http.create_blob(
+                owner=owner, repo=repo, content=File(root / name, filename=name)
+            )
+
+        # It changed while syncing, committing a SHA that wasn't uploaded would fail
+        if blob["sha"] != sha:
+            raise RuntimeError(f"The file {name!r} changed while being synced.")
+
+    await gather_or_cancel([upload(sha, name) for sha, name in to_upload.items()])
+
+    tree: List[Dict[str, Any]] = [
+        {"path": prefix + name, "mode": local[name][1], "type": "blob", "sha": local[name][0]}
+        for name in changed
+    ]
+    tree.extend(
+        {"path": prefix + name, "mode": MODE_FILE, "type": "blob", "sha": None} for name in deleted
+    )
+
+    commit = await commit_tree(
+        http,
+        owner=owner,
+        repo=repo,
+        branch=branch,
+        message=message,
+        tree=tree,
+        author=author,
+        committer=committer,
+        max_attempts=max_attempts,
+    )
+
+    return SyncResult(commit, list(to_upload.values()), changed, deleted, unchanged)
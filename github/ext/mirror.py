@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+__all__ = ("BlobStore", "MirrorResult", "mirror_tree")
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from ..utils import gather_or_cancel, is_sha
+from .dirsync import MODE_EXECUTABLE, READ_SIZE, list_tree_blobs
+
+if TYPE_CHECKING:
+    from ..internals import HTTPClient
+
+MODE_SYMLINK = "120000"
+
+# Kept in the mirrored directory, what was written there by the last run
+MANIFEST = ".github-mirror.json"
+
+
+class MirrorResult(NamedTuple):
+    commit: str
+    # SHAs of the blobs that weren't in the store
+    downloaded: List[str]
+    written: List[str]
+    removed: List[str]
+    unchanged: int
+
+
+def _file_sha(path: Path, /) -> str:
+    with open(path, "rb") as f:
+        sha = hashlib.sha1(b"blob %d\0" % os.fstat(f.fileno()).st_size)
+
+        while chunk := f.read(READ_SIZE):
+            sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+class BlobStore:
+    """Git blobs on disk, kept by SHA like in a git objects directory.
+
+    Blobs never change, so a blob in the store is never downloaded again, by
+    any mirror sharing the store. Blobs are verified against their SHA and
+    written to a temporary file that is renamed, so a store can be shared by
+    many processes.
+    """
+
+    def __init__(self, directory: Union[str, os.PathLike], /) -> None:
+        self.directory = Path(directory)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} directory: {str(self.directory)!r}>"
+
+    def path(self, sha: str, /) -> Path:
+        return self.directory / sha[:2] / sha[2:]
+
+    def __contains__(self, sha: str) -> bool:
+        return self.path(sha).exists()
+
+    async def fetch(self, http: HTTPClient, /, *, owner: str, repo: str, sha: str) -> Path:
+        """Downloads a blob into the store unless it is already there, returns its path."""
+        path = self.path(sha)
+        loop = asyncio.get_running_loop()
+
+        if await loop.run_in_executor(None, path.exists):
+            return path
+
+        await loop.run_in_executor(None, lambda: path.parent.mkdir(parents=True, exist_ok=True))
+        partial = path.with_name(f"{path.name}.{os.getpid()}.{id(self)}.part")
+        file = await loop.run_in_executor(None, open, partial, "wb")
+
+        try:
+            try:
+                async for chunk in http.iter_blob(owner=owner, repo=repo, file_sha=sha):
+                    await loop.run_in_executor(None, file.write, chunk)
+            finally:
+                await loop.run_in_executor(None, file.close)
+
+            if await loop.run_in_executor(None, _file_sha, partial) != sha:
+                raise ValueError(f"The content downloaded for the blob {sha} doesn't match it.")
+
+            await loop.run_in_executor(None, os.replace, partial, path)
+        finally:
+            if await loop.run_in_executor(None, partial.exists):
+                await loop.run_in_executor(None, partial.unlink)
+
+        return path
+
+
+def _read_manifest(directory: Path, /) -> Tuple[Optional[str], Dict[str, Tuple[str, str]]]:
+    try:
+        with open(directory / MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None, {}
+
+    return manifest["commit"], {path: tuple(entry) for path, entry in manifest["paths"].items()}
+
+
+def _write_manifest(directory: Path, commit: str, paths: Dict[str, Tuple[str, str]], /) -> None:
+    partial = directory / (MANIFEST + ".part")
+
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "paths": paths}, f)
+
+    os.replace(partial, directory / MANIFEST)
+
+
+def _apply(
+    store: BlobStore,
+    directory: Path,
+    write: Dict[str, Tuple[str, str]],
+    remove: List[str],
+    /,
+) -> None:
+    for name in remove:
+        path = directory / name
+        path.unlink(missing_ok=True)
+
+        # Directories left empty go too, like git does
+        parent = path.parent
+        while parent != directory:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+    for name, (sha, mode) in write.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.is_symlink() or path.exists():
+            path.unlink()
+
+        source = store.path(sha)
+
+        if mode == MODE_SYMLINK:
+            os.symlink(source.read_text("utf-8"), path)
+            continue
+
+        shutil.copyfile(source, path)
+
+        if mode == MODE_EXECUTABLE:
+            path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+async def mirror_tree(
+    http: HTTPClient,
+    directory: Union[str, os.PathLike],
+    /,
+    *,
+    owner: str,
+    repo: str,
+    store: BlobStore,
+    ref: str = "HEAD",
+    concurrency: int = 8,
+) -> MirrorResult:
+    """Makes ``directory`` a copy of the files of a repository at ``ref``.
+
+    The whole tree is listed with one recursive request, and only blobs that
+    aren't in ``store`` yet are downloaded, ``concurrency`` at a time. The
+    directory keeps a manifest of what was written, so later runs only touch
+    the paths that changed since. If the ref didn't move, only it is resolved.
+    Files that were changed locally aren't noticed, delete the manifest to
+    write everything again. Submodules are skipped.
+    """
+    directory = Path(directory)
+    loop = asyncio.get_running_loop()
+
+    if is_sha(ref):
+        commit = ref
+    else:
+        commit = await http.get_commit_sha(owner=owner, repo=repo, ref=ref)
+
+    old_commit, old = await loop.run_in_executor(None, _read_manifest, directory)
+    if commit == old_commit:
+        return MirrorResult(commit, [], [], [], len(old))
+
+    commit_object = await http.get_commit_object(owner=owner, repo=repo, commit_sha=commit)
+    remote = await list_tree_blobs(
+        http, owner=owner, repo=repo, tree_sha=commit_object["tree"]["sha"], concurrency=concurrency
+    )
+
+    write = {name: entry for name, entry in remote.items() if old.get(name) != entry}
+    remove = [name for name in old if name not in remote]
+
+    wanted = {sha for sha, _ in write.values()}
+    missing = await loop.run_in_executor(None, lambda: [sha for sha in wanted if sha not in store])
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(sha: str) -> None:
+        async with semaphore:
+            await store.fetch(http, owner=owner, repo=repo, sha=sha)
+
+    await gather_or_cancel([fetch(sha) for sha in missing])
+
+    await loop.run_in_executor(None, lambda: directory.mkdir(parents=True, exist_ok=True))
+    await loop.run_in_executor(None, _apply, store, directory, write, remove)
+    await loop.run_in_executor(None, _write_manifest, directory, commit, remote)
+
+    return MirrorResult(commit, missing, list(write), remove, len(remote) - len(write))
@@ -1 +1,15 @@
+from .budget import *
+from .cache import *
+from .decode import *
+from .graphql import *
 from .http import *
+from .latency import *
+from .loop import *
+from .metrics import *
+from .middleware import *
+from .monitor import *
+from .route import *
+from .sync import *
+from .tracing import *
+from .transport import *
+from .upload import *
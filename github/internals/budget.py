@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+__all__ = ("Budget", "caller_tag", "current_caller_tag")
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Iterator, Literal, NamedTuple, Optional, Tuple
+
+_caller_tag: ContextVar[Optional[str]] = ContextVar("github_caller_tag", default=None)
+
+UNTAGGED = "untagged"
+
+
+@contextmanager
+def caller_tag(tag: str, /) -> Iterator[None]:
+    """Tags every request made inside the block (and the tasks it starts) with ``tag``."""
+    token = _caller_tag.set(tag)
+
+    try:
+        yield
+    finally:
+        _caller_tag.reset(token)
+
+
+def current_caller_tag() -> Optional[str]:
+    return _caller_tag.get()
+
+
+class _Window(NamedTuple):
+    remaining: int
+    limit: int
+    reset_time: datetime
+
+
+class Budget:
+    """Accounts the ratelimit budget used by each caller tag, route and token.
+
+    One Budget can be shared by many HTTPClients, the usage is kept per
+    ratelimit resource ('core', 'search', ...). ``window`` is how many seconds
+    of recent requests the consumption rate is calculated from.
+    """
+
+    def __init__(self, *, window: float = 300.0) -> None:
+        self.window = window
+
+        # (resource, kind, key) -> requests, kind being 'caller', 'route' or 'token'
+        self._usage: Dict[Tuple[str, str, str], int] = {}
+        # (resource, token) -> time.monotonic() of recent requests
+        self._recent: Dict[Tuple[str, str], Deque[float]] = {}
+        # (resource, token) -> the latest ratelimit headers
+        self._windows: Dict[Tuple[str, str], _Window] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} window: {self.window}>"
+
+    def record(
+        self,
+        *,
+        resource: str,
+        route: str,
+        token: str,
+        remaining: int,
+        limit: int,
+        reset_time: datetime,
+    ) -> None:
+        usage = self._usage
+        caller = _caller_tag.get() or UNTAGGED
+
+        for key in (
+            (resource, "caller", caller),
+            (resource, "route", route),
+            (resource, "token", token),
+        ):
+            usage[key] = usage.get(key, 0) + 1
+
+        if (recent := self._recent.get((resource, token))) is None:
+            recent = self._recent[resource, token] = deque()
+
+        now = time.monotonic()
+        recent.append(now)
+
+        while recent[0] < now - self.window:
+            recent.popleft()
+
+        self._windows[resource, token] = _Window(remaining, limit, reset_time)
+
+    def latest(self, *, token: str, resource: str = "core") -> Optional[_Window]:
+        """The latest (remaining, limit, reset_time) GitHub gave for ``token``, if any."""
+        return self._windows.get((resource, token))
+
+    def usage(
+        self, *, by: Literal["caller", "route", "token"] = "caller", resource: str = "core"
+    ) -> Dict[str, int]:
+        """How many requests each caller tag, route or token made."""
+        return {
+            key: count
+            for (usage_resource, kind, key), count in self._usage.items()
+            if usage_resource == resource and kind == by
+        }
+
+    def rate(self, *, token: str, resource: str = "core") -> float:
+        """Requests per second made with ``token`` recently."""
+        if not (recent := self._recent.get((resource, token))):
+            return 0.0
+
+        now = time.monotonic()
+        while recent and recent[0] < now - self.window:
+            recent.popleft()
+
+        # Requests made in a short burst shouldn't count as a huge rate
+        return len(recent) / max(now - recent[0], 1.0) if recent else 0.0
+
+    def forecast(self, *, token: str, resource: str = "core") -> Optional[datetime]:
+        """When the budget runs out at the current rate, None if it lasts until the reset."""
+        if (window := self._windows.get((resource, token))) is None:
+            return None
+
+        if (rate := self.rate(token=token, resource=resource)) == 0:
+            return None
+
+        exhausted = datetime.now(timezone.utc) + timedelta(seconds=window.remaining / rate)
+        return exhausted if exhausted < window.reset_time else None
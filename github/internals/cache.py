@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+__all__ = ("ImmutableCache",)
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Tuple, Union
+
+from .middleware import Middleware
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    import json
+
+    def json_dumps(data: Any, /) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    json_loads = json.loads
+else:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+
+if TYPE_CHECKING:
+    from .middleware import RequestContext
+
+log = logging.getLogger("github")
+
+# kind, body
+Entry = Tuple[str, bytes]
+
+# Route templates that always give the same response for a full SHA in their last segment
+IMMUTABLE_ROUTES = frozenset(
+    (
+        "/repos/{owner}/{repo}/git/blobs/{file_sha}",
+        "/repos/{owner}/{repo}/git/trees/{tree_sha}",
+        "/repos/{owner}/{repo}/git/commits/{commit_sha}",
+        "/repos/{owner}/{repo}/git/tags/{tag_sha}",
+        "/repos/{owner}/{repo}/commits/{ref}",
+        "/gists/{gist_id}/{sha}",
+    )
+)
+# Route templates that always give the same response for a full SHA as their 'ref' parameter
+IMMUTABLE_AT_REF_ROUTES = frozenset(
+    (
+        "/repos/{owner}/{repo}/contents/{path}",
+        "/repos/{owner}/{repo}/readme",
+        "/repos/{owner}/{repo}/readme/{dir}",
+    )
+)
+
+# SHA-1, and SHA-256 for repositories that use it
+_FULL_SHA = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+_KINDS = ("json", "text", "bytes", "memoryview")
+
+
+def _encode(data: Any, /) -> Entry:
+    if isinstance(data, str):
+        return "text", data.encode("utf-8")
+    if isinstance(data, bytes):
+        return "bytes", data
+    if isinstance(data, memoryview):
+        return "memoryview", data.tobytes()
+
+    return "json", json_dumps(data)
+
+
+def _has_token_url(data: Any, /) -> bool:
+    # Contents of private repositories link to downloads with a token that expires soon
+    items = data if isinstance(data, list) else (data,)
+
+    return any(
+        isinstance(item, dict) and "token=" in (item.get("download_url") or "") for item in items
+    )
+
+
+def _decode(entry: Entry, /) -> Any:
+    kind, body = entry
+
+    if kind == "json":
+        return json_loads(body)
+    if kind == "text":
+        return body.decode("utf-8")
+    if kind == "memoryview":
+        return memoryview(body)
+
+    return body
+
+
+class ImmutableCache(Middleware):
+    """Caches the responses of requests for objects addressed by their full SHA, for good.
+
+    Commits, trees, blobs, tags, gist revisions and file contents at a commit
+    never change, so these responses are never revalidated or expired, and
+    a hit doesn't send a request at all. They are kept in memory, up to
+    ``max_bytes``, the least recently used going first. With a ``directory``,
+    they are kept on disk too, up to ``max_disk_bytes``, where many processes
+    can share them. Every hit returns a new copy of the data.
+
+    Routes are recognised by their template, more can be given in ``routes``
+    (a full SHA in the last segment) and ``ref_routes`` (a full SHA as the
+    'ref' parameter). Only GET requests are cached. Entries are kept per
+    token, a response is only ever served to the credentials that received
+    it, so clients with different tokens can share a directory. Contents with
+    a ``download_url`` holding a temporary token aren't cached. Errors reading
+    or writing the directory are logged, they never fail a request.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        /,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+        routes: Iterable[str] = (),
+        ref_routes: Iterable[str] = (),
+    ) -> None:
+        self.directory = None if directory is None else Path(directory)
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self.routes = IMMUTABLE_ROUTES.union(routes)
+        self.ref_routes = IMMUTABLE_AT_REF_ROUTES.union(ref_routes)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, Entry] = OrderedDict()
+        self._size = 0
+        # Of this process' view of the directory, None until it was first scanned
+        self._disk_size: Optional[int] = None
+        # Writes happen in executor threads
+        self._disk_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} entries: {len(self._memory)}, size: {self._size},"
+            f" hits: {self.hits}, misses: {self.misses}>"
+        )
+
+    def key_for(self, ctx: RequestContext, /) -> Optional[str]:
+        """The cache key of a request, None if its response can change."""
+        route = ctx.route
+
+        if route.method != "GET":
+            return None
+
+        kwargs = ctx.kwargs
+        params = kwargs.get("params") or {}
+
+        if route.path in self.routes:
+            if not _FULL_SHA.fullmatch(route.url.raw_path.rpartition("/")[2]):
+                return None
+        elif route.path in self.ref_routes:
+            if not _FULL_SHA.fullmatch(str(params.get("ref", ""))):
+                return None
+        else:
+            return None
+
+        headers = kwargs.get("headers") or {}
+        accept = headers.get("Accept") or headers.get("accept") or ""
+        query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+        # Private repositories are only visible to some tokens
+        token = ctx.client.token_id
+        if authorization := headers.get("Authorization") or headers.get("authorization"):
+            token += " " + hashlib.sha256(authorization.encode()).hexdigest()
+
+        key = f"{token} {route.url.raw_path}?{query} {accept} {ctx.body_type}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def clear(self) -> None:
+        """Empties the memory tier, the directory is left as it is."""
+        self._memory.clear()
+        self._size = 0
+
+    def _remember(self, key: str, entry: Entry, /) -> None:
+        size = len(entry[1])
+
+        # One huge blob shouldn't push out everything else
+        if size > self.max_bytes // 8:
+            return
+
+        if (old := self._memory.pop(key, None)) is not None:
+            self._size -= len(old[1])
+
+        self._memory[key] = entry
+        self._size += size
+
+        while self._size > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._size -= len(evicted[1])
+
+    def _path(self, key: str, /) -> Path:
+        return self.directory / key[:2] / key[2:]  # type: ignore
+
+    def _read(self, key: str, /) -> Optional[Entry]:
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as f:
+                kind = f.readline().rstrip(b"\n").decode("ascii")
+                body = f.read()
+        except FileNotFoundError:
+            return None
+
+        if kind not in _KINDS:
+            return None
+
+        # Recently used entries are evicted last
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return kind, body
+
+    def _write(self, key: str, entry: Entry, /) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Unique, the same key can be written by many threads and processes at once
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=path.name, suffix=".part", delete=False
+        ) as f:
+            try:
+                f.write(entry[0].encode("ascii") + b"\n")
+                f.write(entry[1])
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+
+        try:
+            os.replace(f.name, path)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+
+        with self._disk_lock:
+            if self._disk_size is None:
+                self._disk_size = sum(size for _, size, _ in self._scan())
+            else:
+                self._disk_size += len(entry[1])
+
+            if self._disk_size > self.max_disk_bytes:
+                self._evict()
+
+    def _scan(self) -> Iterable[Tuple[float, int, Path]]:
+        for path in self.directory.glob("*/*"):  # type: ignore
+            if path.name.endswith(".part"):
+                continue
+
+            try:
+                info = path.stat()
+            except FileNotFoundError:
+                continue
+
+            yield info.st_mtime, info.st_size, path
+
+    def _evict(self) -> None:
+        # Down to 90%, so it isn't scanned again on every write
+        entries = sorted(self._scan())
+        size = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+        self._disk_size = size
+
+    async def before_send(self, ctx: RequestContext, /) -> None:
+        if (key := self.key_for(ctx)) is None:
+            return
+
+        ctx.extras["immutable_cache_key"] = key
+
+        if (entry := self._memory.get(key)) is not None:
+            self._memory.move_to_end(key)
+        elif self.directory is not None:
+            try:
+                entry = await asyncio.get_running_loop().run_in_executor(None, self._read, key)
+            except OSError as error:
+                log.warning(f"Couldn't read from the immutable cache: {error!r}")
+
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return
+
+        self.hits += 1
+        del ctx.extras["immutable_cache_key"]
+        ctx.respond(_decode(entry))
+
+    async def after_receive(self, ctx: RequestContext, /) -> None:
+        if (key := ctx.extras.pop("immutable_cache_key", None)) is None:
+            return
+
+        # Not a response from GitHub, another middleware answered
+        if ctx.status is None or not 200 <= ctx.status <= 299:
+            return
+
+        if _has_token_url(ctx.data):
+            return
+
+        entry = _encode(ctx.data)
+        self._remember(key, entry)
+
+        if self.directory is None:
+            return
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, entry)
+        except OSError as error:
+            log.warning(f"Couldn't write to the immutable cache: {error!r}")
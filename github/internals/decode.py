@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+__all__ = ("json_loads_in_slices",)
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Dict, List, Tuple
+
+_scan_once = json.JSONDecoder().scan_once
+_skip_whitespace = re.compile(r"[ \t\n\r]*").match
+
+WHITESPACE = " \t\n\r"
+# How many members are decoded between checking the time
+CHECK_EVERY = 32
+
+
+class _Slices:
+    __slots__ = ("slice_time", "started", "busy", "longest")
+
+    def __init__(self, slice_time: float, /) -> None:
+        self.slice_time = slice_time
+        self.started = time.perf_counter()
+        self.busy = 0.0
+        self.longest = 0.0
+
+    def end(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        self.busy += elapsed
+        self.longest = max(self.longest, elapsed)
+
+    async def next(self) -> None:
+        if time.perf_counter() - self.started >= self.slice_time:
+            self.end()
+            await asyncio.sleep(0)
+            self.started = time.perf_counter()
+
+
+async def _array(text: str, index: int, slices: _Slices, /) -> Tuple[List[Any], int]:
+    result: List[Any] = []
+    append = result.append
+
+    index = _skip_whitespace(text, index + 1).end()
+    if text[index] == "]":
+        return result, index + 1
+
+    count = 0
+
+    # StopIteration can't be raised through a coroutine
+    try:
+        while True:
+            value, index = _scan_once(text, index)
+            append(value)
+
+            if text[index] in WHITESPACE:
+                index = _skip_whitespace(text, index).end()
+
+            char = text[index]
+            if char == "]":
+                return result, index + 1
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+
+            index += 1
+            if text[index] in WHITESPACE:
+                index = _skip_whitespace(text, index).end()
+
+            count += 1
+            if not count % CHECK_EVERY:
+                await slices.next()
+    except StopIteration as error:
+        raise json.JSONDecodeError("Expecting value", text, error.value) from None
+
+
+async def _object(text: str, index: int, slices: _Slices, /) -> Tuple[Dict[str, Any], int]:
+    result: Dict[str, Any] = {}
+
+    index = _skip_whitespace(text, index + 1).end()
+    if text[index] == "}":
+        return result, index + 1
+
+    try:
+        while True:
+            if text[index] != '"':
+                raise json.JSONDecodeError(
+                    "Expecting property name enclosed in double quotes", text, index
+                )
+
+            key, index = _scan_once(text, index)
+            index = _skip_whitespace(text, index).end()
+
+            if text[index] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, index)
+
+            index = _skip_whitespace(text, index + 1).end()
+
+            # Like the 'items' of search results
+            if text[index] == "[":
+                result[key], index = await _array(text, index, slices)
+            else:
+                result[key], index = _scan_once(text, index)
+
+            index = _skip_whitespace(text, index).end()
+
+            char = text[index]
+            if char == "}":
+                return result, index + 1
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+
+            index = _skip_whitespace(text, index + 1).end()
+            await slices.next()
+    except StopIteration as error:
+        raise json.JSONDecodeError("Expecting value", text, error.value) from None
+
+
+async def json_loads_in_slices(body: bytes, /, *, slice_time: float = 0.005) -> Tuple[Any, float]:
+    """Decodes JSON on the event loop without blocking it for more than about ``slice_time``.
+
+    Both json and orjson hold the GIL while they build the objects, so a big
+    body blocks the loop even when decoded in another thread. Instead, the
+    members of a top level array (or of the arrays in a top level object, like
+    the 'items' of search results) are decoded one by one here, letting other
+    tasks run every ``slice_time`` seconds. It is slower than decoding at
+    once, so only worth it for big bodies.
+
+    Returns the data, and the seconds of blocking this spread out, which is
+    the time spent decoding except for the longest slice. Invalid JSON raises
+    a ``json.JSONDecodeError``, without decoding the body again.
+    """
+    slices = _Slices(slice_time)
+    text = body.decode("utf-8")
+
+    try:
+        index = _skip_whitespace(text, 0).end()
+        char = text[index]
+
+        if char == "[":
+            data, index = await _array(text, index, slices)
+        elif char == "{":
+            data, index = await _object(text, index, slices)
+        else:
+            data, index = _scan_once(text, index)
+    except IndexError:
+        # The body ended before the data did
+        raise json.JSONDecodeError("Expecting value", text, len(text)) from None
+    except StopIteration as error:
+        raise json.JSONDecodeError("Expecting value", text, error.value) from None
+
+    if (end := _skip_whitespace(text, index).end()) != len(text):
+        raise json.JSONDecodeError("Extra data", text, end)
+
+    slices.end()
+    return data, slices.busy - slices.longest
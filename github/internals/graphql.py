@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+__all__ = ("GraphQL",)
+
+import asyncio
+import json
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from ..errors import GraphQLError
+
+if TYPE_CHECKING:
+    from .http import HTTPClient
+
+    # field, arguments, selection, future
+    Lookup = Tuple[str, Dict[str, Any], str, "asyncio.Future[Any]"]
+
+RATE_LIMIT_SELECTION = "rateLimit { cost remaining resetAt }"
+
+REPO_SELECTION = """
+nameWithOwner
+stargazerCount
+primaryLanguage { name }
+languages(first: 20, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+latestRelease { tagName name publishedAt }
+"""
+
+
+def _literal(value: Any, /) -> str:
+    # GraphQL literals of JSON values, JSON strings are valid GraphQL strings
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_literal(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}: {_literal(v)}" for k, v in value.items()) + "}"
+
+    return json.dumps(value)
+
+
+class GraphQL:
+    """A GraphQL API client on top of an HTTPClient, and its session.
+
+    ``lookup`` looks up one object, like a repository, but the lookups made
+    at the same time are sent together, as the aliased fields of one query,
+    ``batch_size`` per query and ``concurrency`` queries at a time. Fetching
+    a thousand repositories takes ten requests, instead of thousands of REST
+    calls.
+
+    The cost of every query that selects ``rateLimit { cost remaining resetAt }``
+    is added to ``cost``, batched queries always select it.
+    """
+
+    def __init__(self, http: HTTPClient, /, *, batch_size: int = 100, concurrency: int = 4) -> None:
+        self.http = http
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+        self.queries = 0
+        # Points spent by the queries that selected their cost, and what is left
+        self.cost = 0
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[datetime] = None
+
+        self._pending: List[Lookup] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} queries: {self.queries}, cost: {self.cost}, remaining:"
+            f" {self.remaining}>"
+        )
+
+    def _track(self, response: Dict[str, Any], /) -> None:
+        self.queries += 1
+
+        if (rate_limit := (response.get("data") or {}).get("rateLimit")) is None:
+            return
+
+        self.cost += rate_limit.get("cost", 0)
+        self.remaining = rate_limit.get("remaining", self.remaining)
+
+        if (reset_at := rate_limit.get("resetAt")) is not None:
+            self.reset_at = datetime.fromisoformat(reset_at.replace("Z", "+00:00"))
+
+    async def query(self, query: str, /, *, variables: Optional[Dict[str, Any]] = None) -> Any:
+        """Sends a query and returns its data, raises GraphQLError if it has errors."""
+        response = await self.http.graphql(query, variables=variables)
+        self._track(response)
+
+        if response.get("errors"):
+            raise GraphQLError(response["errors"])
+
+        return response["data"]
+
+    async def paginate(
+        self,
+        query: str,
+        /,
+        *,
+        path: Sequence[str],
+        variables: Optional[Dict[str, Any]] = None,
+        cursor_variable: str = "cursor",
+    ) -> AsyncIterator[Any]:
+        """Yields the nodes of a connection, page by page.
+
+        ``query`` has a ``$cursor: String`` variable, given to the connection as
+        ``after``, and the connection at ``path`` in the data selects ``nodes``
+        (or ``edges``) and ``pageInfo { hasNextPage endCursor }``.
+        """
+        variables = dict(variables or {})
+        variables[cursor_variable] = None
+
+        while True:
+            connection = await self.query(query, variables=variables)
+
+            for key in path:
+                if connection is None:
+                    return
+
+                connection = connection[key]
+
+            if connection is None:
+                return
+
+            if (nodes := connection.get("nodes")) is None:
+                nodes = [edge["node"] for edge in connection.get("edges") or ()]
+
+            for node in nodes:
+                yield node
+
+            page_info = connection["pageInfo"]
+            if not page_info["hasNextPage"]:
+                return
+
+            variables[cursor_variable] = page_info["endCursor"]
+
+    async def lookup(self, field: str, selection: str, /, **arguments: Any) -> Any:
+        """Looks up one object, batched with the other lookups made at the same time.
+
+        Like ``lookup("repository", "stargazerCount", owner="python", name="cpython")``.
+        Arguments are JSON values. Returns None if it wasn't found, raises
+        GraphQLError for other errors of this object.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((field, arguments, selection, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            # After the other tasks started in this iteration of the loop added theirs
+            self._flush_handle = loop.call_soon(self._flush)
+
+        return await future
+
+    async def get_repos(
+        self, names: Iterable[str], /, *, selection: str = REPO_SELECTION
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Looks up repositories by 'owner/name', in order, None for the ones that don't exist.
+
+        The default selection has the stars, languages and latest release.
+        """
+        lookups = []
+
+        for name in names:
+            owner, _, repo = name.partition("/")
+            lookups.append(self.lookup("repository", selection, owner=owner, name=repo))
+
+        return await asyncio.gather(*lookups)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+
+        for start in range(0, len(pending), self.batch_size):
+            task = asyncio.ensure_future(self._send(pending[start : start + self.batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, lookups: List[Lookup], /) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        fields = []
+        for i, (field, arguments, selection, _) in enumerate(lookups):
+            args = ", ".join(f"{name}: {_literal(value)}" for name, value in arguments.items())
+            fields.append(f"a{i}: {field}{f'({args})' if args else ''} {{ {selection} }}")
+
+        query = "query {\n" + "\n".join(fields) + f"\n{RATE_LIMIT_SELECTION}\n}}"
+
+        try:
+            async with self._semaphore:
+                response = await self.http.graphql(query)
+        except Exception as error:
+            for *_, future in lookups:
+                if not future.done():
+                    future.set_exception(error)
+
+            return
+
+        self._track(response)
+
+        data = response.get("data") or {}
+        # alias -> errors, errors without a path are of the whole query
+        errors: Dict[Optional[str], List[Dict[str, Any]]] = {}
+
+        for error in response.get("errors") or ():
+            alias = path[0] if (path := error.get("path")) else None
+            errors.setdefault(alias, []).append(error)
+
+        for i, (*_, future) in enumerate(lookups):
+            if future.done():
+                continue
+
+            alias = f"a{i}"
+
+            if (own := errors.get(alias) or errors.get(None)) is not None:
+                if all(error.get("type") == "NOT_FOUND" for error in own):
+                    future.set_result(None)
+                else:
+                    future.set_exception(GraphQLError(own))
+            else:
+                future.set_result(data.get(alias))
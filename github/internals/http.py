@@ -1,18 +1,47 @@
 from __future__ import annotations
 
-__all__ = ("HTTPClient",)
+__all__ = ("BatchResult", "HTTPClient")
 
 import asyncio
+import functools
+import hashlib
 import logging
+import os
 import platform
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any, Awaitable, Dict, List, Literal, NamedTuple, Optional, Union
-
-from aiohttp import ClientSession, __version__ as aiohttp_version
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from aiohttp import ClientError, __version__ as aiohttp_version
+from yarl import URL
 
 from ..errors import error_from_request
 from ..utils import human_readable_time_until
+from .budget import Budget
+from .decode import json_loads_in_slices
+from .latency import LatencyTracker
+from .middleware import Middleware, RequestContext
+from .route import Route
+from .tracing import RequestTiming
+from .transport import Transport
+from .upload import Base64JSONPayload
 
 try:
     import orjson  # type: ignore
@@ -24,7 +53,9 @@ else:
     json_loads = orjson.loads
 
 if TYPE_CHECKING:
-    from aiohttp import BasicAuth
+    from concurrent.futures import Executor
+
+    from aiohttp import BasicAuth, ClientResponse
     from typing_extensions import Self
 
     from ..objects import File
@@ -34,6 +65,43 @@ if TYPE_CHECKING:
 log = logging.getLogger("github")
 
 
+# Accept media types GitHub has for some routes, as application/vnd.github.<name>
+MediaType = Literal["raw", "html", "text", "full", "object", "diff", "patch", "sha", "base64"]
+# What request returns: the body decoded from JSON or text, or the bytes as they came
+BodyType = Literal["decoded", "bytes", "memoryview"]
+
+
+def _accept(media_type: str, /) -> str:
+    # Full media types are kept as they are
+    return media_type if "/" in media_type else f"application/vnd.github.{media_type}"
+
+
+def _is_json(content_type: str, /) -> bool:
+    # Like 'application/json; charset=utf-8' or 'application/vnd.github.raw+json'
+    mime = content_type.partition(";")[0].strip().lower()
+    return mime == "application/json" or mime.endswith("+json")
+
+
+async def _error_message(response: ClientResponse, /) -> Optional[str]:
+    # GitHub explains most errors in the 'message' of a JSON body
+    if not _is_json(response.headers.get("Content-Type", "")):
+        return None
+
+    try:
+        data = json_loads(await response.read())
+    except (ClientError, ValueError):
+        return None
+
+    return data.get("message") if isinstance(data, dict) else None
+
+
+def _timed_json_loads(body: bytes, /) -> Tuple[Any, float]:
+    # Runs in the decode executor, the time is what the loop would have been blocked for
+    start = time.perf_counter()
+    data = json_loads(body)
+    return data, time.perf_counter() - start
+
+
 class RateLimits(NamedTuple):
     remaining: int
     used: int
@@ -42,6 +110,18 @@ class RateLimits(NamedTuple):
     last_request: datetime
 
 
+class BatchResult(NamedTuple):
+    # The position of the item in the batch
+    index: int
+    item: Any
+    result: Any
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 # ====== STYLE GUIDE ===== #
 # All route method names should be
 # The exact same from the GitHub API
@@ -59,6 +139,10 @@ class RateLimits(NamedTuple):
 # Make markdown raw request route (???)
 
 # === ROUTES CHECKLIST === #
+# Groups that aren't DONE can be generated from the OpenAPI description with:
+# python -m tools.unschema -r -f api.github.com.json --tags <tag> \
+#     --exclude-from github/internals/http.py
+# The output is reviewed and pasted in here by hand, nothing generated is imported.
 # Actions
 # Activity
 # Apps
@@ -77,7 +161,7 @@ class RateLimits(NamedTuple):
 # Emojis                     DONE
 # Enterprise administration
 # Gists                      DONE
-# Git database
+# Git database               DONE
 # Gitignore                  DONE
 # Interactions
 # Issues
@@ -104,24 +188,36 @@ class RateLimits(NamedTuple):
 
 
 class HTTPClient:
-    __session: ClientSession
+    __transport: Transport
+    __owns_transport: bool
+    __headers: Dict[str, str]
+    __auth: Optional[BasicAuth]
+    __base_url: Optional[URL]
+    __middlewares: List[Middleware]
+    __before_send: List[Callable[[RequestContext], Awaitable[None]]]
+    __after_receive: List[Callable[[RequestContext], Awaitable[None]]]
+    __on_error: List[Callable[[RequestContext, Exception], Awaitable[None]]]
+    __budget: Budget
+    __token_id: str
+    __decode_threshold: Optional[int]
+    __decode_executor: Optional[Executor]
     _rates: RateLimits
-    _last_ping: float
-    _latency: float
-
-    def __new__(cls, **kwargs: Any) -> Awaitable[HTTPClient]:
-        # Basically async def __init__
-        return cls.__async_init(**kwargs)
+    _latencies: LatencyTracker
+    offloaded_decodes: int
+    avoided_loop_time: float
 
-    @classmethod
-    async def __async_init(
-        cls,
+    def __init__(
+        self,
         *,
         headers: Optional[Dict[str, str]] = None,
         auth: Optional[BasicAuth] = None,
-    ) -> HTTPClient:
-        self = super(cls, cls).__new__(cls)
-
+        transport: Optional[Transport] = None,
+        base_url: Optional[str] = None,
+        middlewares: Optional[Iterable[Middleware]] = None,
+        budget: Optional[Budget] = None,
+        decode_threshold: Optional[int] = 1024 * 1024,
+        decode_executor: Optional[Executor] = None,
+    ) -> None:
         headers = headers or {}
 
         headers.setdefault(
@@ -130,22 +226,61 @@ class HTTPClient:
             f" 2.0.0a CPython/{platform.python_version()} aiohttp/{aiohttp_version}",
         )
 
-        self.__session = ClientSession(headers=headers, auth=auth)
+        self.__headers = headers
+        self.__auth = auth
+
+        # A shared transport is closed by whoever made it. Nothing is connected
+        # until the first request, so clients can be made at import time or before forking.
+        self.__owns_transport = transport is None
+        self.__middlewares = list(middlewares or ())
+
+        self.__transport = transport or Transport()
+
+        # For GitHub Enterprise Server, e.g. 'https://github.example.com/api/v3'
+        self.__base_url = None if base_url is None else URL(base_url)
+
+        self.__build_middleware_stages()
 
         time_0 = datetime.fromtimestamp(0)
 
         self._rates = RateLimits(60, 0, 60, time_0, time_0)
 
-        self._last_ping = float("-inf")
-        self._latency = 0
+        self._latencies = LatencyTracker()
 
+        # Shared between clients to see every tenant's usage in one place
+        self.__budget = budget or Budget()
+
+        # Tokens are never stored in the budget, only a fingerprint of them
+        credentials = headers.get("Authorization") or (auth and auth.encode()) or ""
+        self.__token_id = (
+            hashlib.sha256(credentials.encode()).hexdigest()[:12] if credentials else "anonymous"
+        )
+
+        # JSON bodies bigger than this many bytes are decoded in slices that let
+        # other tasks run, or in the executor if given, which is only worth it on
+        # free-threaded builds or with decoders that release the GIL. None never offloads.
+        # Slices cost throughput, a 200k element array takes about twice as long to
+        # decode (0.37s instead of 0.17s), in exchange for the loop never blocking long.
+        self.__decode_threshold = decode_threshold
+        self.__decode_executor = decode_executor
+
+        # How many decodes were offloaded, and the seconds of loop blocking that avoided
+        self.offloaded_decodes = 0
+        self.avoided_loop_time = 0.0
+
+    def __await__(self) -> Generator[Any, None, Self]:
+        # So 'await HTTPClient()' keeps working
+        return self.__ready().__await__()
+
+    async def __ready(self) -> Self:
         return self
 
     async def __aenter__(self) -> Self:
         return self
 
     async def __aexit__(self, *_) -> None:
-        await self.__session.close()
+        if self.__owns_transport:
+            await self.__transport.close()
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}>"
@@ -154,27 +289,112 @@ class HTTPClient:
     def is_ratelimited(self) -> bool:
         return self._rates.remaining < 2
 
-    async def latency(self) -> float:
-        last_ping = self._last_ping
+    @property
+    def budget(self) -> Budget:
+        return self.__budget
+
+    @property
+    def token_id(self) -> str:
+        return self.__token_id
+
+    def forecast_exhaustion(self, *, resource: str = "core") -> Optional[datetime]:
+        """When this client's token runs out of ``resource`` budget at the current rate.
+
+        None if it lasts until the ratelimit resets.
+        """
+        return self.__budget.forecast(token=self.__token_id, resource=resource)
 
-        # If there was no ping or the last ping was more than 5 seconds ago (or is currently ratelimited).
-        if not self.is_ratelimited and time.monotonic() > last_ping + 5:
-            self._last_ping = time.monotonic()
+    @property
+    def latencies(self) -> LatencyTracker:
+        return self._latencies
+
+    async def latency(self) -> float:
+        latencies = self._latencies
 
-            start = time.monotonic()
+        # Real requests are measured as they happen, GitHub is only
+        # pinged if there were none in the last 5 seconds (and it isn't ratelimited).
+        if not self.is_ratelimited and latencies.idle_for() > 5:
             await self.get_github_api_root()
-            self._latency = time.monotonic() - start
 
-        return self._latency
+        return latencies.ewma or 0.0
+
+    def add_middleware(self, middleware: Middleware, /) -> None:
+        self.__middlewares.append(middleware)
+        self.__build_middleware_stages()
+
+    def remove_middleware(self, middleware: Middleware, /) -> None:
+        self.__middlewares.remove(middleware)
+        self.__build_middleware_stages()
+
+    def __build_middleware_stages(self) -> None:
+        # Only overridden stages are kept, so a middleware pays for what it uses
+        def stage(name: str, middlewares: List[Middleware]) -> List[Any]:
+            return [
+                getattr(middleware, name)
+                for middleware in middlewares
+                if getattr(type(middleware), name) is not getattr(Middleware, name)
+            ]
+
+        middlewares = self.__middlewares
+
+        self.__before_send = stage("before_send", middlewares)
+        self.__after_receive = stage("after_receive", middlewares[::-1])
+        self.__on_error = stage("on_error", middlewares[::-1])
 
     async def request(
-        self, method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"], path: str, /, **kwargs: Any
+        self,
+        route: Route,
+        /,
+        *,
+        media_type: Optional[Union[MediaType, str]] = None,
+        body_type: BodyType = "decoded",
+        **kwargs: Any,
     ):
+        """Sends a request to GitHub and returns the response body.
+
+        ``media_type`` is sent as the Accept header, a name like 'raw' or a full
+        media type. JSON bodies (with a JSON or '+json' content type) are decoded
+        and other bodies are returned as str, unless ``body_type`` asks for the
+        bytes, or a memoryview of them, without any decoding.
+        """
+        if media_type is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Accept": _accept(media_type)}
+
+        # No middlewares, no context
+        if not self.__middlewares:
+            return await self.__send(route, kwargs, None, body_type)
+
+        ctx = RequestContext(self, route, kwargs, body_type=body_type)
+
+        try:
+            for before_send in self.__before_send:
+                await before_send(ctx)
+
+                if ctx.responded:
+                    break
+            else:
+                ctx.data = await self.__send(route, ctx.kwargs, ctx, ctx.body_type)
+
+        except Exception as error:
+            for on_error in self.__on_error:
+                await on_error(ctx, error)
+
+                if ctx.responded:
+                    break
+            else:
+                raise
+
+        for after_receive in self.__after_receive:
+            await after_receive(ctx)
+
+        return ctx.data
+
+    async def __prepare(self, route: Route, ctx: Optional[RequestContext], /) -> URL:
         if self.is_ratelimited:
             log.info(
                 "Ratelimit exceeded, trying again in"
                 f" {human_readable_time_until(self._rates.reset_time - datetime.now(timezone.utc))} (URL:"
-                f" {path}, method: {method})"
+                f" {route.url}, method: {route.method})"
             )
 
             # TODO: I get about 3-4 hours of cooldown
@@ -184,37 +404,315 @@ class HTTPClient:
                 max((self._rates.reset_time - datetime.now(timezone.utc)).total_seconds(), 0)
             )
 
-        async with self.__session.request(
-            method, f"https://api.github.com{path}", **kwargs
-        ) as response:
-            headers = response.headers
-
-            self._rates = RateLimits(
-                int(headers["X-RateLimit-Remaining"]),
-                int(headers["X-RateLimit-Used"]),
-                int(headers["X-RateLimit-Limit"]),
-                datetime.fromtimestamp(int(headers["X-RateLimit-Reset"])).replace(
-                    tzinfo=timezone.utc
-                ),
-                datetime.now(timezone.utc),
+        url = route.url
+        if (base_url := self.__base_url) is not None:
+            url = base_url.with_path(base_url.raw_path.rstrip("/") + url.raw_path, encoded=True)
+
+        if ctx is not None and ctx.trace is not None:
+            ctx.trace.url = url
+
+        return url
+
+    def __headers_for(self, kwargs: Dict[str, Any], /) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        # Headers given for one request are added to the client's
+        if "headers" not in kwargs:
+            return self.__headers, kwargs
+
+        kwargs = kwargs.copy()
+        return {**self.__headers, **kwargs.pop("headers")}, kwargs
+
+    @staticmethod
+    def __timed(kwargs: Dict[str, Any], /) -> Tuple[Dict[str, Any], RequestTiming]:
+        # The hooks of the transport mark when the connection was ready, so waiting for
+        # a free connection and making one isn't counted as latency
+        if isinstance(timing := kwargs.get("trace_request_ctx"), RequestTiming):
+            return kwargs, timing
+
+        timing = RequestTiming()
+        return {**kwargs, "trace_request_ctx": timing}, timing
+
+    def __received(
+        self,
+        route: Route,
+        response: ClientResponse,
+        ctx: Optional[RequestContext],
+        start: float,
+        received: float,
+        /,
+    ) -> None:
+        headers = response.headers
+
+        self._latencies.record(received - start)
+
+        if ctx is not None:
+            ctx.status = response.status
+            ctx.headers = headers
+
+            if (trace := ctx.trace) is not None:
+                trace.status = response.status
+                trace.request_id = headers.get("X-GitHub-Request-Id")
+                trace.ttfb = received - start
+
+        if "X-RateLimit-Remaining" not in headers:
+            # Redirects to other hosts, like codeload.github.com for archives, don't have them
+            for redirect in response.history:
+                if "X-RateLimit-Remaining" in redirect.headers:
+                    headers = redirect.headers
+                    break
+            else:
+                return
+
+        rates = self._rates = RateLimits(
+            int(headers["X-RateLimit-Remaining"]),
+            int(headers["X-RateLimit-Used"]),
+            int(headers["X-RateLimit-Limit"]),
+            datetime.fromtimestamp(int(headers["X-RateLimit-Reset"])).replace(tzinfo=timezone.utc),
+            datetime.now(timezone.utc),
+        )
+
+        # Conditional requests that weren't modified are free
+        if response.status != 304:
+            self.__budget.record(
+                resource=headers.get("X-RateLimit-Resource", "core"),
+                route=route.path,
+                token=self.__token_id,
+                remaining=rates.remaining,
+                limit=rates.total,
+                reset_time=rates.reset_time,
             )
 
-            if 200 <= response.status <= 299:
-                data = await response.text(encoding="utf-8")
+    async def __send(
+        self,
+        route: Route,
+        kwargs: Dict[str, Any],
+        ctx: Optional[RequestContext],
+        body_type: BodyType,
+        /,
+    ) -> Any:
+        url = await self.__prepare(route, ctx)
+        headers, kwargs = self.__headers_for(kwargs)
+        kwargs, timing = self.__timed(kwargs)
+        trace = None if ctx is None else ctx.trace
+
+        start = time.perf_counter()
+
+        async with self.__transport.session.request(
+            route.method, url, headers=headers, auth=self.__auth, **kwargs
+        ) as response:
+            received = time.perf_counter()
+            self.__received(route, response, ctx, timing.connected or start, received)
 
-                if response.headers["Content-Type"] == "application/json":
-                    return json_loads(data)
+            if 200 <= response.status <= 299:
+                body = await response.read()
+                read = time.perf_counter()
+
+                if ctx is not None:
+                    ctx.size = len(body)
+
+                if body_type == "bytes":
+                    data = body
+                elif body_type == "memoryview":
+                    data = memoryview(body)
+                # Both json and orjson take bytes, there's no need to decode first
+                elif _is_json(response.headers.get("Content-Type", "")):
+                    threshold = self.__decode_threshold
+
+                    if threshold is not None and len(body) > threshold:
+                        if (executor := self.__decode_executor) is None:
+                            data, avoided = await json_loads_in_slices(body)
+                        else:
+                            data, avoided = await asyncio.get_running_loop().run_in_executor(
+                                executor, _timed_json_loads, body
+                            )
+
+                        self.offloaded_decodes += 1
+                        self.avoided_loop_time += avoided
+
+                        if ctx is not None:
+                            ctx.extras["avoided_loop_time"] = avoided
+                    else:
+                        data = json_loads(body)
+                else:
+                    data = body.decode(response.charset or "utf-8")
+
+                if trace is not None:
+                    trace.read = read - received
+                    trace.decode = time.perf_counter() - read
 
                 return data
 
-            raise error_from_request(response)
+            raise error_from_request(response, await _error_message(response))
+
+    @asynccontextmanager
+    async def stream(self, route: Route, /, **kwargs: Any) -> AsyncIterator[ClientResponse]:
+        """Sends a request and gives the response without reading its body.
+
+        Ratelimits are handled like in ``request``, but middlewares aren't run,
+        as there is no data for them. Raises for unsuccessful responses.
+        """
+        url = await self.__prepare(route, None)
+        headers, kwargs = self.__headers_for(kwargs)
+        kwargs, timing = self.__timed(kwargs)
+
+        start = time.perf_counter()
+
+        async with self.__transport.session.request(
+            route.method, url, headers=headers, auth=self.__auth, **kwargs
+        ) as response:
+            self.__received(route, response, None, timing.connected or start, time.perf_counter())
+
+            if not 200 <= response.status <= 299:
+                raise error_from_request(response, await _error_message(response))
+
+            yield response
+
+    async def batch(
+        self,
+        route: str,
+        kwargs: Iterable[Dict[str, Any]],
+        /,
+        *,
+        concurrency: int = 10,
+        ordered: bool = True,
+        resource: str = "core",
+        keep: int = 0,
+    ) -> AsyncIterator[BatchResult]:
+        """Calls the route named ``route`` once per keyword arguments dict, concurrently.
+
+        E.g. ``async for result in http.batch("get_repo", ({"owner": o, "repo": r} for ...))``.
+        The item of each result is its dict. See ``batch_calls`` for the rest.
+        """
+        method = getattr(type(self), route)
+
+        async for result in self.__batch(
+            ((arguments, functools.partial(method, **arguments)) for arguments in kwargs),
+            concurrency,
+            ordered,
+            resource,
+            keep,
+        ):
+            yield result
+
+    async def batch_calls(
+        self,
+        calls: Iterable[Callable[[HTTPClient], Awaitable[Any]]],
+        /,
+        *,
+        concurrency: int = 10,
+        ordered: bool = True,
+        resource: str = "core",
+        keep: int = 0,
+    ) -> AsyncIterator[BatchResult]:
+        """Runs many calls, at most ``concurrency`` at a time, and yields a result per call.
+
+        Each call gets this client, e.g. ``lambda http: http.get_repo(owner=..., repo=...)``,
+        and ``calls`` is only consumed as calls can start, so it can be a generator
+        of any size. Results come in the order of ``calls``, or as they complete
+        without ``ordered``. An error fails only its own call, it is in the
+        ``error`` of its result.
+
+        Calls aren't started while the latest ratelimit of ``resource`` has no more
+        than ``keep`` requests left besides the ones in flight, until it resets.
+        Leaving the loop early cancels the calls in flight.
+        """
+        async for result in self.__batch(
+            ((call, call) for call in calls), concurrency, ordered, resource, keep
+        ):
+            yield result
+
+    async def __batch(
+        self,
+        items: Iterable[Tuple[Any, Callable[..., Awaitable[Any]]]],
+        concurrency: int,
+        ordered: bool,
+        resource: str,
+        keep: int,
+        /,
+    ) -> AsyncIterator[BatchResult]:
+        async def run(index: int, item: Any, call: Callable[..., Awaitable[Any]]) -> BatchResult:
+            try:
+                return BatchResult(index, item, await call(self), None)
+            except Exception as error:
+                return BatchResult(index, item, None, error)
+
+        numbered = enumerate(items)
+        in_flight: Set[asyncio.Future[BatchResult]] = set()
+        # Results that finished before the ones before them, when ordered
+        finished: Dict[int, BatchResult] = {}
+        next_index = 0
+        exhausted = False
+
+        try:
+            while True:
+                # A slow call holds up the ordered results, so the buffer is bounded too
+                while (
+                    not exhausted
+                    and len(in_flight) < concurrency
+                    and len(finished) < concurrency * 4
+                ):
+                    if (wait := self.__batch_wait(resource, keep, len(in_flight))) is None:
+                        break
+
+                    if wait:
+                        log.info(
+                            f"Ratelimit budget of {resource!r} spent, batch paused for {wait:.0f}s."
+                        )
+                        await asyncio.sleep(wait)
+
+                    try:
+                        index, (item, call) = next(numbered)
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    in_flight.add(asyncio.ensure_future(run(index, item, call)))
+
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in sorted(done, key=lambda task: task.result().index):
+                    result = task.result()
+
+                    if ordered:
+                        finished[result.index] = result
+                    else:
+                        yield result
+
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def __batch_wait(self, resource: str, keep: int, in_flight: int, /) -> Optional[float]:
+        # Seconds to wait before starting a call, None to wait for the calls in flight first
+        if (window := self.__budget.latest(token=self.__token_id, resource=resource)) is None:
+            return 0.0
+
+        if window.remaining - in_flight > keep:
+            return 0.0
+
+        wait = (window.reset_time - datetime.now(timezone.utc)).total_seconds()
+        if wait <= 0:
+            return 0.0
+
+        # Their responses will tell how much is really left
+        if in_flight:
+            return None
+
+        return wait
 
     # === ROUTES === #
 
     # === USERS === #
 
     async def get_authenticated_user(self):
-        return await self.request("GET", "/user")
+        return await self.request(Route("GET", "/user"))
 
     async def update_authenticated_user(
         self,
@@ -247,7 +745,7 @@ class HTTPClient:
         if bio:
             data["bio"] = bio
 
-        return await self.request("PATCH", "/user", json=data)
+        return await self.request(Route("PATCH", "/user"), json=data)
 
     async def list_users(self, *, since: Optional[int] = None, per_page: Optional[int] = None):
         params = {}
@@ -257,10 +755,10 @@ class HTTPClient:
         if per_page:
             params["per_page"] = per_page
 
-        return await self.request("GET", "/users", params=params)
+        return await self.request(Route("GET", "/users"), params=params)
 
     async def get_user(self, *, username: str):
-        return await self.request("GET", f"/users/{username}")
+        return await self.request(Route("GET", "/users/{username}", username=username))
 
     async def get_context_info_for_user(
         self,
@@ -278,25 +776,27 @@ class HTTPClient:
         if subject_id:
             params["subject_id"] = subject_id
 
-        return await self.request("GET", f"/users/{username}/hovercard", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/hovercard", username=username), params=params
+        )
 
     async def list_blocked_users_for_authenticated_user(self):
-        return await self.request("GET", "/user/blocks")
+        return await self.request(Route("GET", "/user/blocks"))
 
     async def check_user_blocked_for_authenticated_user(self, *, username: str):
-        return await self.request("GET", f"/user/blocks/{username}")
+        return await self.request(Route("GET", "/user/blocks/{username}", username=username))
 
     async def block_user(self, *, username: str):
-        return await self.request("PUT", f"/user/blocks/{username}")
+        return await self.request(Route("PUT", "/user/blocks/{username}", username=username))
 
     async def unblock_user(self, *, username: str):
-        return await self.request("DELETE", f"/user/blocks/{username}")
+        return await self.request(Route("DELETE", "/user/blocks/{username}", username=username))
 
     async def set_primary_email_visibility_for_authenticated_user(
         self, *, visibility: Literal["public", "private"]
     ):
         return await self.request(
-            "PATCH", "/user/email/visibility", json={"visibility": visibility}
+            Route("PATCH", "/user/email/visibility"), json={"visibility": visibility}
         )
 
     async def list_email_addresses_for_the_authenticated_user(
@@ -309,13 +809,13 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/user/emails", params=params)
+        return await self.request(Route("GET", "/user/emails"), params=params)
 
     async def add_email_addresses_for_the_authenticated_user(self, *, emails: List[str]):
-        return await self.request("POST", "/user/emails", json={"email": emails})
+        return await self.request(Route("POST", "/user/emails"), json={"email": emails})
 
     async def delete_email_addresses_for_the_authenticated_user(self, *, emails: List[str]):
-        return await self.request("DELETE", "/user/emails", json={"email": emails})
+        return await self.request(Route("DELETE", "/user/emails"), json={"email": emails})
 
     async def list_public_email_addresses_for_the_authenticated_user(
         self, *, per_page: Optional[int] = None, page: Optional[int] = None
@@ -327,7 +827,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/user/emails/public", params=params)
+        return await self.request(Route("GET", "/user/emails/public"), params=params)
 
     async def list_followers_of_the_authenticated_user(
         self, *, per_page: Optional[int] = None, page: Optional[int] = None
@@ -339,7 +839,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/user/followers", params=params)
+        return await self.request(Route("GET", "/user/followers"), params=params)
 
     async def list_following_for_the_authenticated_user(
         self, *, per_page: Optional[int] = None, page: Optional[int] = None
@@ -351,16 +851,16 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/user/following", params=params)
+        return await self.request(Route("GET", "/user/following"), params=params)
 
     async def check_person_followed_by_authenticated_user(self, *, username: str):
-        return await self.request("GET", f"/user/following/{username}")
+        return await self.request(Route("GET", "/user/following/{username}", username=username))
 
     async def follow_user(self, *, username: str):
-        return await self.request("PUT", f"/user/following/{username}")
+        return await self.request(Route("PUT", "/user/following/{username}", username=username))
 
     async def unfollow_user(self, *, username: str):
-        return await self.request("DELETE", f"/user/following/{username}")
+        return await self.request(Route("DELETE", "/user/following/{username}", username=username))
 
     async def list_followers_for_user(
         self, *, username: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -372,7 +872,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/users/{username}/followers", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/followers", username=username), params=params
+        )
 
     async def list_following_for_user(
         self, *, username: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -384,10 +886,19 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/users/{username}/following", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/following", username=username), params=params
+        )
 
     async def check_user_follows_another_user(self, *, username: str, target_user: str):
-        return await self.request("GET", f"/users/{username}/following/{target_user}")
+        return await self.request(
+            Route(
+                "GET",
+                "/users/{username}/following/{target_user}",
+                username=username,
+                target_user=target_user,
+            )
+        )
 
     async def list_gpg_keys_for_authenticated_user(
         self, *, per_page: Optional[int] = None, page: Optional[int] = None
@@ -399,7 +910,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/user/gpg_keys", params=params)
+        return await self.request(Route("GET", "/user/gpg_keys"), params=params)
 
     async def create_gpg_key_for_authenticated_user(
         self, *, name: Optional[str] = None, armored_public_key: str
@@ -411,13 +922,17 @@ class HTTPClient:
         if name:
             data["name"] = name
 
-        return await self.request("POST", "/user/gpg_keys", json=data)
+        return await self.request(Route("POST", "/user/gpg_keys"), json=data)
 
     async def get_gpg_key_for_authenticated_user(self, *, gpg_key_id: int):
-        return await self.request("GET", f"/user/gpg_keys/{gpg_key_id}")
+        return await self.request(
+            Route("GET", "/user/gpg_keys/{gpg_key_id}", gpg_key_id=gpg_key_id)
+        )
 
     async def delete_gpg_key_for_authenticated_user(self, *, gpg_key_id: int):
-        return await self.request("DELETE", f"/user/gpg_keys/{gpg_key_id}")
+        return await self.request(
+            Route("DELETE", "/user/gpg_keys/{gpg_key_id}", gpg_key_id=gpg_key_id)
+        )
 
     async def list_gpg_keys_for_user(
         self, *, username: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -429,7 +944,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/users/{username}/gpg_keys", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/gpg_keys", username=username), params=params
+        )
 
     async def list_public_ssh_keys_for_authenticated_user(
         self, *, per_page: Optional[int] = None, page: Optional[int] = None
@@ -441,7 +958,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/user/keys", params=params)
+        return await self.request(Route("GET", "/user/keys"), params=params)
 
     async def create_public_ssh_key_for_authenticated_user(
         self, *, title: Optional[str] = None, key: str
@@ -453,13 +970,13 @@ class HTTPClient:
         if title:
             data["title"] = title
 
-        return await self.request("POST", "/user/keys", json=data)
+        return await self.request(Route("POST", "/user/keys"), json=data)
 
     async def get_public_ssh_key_for_authenticated_user(self, *, key_id: int):
-        return await self.request("GET", f"/user/keys/{key_id}")
+        return await self.request(Route("GET", "/user/keys/{key_id}", key_id=key_id))
 
     async def delete_public_ssh_key_for_authenticated_user(self, *, key_id: int):
-        return await self.request("DELETE", f"/user/keys/{key_id}")
+        return await self.request(Route("DELETE", "/user/keys/{key_id}", key_id=key_id))
 
     async def list_public_ssh_keys_for_user(
         self, *, username: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -471,7 +988,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/users/{username}/keys", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/keys", username=username), params=params
+        )
 
     # === REPOS === #
 
@@ -500,7 +1019,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/orgs/{org}/repos", params=params)
+        return await self.request(Route("GET", "/orgs/{org}/repos", org=org), params=params)
 
     async def create_org_repo(
         self,
@@ -567,10 +1086,10 @@ class HTTPClient:
         if use_squash_pr_title_as_default:
             data["use_squash_pr_title_as_default"] = use_squash_pr_title_as_default
 
-        return await self.request("POST", f"/orgs/{org}/repos", json=data)
+        return await self.request(Route("POST", "/orgs/{org}/repos", org=org), json=data)
 
     async def get_repo(self, *, owner: str, repo: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}")
+        return await self.request(Route("GET", "/repos/{owner}/{repo}", owner=owner, repo=repo))
 
     async def update_repo(
         self,
@@ -638,16 +1157,24 @@ class HTTPClient:
         if allow_forking:
             data["allow_forking"] = allow_forking
 
-        return await self.request("PATCH", f"/repos/{owner}/{repo}", json=data)
+        return await self.request(
+            Route("PATCH", "/repos/{owner}/{repo}", owner=owner, repo=repo), json=data
+        )
 
     async def delete_repo(self, *, owner: str, repo: str):
-        return await self.request("DELETE", f"/repos/{owner}/{repo}")
+        return await self.request(Route("DELETE", "/repos/{owner}/{repo}", owner=owner, repo=repo))
 
     async def enable_automated_security_fixes_for_repo(self, *, owner: str, repo: str):
-        return await self.request("PUT", f"/repos/{owner}/{repo}/automated-security-fixes")
+        return await self.request(
+            Route("PUT", "/repos/{owner}/{repo}/automated-security-fixes", owner=owner, repo=repo)
+        )
 
     async def disable_automated_security_fixes_for_repo(self, *, owner: str, repo: str):
-        return await self.request("DELETE", f"/repos/{owner}/{repo}/automated-security-fixes")
+        return await self.request(
+            Route(
+                "DELETE", "/repos/{owner}/{repo}/automated-security-fixes", owner=owner, repo=repo
+            )
+        )
 
     async def list_codeowners_errors_for_repo(
         self, *, owner: str, repo: str, ref: Optional[str] = None
@@ -657,7 +1184,10 @@ class HTTPClient:
         if ref:
             params["ref"] = ref
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/codeowners/errors", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/codeowners/errors", owner=owner, repo=repo),
+            params=params,
+        )
 
     async def list_repo_contributors(
         self,
@@ -677,7 +1207,10 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/contributors", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/contributors", owner=owner, repo=repo),
+            params=params,
+        )
 
     async def create_repo_dispatch_event(
         self, *, owner: str, repo: str, event_name: str, client_payload: Optional[str] = None
@@ -689,10 +1222,14 @@ class HTTPClient:
         if client_payload:
             data["client_payload"] = client_payload
 
-        return await self.request("POST", f"/repos/{owner}/{repo}/dispatches", json=data)
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/dispatches", owner=owner, repo=repo), json=data
+        )
 
     async def list_repo_languages(self, *, owner: str, repo: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}/languages")
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/languages", owner=owner, repo=repo)
+        )
 
     async def list_repo_tags(
         self, *, owner: str, repo: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -704,7 +1241,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/tags", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/tags", owner=owner, repo=repo), params=params
+        )
 
     async def list_repo_teams(
         self, *, owner: str, repo: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -716,7 +1255,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/teams", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/teams", owner=owner, repo=repo), params=params
+        )
 
     async def get_all_repo_topics(
         self, *, owner: str, repo: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -728,10 +1269,15 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/topics", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/topics", owner=owner, repo=repo), params=params
+        )
 
     async def replace_all_repo_topics(self, *, owner: str, repo: str, names: List[str]):
-        return await self.request("PUT", f"/repos/{owner}/{repo}/topics", json={"names": names})
+        return await self.request(
+            Route("PUT", "/repos/{owner}/{repo}/topics", owner=owner, repo=repo),
+            json={"names": names},
+        )
 
     async def transfer_repo(
         self, *, owner: str, repo: str, new_owner: str, team_ids: Optional[List[int]] = None
@@ -743,16 +1289,24 @@ class HTTPClient:
         if team_ids:
             data["team_ids"] = team_ids
 
-        return await self.request("POST", f"/repos/{owner}/{repo}/transfer", json=data)
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/transfer", owner=owner, repo=repo), json=data
+        )
 
     async def check_vulnerability_alerts_enabled_for_repo(self, *, owner: str, repo: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}/vulnerability-alerts")
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/vulnerability-alerts", owner=owner, repo=repo)
+        )
 
     async def enable_repo_vulnerability_alerts(self, *, owner: str, repo: str):
-        return await self.request("PUT", f"/repos/{owner}/{repo}/vulnerability-alerts")
+        return await self.request(
+            Route("PUT", "/repos/{owner}/{repo}/vulnerability-alerts", owner=owner, repo=repo)
+        )
 
     async def disable_repo_vulnerability_alerts(self, *, owner: str, repo: str):
-        return await self.request("DELETE", f"/repos/{owner}/{repo}/vulnerability-alerts")
+        return await self.request(
+            Route("DELETE", "/repos/{owner}/{repo}/vulnerability-alerts", owner=owner, repo=repo)
+        )
 
     async def create_repo_using_template(
         self,
@@ -776,7 +1330,13 @@ class HTTPClient:
             data["private"] = private
 
         return await self.request(
-            "POST", f"/repos/{template_owner}/{template_repo}/generate", json=data
+            Route(
+                "POST",
+                "/repos/{template_owner}/{template_repo}/generate",
+                template_owner=template_owner,
+                template_repo=template_repo,
+            ),
+            json=data,
         )
 
     async def list_public_repos(self, *, since: Optional[int] = None):
@@ -785,7 +1345,7 @@ class HTTPClient:
         if since:
             params["since"] = since
 
-        return await self.request("GET", "/repositories", params=params)
+        return await self.request(Route("GET", "/repositories"), params=params)
 
     async def list_repos_for_authenticated_user(
         self,
@@ -821,7 +1381,7 @@ class HTTPClient:
         if before:
             data["before"] = before
 
-        return self.request("POST", "/user/repos", json=data)
+        return self.request(Route("POST", "/user/repos"), json=data)
 
     async def create_repo_for_authenticated_user(
         self,
@@ -884,7 +1444,7 @@ class HTTPClient:
         if is_template:
             data["is_template"] = is_template
 
-        return await self.request("POST", "/user/repos", json=data)
+        return await self.request(Route("POST", "/user/repos"), json=data)
 
     async def list_repos_for_user(
         self,
@@ -911,7 +1471,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/users/{username}/repos", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/repos", username=username), params=params
+        )
 
     async def list_repo_autolinks(self, *, owner: str, repo: str, page: Optional[int] = None):
         params = {}
@@ -919,32 +1481,85 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/autolinks", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/autolinks", owner=owner, repo=repo), params=params
+        )
 
     async def create_autolink_reference_for_repo(
         self, *, owner: str, repo: str, key_prefix: str, url_template: str
     ):
         return await self.request(
-            "POST",
-            f"/repos/{owner}/{repo}/autolinks",
+            Route("POST", "/repos/{owner}/{repo}/autolinks", owner=owner, repo=repo),
             json={"key_prefix": key_prefix, "url_template": url_template},
         )
 
     async def get_autolink_reference_for_repo(self, *, owner: str, repo: str, autolink_id: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}/autolinks/{autolink_id}")
+        return await self.request(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/autolinks/{autolink_id}",
+                owner=owner,
+                repo=repo,
+                autolink_id=autolink_id,
+            )
+        )
 
     async def delete_autolink_reference_for_repo(self, *, owner: str, repo: str, autolink_id: str):
-        return await self.request("DELETE", f"/repos/{owner}/{repo}/autolinks/{autolink_id}")
+        return await self.request(
+            Route(
+                "DELETE",
+                "/repos/{owner}/{repo}/autolinks/{autolink_id}",
+                owner=owner,
+                repo=repo,
+                autolink_id=autolink_id,
+            )
+        )
 
     async def get_repo_content(
-        self, *, owner: str, repo: str, path: str, ref: Optional[str] = None
+        self,
+        *,
+        owner: str,
+        repo: str,
+        path: str,
+        ref: Optional[str] = None,
+        media_type: Optional[Literal["raw", "html", "object"]] = None,
     ):
         params = {}
 
         if ref:
             params["ref"] = ref
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/contents/{path}", params=params)
+        return await self.request(
+            Route(
+                "GET", "/repos/{owner}/{repo}/contents/{path}", owner=owner, repo=repo, path=path
+            ),
+            params=params,
+            media_type=media_type,
+        )
+
+    async def get_repo_content_bytes(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        path: str,
+        ref: Optional[str] = None,
+        body_type: Literal["bytes", "memoryview"] = "bytes",
+    ) -> Union[bytes, memoryview]:
+        """The content of a file as it is, without the base64 in JSON of get_repo_content."""
+        params = {}
+
+        if ref:
+            params["ref"] = ref
+
+        return await self.request(
+            Route(
+                "GET", "/repos/{owner}/{repo}/contents/{path}", owner=owner, repo=repo, path=path
+            ),
+            params=params,
+            media_type="raw",
+            body_type=body_type,
+        )
 
     async def create_or_update_repo_file_contents(
         self,
@@ -953,16 +1568,20 @@ class HTTPClient:
         repo: str,
         path: str,
         message: str,
-        content: str,
+        content: Union[str, File],
         sha: Optional[str] = None,
         branch: Optional[str] = None,
         committer: Optional[Committer] = None,
         author: Optional[Author] = None,
     ):
-        data: Dict[str, Union[str, Committer, Author]] = {
-            "message": message,
-            "content": content,
-        }
+        """Creates or replaces a file. ``content`` is either the content in base64 already,
+        or a File, which is encoded a chunk at a time while being sent, so big and
+        binary files can be uploaded without holding them in memory.
+        """
+        data: Dict[str, Union[str, Committer, Author]] = {"message": message}
+
+        if isinstance(content, str):
+            data["content"] = content
 
         if sha:
             data["sha"] = sha
@@ -973,7 +1592,16 @@ class HTTPClient:
         if author:
             data["author"] = author
 
-        return await self.request("PUT", f"/repos/{owner}/{repo}/contents/{path}", json=data)
+        route = Route(
+            "PUT", "/repos/{owner}/{repo}/contents/{path}", owner=owner, repo=repo, path=path
+        )
+
+        if isinstance(content, str):
+            return await self.request(route, json=data)
+
+        return await self.request(
+            route, data=await Base64JSONPayload.create(data, "content", content)
+        )
 
     async def delete_repo_file(
         self,
@@ -999,20 +1627,72 @@ class HTTPClient:
         if author:
             data["author"] = author
 
-        return await self.request("DELETE", f"/repos/{owner}/{repo}/contents/{path}", json=data)
+        return await self.request(
+            Route(
+                "DELETE", "/repos/{owner}/{repo}/contents/{path}", owner=owner, repo=repo, path=path
+            ),
+            json=data,
+        )
+
+    async def get_repo_readme(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        ref: Optional[str] = None,
+        media_type: Optional[Literal["raw", "html"]] = None,
+    ):
+        params = {}
+
+        if ref:
+            params["ref"] = ref
 
-    async def get_repo_readme(self, *, owner: str, repo: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}/readme")
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/readme", owner=owner, repo=repo),
+            params=params,
+            media_type=media_type,
+        )
+
+    async def get_repo_readme_bytes(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        ref: Optional[str] = None,
+        body_type: Literal["bytes", "memoryview"] = "bytes",
+    ) -> Union[bytes, memoryview]:
+        """The README as it is, without the base64 in JSON of get_repo_readme."""
+        params = {}
+
+        if ref:
+            params["ref"] = ref
+
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/readme", owner=owner, repo=repo),
+            params=params,
+            media_type="raw",
+            body_type=body_type,
+        )
 
     async def get_repo_readme_for_directory(
-        self, *, owner: str, repo: str, dir: str, ref: Optional[str] = None
+        self,
+        *,
+        owner: str,
+        repo: str,
+        dir: str,
+        ref: Optional[str] = None,
+        media_type: Optional[Literal["raw", "html"]] = None,
     ):
         params = {}
 
         if ref:
             params["ref"] = ref
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/readme/{dir}", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/readme/{dir}", owner=owner, repo=repo, dir=dir),
+            params=params,
+            media_type=media_type,
+        )
 
     async def download_repo_archive(
         self,
@@ -1021,13 +1701,72 @@ class HTTPClient:
         repo: str,
         archive_format: Literal["tarball", "zipball"],
         ref: Optional[str] = None,
-    ):
+    ) -> bytes:
+        chunks = []
+
+        async for chunk in self.iter_repo_archive(
+            owner=owner, repo=repo, archive_format=archive_format, ref=ref
+        ):
+            chunks.append(chunk)
+
+        return b"".join(chunks)
+
+    async def iter_repo_archive(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        archive_format: Literal["tarball", "zipball"],
+        ref: Optional[str] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """Yields the archive in chunks as it is downloaded, so only a chunk is in memory."""
+        path = "/repos/{owner}/{repo}/{archive_format}"
         params = {}
 
+        # The ref is part of the path, not a parameter
         if ref:
+            path += "/{ref}"
             params["ref"] = ref
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/{archive_format}", params=params)
+        async with self.stream(
+            Route("GET", path, owner=owner, repo=repo, archive_format=archive_format, **params)
+        ) as response:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def save_repo_archive(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        archive_format: Literal["tarball", "zipball"],
+        path: Union[str, os.PathLike],
+        ref: Optional[str] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> int:
+        """Streams the archive into the file at ``path``, returns its size.
+
+        The file is written in the default executor, so the loop isn't blocked.
+        """
+        loop = asyncio.get_running_loop()
+        file = await loop.run_in_executor(None, open, path, "wb")
+        size = 0
+
+        try:
+            async for chunk in self.iter_repo_archive(
+                owner=owner,
+                repo=repo,
+                archive_format=archive_format,
+                ref=ref,
+                chunk_size=chunk_size,
+            ):
+                await loop.run_in_executor(None, file.write, chunk)
+                size += len(chunk)
+        finally:
+            await loop.run_in_executor(None, file.close)
+
+        return size
 
     async def list_repo_forks(
         self,
@@ -1047,7 +1786,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/forks", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/forks", owner=owner, repo=repo), params=params
+        )
 
     async def create_repo_fork(self, *, owner: str, repo: str, organization: Optional[str] = None):
         data = {}
@@ -1055,16 +1796,22 @@ class HTTPClient:
         if organization:
             data["organization"] = organization
 
-        return await self.request("POST", f"/repos/{owner}/{repo}/forks", json=data)
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/forks", owner=owner, repo=repo), json=data
+        )
 
     async def enable_git_lfs_for_repo(self, *, owner: str, repo: str):
-        return await self.request("PUT", f"/repos/{owner}/{repo}/lfs")
+        return await self.request(Route("PUT", "/repos/{owner}/{repo}/lfs", owner=owner, repo=repo))
 
     async def disable_git_lfs_for_repo(self, *, owner: str, repo: str):
-        return await self.request("DELETE", f"/repos/{owner}/{repo}/lfs")
+        return await self.request(
+            Route("DELETE", "/repos/{owner}/{repo}/lfs", owner=owner, repo=repo)
+        )
 
     async def list_tag_protection_states_for_repo(self, *, owner: str, repo: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}/tags/protection")
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/tags/protection", owner=owner, repo=repo)
+        )
 
     async def create_tag_protection_state_for_repo(
         self,
@@ -1078,13 +1825,264 @@ class HTTPClient:
         if pattern:
             data["pattern"] = pattern
 
-        return await self.request("POST", f"/repos/{owner}/{repo}/tags/protection", json=data)
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/tags/protection", owner=owner, repo=repo),
+            json=data,
+        )
 
     async def delete_tag_protection_state_for_repo(
         self, *, owner: str, repo: str, tag_protection_id: int
     ):
         return await self.request(
-            "DELETE", f"/repos/{owner}/{repo}/tags/protection/{tag_protection_id}"
+            Route(
+                "DELETE",
+                "/repos/{owner}/{repo}/tags/protection/{tag_protection_id}",
+                owner=owner,
+                repo=repo,
+                tag_protection_id=tag_protection_id,
+            )
+        )
+
+    # === COMMITS === #
+
+    async def get_commit(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        ref: str,
+        per_page: Optional[int] = None,
+        page: Optional[int] = None,
+        media_type: Optional[Literal["diff", "patch"]] = None,
+    ):
+        params = {}
+
+        if per_page:
+            params["per_page"] = per_page
+        if page:
+            params["page"] = page
+
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/commits/{ref}", owner=owner, repo=repo, ref=ref),
+            params=params,
+            media_type=media_type,
+        )
+
+    async def get_commit_sha(self, *, owner: str, repo: str, ref: str) -> str:
+        """Resolves a branch, tag or short SHA to the full commit SHA, without the commit body."""
+        async with self.stream(
+            Route("GET", "/repos/{owner}/{repo}/commits/{ref}", owner=owner, repo=repo, ref=ref),
+            headers={"Accept": "application/vnd.github.sha"},
+        ) as response:
+            return (await response.read()).decode("ascii").strip()
+
+    # === GIT DATABASE === #
+
+    async def create_blob(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        content: Union[str, File],
+        encoding: Literal["utf-8", "base64"] = "utf-8",
+    ):
+        """``content`` is a str in ``encoding``, or a File, sent in base64 a chunk at a time."""
+        route = Route("POST", "/repos/{owner}/{repo}/git/blobs", owner=owner, repo=repo)
+
+        if isinstance(content, str):
+            return await self.request(route, json={"content": content, "encoding": encoding})
+
+        return await self.request(
+            route,
+            data=await Base64JSONPayload.create({"encoding": "base64"}, "content", content),
+        )
+
+    async def get_blob(self, *, owner: str, repo: str, file_sha: str):
+        return await self.request(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/git/blobs/{file_sha}",
+                owner=owner,
+                repo=repo,
+                file_sha=file_sha,
+            )
+        )
+
+    async def iter_blob(
+        self, *, owner: str, repo: str, file_sha: str, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Yields the raw content of a blob as it is downloaded, without the base64 of get_blob."""
+        async with self.stream(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/git/blobs/{file_sha}",
+                owner=owner,
+                repo=repo,
+                file_sha=file_sha,
+            ),
+            headers={"Accept": "application/vnd.github.raw"},
+        ) as response:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def create_commit_object(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        message: str,
+        tree: str,
+        parents: Optional[List[str]] = None,
+        author: Optional[Author] = None,
+        committer: Optional[Committer] = None,
+        signature: Optional[str] = None,
+    ):
+        data: Dict[str, Union[str, List[str], Author, Committer]] = {
+            "message": message,
+            "tree": tree,
+        }
+
+        if parents is not None:
+            data["parents"] = parents
+        if author:
+            data["author"] = author
+        if committer:
+            data["committer"] = committer
+        if signature:
+            data["signature"] = signature
+
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/git/commits", owner=owner, repo=repo), json=data
+        )
+
+    async def get_commit_object(self, *, owner: str, repo: str, commit_sha: str):
+        return await self.request(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/git/commits/{commit_sha}",
+                owner=owner,
+                repo=repo,
+                commit_sha=commit_sha,
+            )
+        )
+
+    async def list_matching_refs(self, *, owner: str, repo: str, ref: str):
+        return await self.request(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/git/matching-refs/{ref}",
+                owner=owner,
+                repo=repo,
+                ref=ref,
+            )
+        )
+
+    async def get_ref(self, *, owner: str, repo: str, ref: str):
+        """``ref`` is like 'heads/main' or 'tags/v1.0'."""
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/git/ref/{ref}", owner=owner, repo=repo, ref=ref)
+        )
+
+    async def create_ref(self, *, owner: str, repo: str, ref: str, sha: str):
+        """``ref`` is the full name, like 'refs/heads/main'."""
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/git/refs", owner=owner, repo=repo),
+            json={"ref": ref, "sha": sha},
+        )
+
+    async def update_ref(
+        self, *, owner: str, repo: str, ref: str, sha: str, force: Optional[bool] = None
+    ):
+        data: Dict[str, Union[str, bool]] = {"sha": sha}
+
+        if force is not None:
+            data["force"] = force
+
+        return await self.request(
+            Route("PATCH", "/repos/{owner}/{repo}/git/refs/{ref}", owner=owner, repo=repo, ref=ref),
+            json=data,
+        )
+
+    async def delete_ref(self, *, owner: str, repo: str, ref: str):
+        return await self.request(
+            Route("DELETE", "/repos/{owner}/{repo}/git/refs/{ref}", owner=owner, repo=repo, ref=ref)
+        )
+
+    async def create_tag_object(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        tag: str,
+        message: str,
+        object: str,
+        type: Literal["commit", "tree", "blob"],
+        tagger: Optional[Committer] = None,
+    ):
+        data: Dict[str, Union[str, Committer]] = {
+            "tag": tag,
+            "message": message,
+            "object": object,
+            "type": type,
+        }
+
+        if tagger:
+            data["tagger"] = tagger
+
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/git/tags", owner=owner, repo=repo), json=data
+        )
+
+    async def get_tag(self, *, owner: str, repo: str, tag_sha: str):
+        return await self.request(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/git/tags/{tag_sha}",
+                owner=owner,
+                repo=repo,
+                tag_sha=tag_sha,
+            )
+        )
+
+    async def create_tree(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        tree: List[Dict[str, Optional[str]]],
+        base_tree: Optional[str] = None,
+    ):
+        """Entries of ``tree`` have a path, mode, type and either a sha or content.
+
+        Entries with a sha of None delete the path from ``base_tree``.
+        """
+        data: Dict[str, Union[str, List[Dict[str, Optional[str]]]]] = {"tree": tree}
+
+        if base_tree:
+            data["base_tree"] = base_tree
+
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/git/trees", owner=owner, repo=repo), json=data
+        )
+
+    async def get_tree(
+        self, *, owner: str, repo: str, tree_sha: str, recursive: Optional[bool] = None
+    ):
+        params = {}
+
+        if recursive:
+            # Any value makes it recursive, even 'false'
+            params["recursive"] = "1"
+
+        return await self.request(
+            Route(
+                "GET",
+                "/repos/{owner}/{repo}/git/trees/{tree_sha}",
+                owner=owner,
+                repo=repo,
+                tree_sha=tree_sha,
+            ),
+            params=params,
         )
 
     # === GISTS === #
@@ -1105,13 +2103,16 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/gists", params=params)
+        return await self.request(Route("GET", "/gists"), params=params)
 
     async def create_gist(
         self, *, description: Optional[str] = None, files: List[File], public: Optional[bool] = None
     ):
-        data: Dict[str, Union[str, bool, Dict[str, str]]] = {
-            "files": {f.name: f.read() for f in files},
+        # Files on disk are read in threads, at the same time
+        contents = await asyncio.gather(*(f.aread() for f in files))
+
+        data: Dict[str, Union[str, bool, Dict[str, Dict[str, str]]]] = {
+            "files": {f.name: {"content": content} for f, content in zip(files, contents)},
         }
 
         if description:
@@ -1119,7 +2120,7 @@ class HTTPClient:
         if public:
             data["public"] = public
 
-        return await self.request("POST", "/gists", json=data)
+        return await self.request(Route("POST", "/gists"), json=data)
 
     async def list_public_gists(
         self,
@@ -1137,7 +2138,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/gists/public", params=params)
+        return await self.request(Route("GET", "/gists/public"), params=params)
 
     async def list_starred_gists(
         self,
@@ -1155,25 +2156,26 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/gists/starred", params=params)
+        return await self.request(Route("GET", "/gists/starred"), params=params)
 
     async def get_gist(self, *, gist_id: str):
-        return await self.request("GET", f"/gists/{gist_id}")
+        return await self.request(Route("GET", "/gists/{gist_id}", gist_id=gist_id))
 
     async def update_gist(
         self, *, gist_id: str, description: Optional[str] = None, files: Optional[List[File]] = None
     ):
-        data = {}
+        data: Dict[str, Union[str, Dict[str, Dict[str, str]]]] = {}
 
         if description:
             data["description"] = description
         if files:
-            data["files"] = {f.name: f.read() for f in files}
+            contents = await asyncio.gather(*(f.aread() for f in files))
+            data["files"] = {f.name: {"content": content} for f, content in zip(files, contents)}
 
-        return await self.request("PATCH", f"/gists/{gist_id}")
+        return await self.request(Route("PATCH", "/gists/{gist_id}", gist_id=gist_id), json=data)
 
     async def delete_gist(self, *, gist_id: str):
-        return await self.request("DELETE", f"/gists/{gist_id}")
+        return await self.request(Route("DELETE", "/gists/{gist_id}", gist_id=gist_id))
 
     async def list_gist_commits(
         self, *, gist_id: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -1185,7 +2187,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/gists/{gist_id}/commits", params=params)
+        return await self.request(
+            Route("GET", "/gists/{gist_id}/commits", gist_id=gist_id), params=params
+        )
 
     async def list_gist_forks(
         self, *, gist_id: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -1197,22 +2201,24 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/gists/{gist_id}/forks", params=params)
+        return await self.request(
+            Route("GET", "/gists/{gist_id}/forks", gist_id=gist_id), params=params
+        )
 
     async def fork_gist(self, *, gist_id: str):
-        return await self.request("POST", f"/gists/{gist_id}/forks")
+        return await self.request(Route("POST", "/gists/{gist_id}/forks", gist_id=gist_id))
 
     async def check_gist_starred(self, *, gist_id: str):
-        return await self.request("GET", f"/gists/{gist_id}/star")
+        return await self.request(Route("GET", "/gists/{gist_id}/star", gist_id=gist_id))
 
     async def star_gist(self, *, gist_id: str):
-        return await self.request("PUT", f"/gists/{gist_id}/star")
+        return await self.request(Route("PUT", "/gists/{gist_id}/star", gist_id=gist_id))
 
     async def unstar_gist(self, *, gist_id: str):
-        return await self.request("DELETE", f"/gists/{gist_id}/star")
+        return await self.request(Route("DELETE", "/gists/{gist_id}/star", gist_id=gist_id))
 
     async def get_gist_revision(self, *, gist_id: str, sha: str):
-        return await self.request("GET", f"/gists/{gist_id}/{sha}")
+        return await self.request(Route("GET", "/gists/{gist_id}/{sha}", gist_id=gist_id, sha=sha))
 
     async def list_gists_for_user(
         self,
@@ -1231,7 +2237,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/users/{username}/gists", params=params)
+        return await self.request(
+            Route("GET", "/users/{username}/gists", username=username), params=params
+        )
 
     async def list_gist_comments(
         self, *, gist_id: str, per_page: Optional[int] = None, page: Optional[int] = None
@@ -1243,53 +2251,79 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/gists/{gist_id}/comments", params=params)
+        return await self.request(
+            Route("GET", "/gists/{gist_id}/comments", gist_id=gist_id), params=params
+        )
 
     async def create_gist_comment(self, *, gist_id: str, body: str):
-        return await self.request("POST", f"/gists/{gist_id}/comments", json={"body": body})
+        return await self.request(
+            Route("POST", "/gists/{gist_id}/comments", gist_id=gist_id), json={"body": body}
+        )
 
     async def get_gist_comment(self, *, gist_id: str, comment_id: str):
-        return await self.request("GET", f"/gists/{gist_id}/comments/{comment_id}")
+        return await self.request(
+            Route(
+                "GET",
+                "/gists/{gist_id}/comments/{comment_id}",
+                gist_id=gist_id,
+                comment_id=comment_id,
+            )
+        )
 
     async def update_gist_comment(self, *, gist_id: str, comment_id: str, body: str):
         return await self.request(
-            "PATCH", f"/gists/{gist_id}/comments/{comment_id}", json={"body": body}
+            Route(
+                "PATCH",
+                "/gists/{gist_id}/comments/{comment_id}",
+                gist_id=gist_id,
+                comment_id=comment_id,
+            ),
+            json={"body": body},
         )
 
     async def delete_gist_comment(self, *, gist_id: str, comment_id: str):
-        return await self.request("DELETE", f"/gists/{gist_id}/comments/{comment_id}")
+        return await self.request(
+            Route(
+                "DELETE",
+                "/gists/{gist_id}/comments/{comment_id}",
+                gist_id=gist_id,
+                comment_id=comment_id,
+            )
+        )
 
     # === LICENSES === #
 
     async def get_all_commonly_used_licenses(self):
-        return await self.request("GET", "/licenses")
+        return await self.request(Route("GET", "/licenses"))
 
     async def get_license(self, *, license: str):
-        return await self.request("GET", f"/licenses/{license}")
+        return await self.request(Route("GET", "/licenses/{license}", license=license))
 
     async def get_license_for_repo(self, *, owner: str, repo: str):
-        return await self.request("GET", f"/repos/{owner}/{repo}/license")
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/license", owner=owner, repo=repo)
+        )
 
     # === GITIGNORE === #
 
     async def get_all_gitignore_templates(self):
-        return await self.request("GET", "/gitignore/templates")
+        return await self.request(Route("GET", "/gitignore/templates"))
 
     async def get_gitignore_template(self, *, name: str):
-        return await self.request("GET", f"/gitignore/templates/{name}")
+        return await self.request(Route("GET", "/gitignore/templates/{name}", name=name))
 
     # === EMOJIS === #
 
     async def get_emojis(self):
-        return await self.request("GET", "/emojis")
+        return await self.request(Route("GET", "/emojis"))
 
     # === CODES OF CONDUCT === #
 
     async def get_all_codes_of_conduct(self):
-        return await self.request("GET", "/codes_of_conduct")
+        return await self.request(Route("GET", "/codes_of_conduct"))
 
     async def get_code_of_conduct(self, *, key: str):
-        return await self.request("GET", f"/codes_of_conduct/{key}")
+        return await self.request(Route("GET", "/codes_of_conduct/{key}", key=key))
 
     # === DEPLOY KEYS === #
 
@@ -1303,7 +2337,9 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", f"/repos/{owner}/{repo}/keys", params=params)
+        return await self.request(
+            Route("GET", "/repos/{owner}/{repo}/keys", owner=owner, repo=repo), params=params
+        )
 
     async def create_deploy_key(
         self,
@@ -1323,13 +2359,27 @@ class HTTPClient:
         if read_only:
             data["read_only"] = read_only
 
-        return await self.request("POST", f"/repos/{owner}/{repo}/keys", data=data)
+        return await self.request(
+            Route("POST", "/repos/{owner}/{repo}/keys", owner=owner, repo=repo), data=data
+        )
 
     async def get_deploy_key(self, *, owner: str, repo: str, key_id: int):
-        return await self.request("GET", f"/repos/{owner}/{repo}/keys/{key_id}")
+        return await self.request(
+            Route(
+                "GET", "/repos/{owner}/{repo}/keys/{key_id}", owner=owner, repo=repo, key_id=key_id
+            )
+        )
 
     async def delete_deploy_key(self, *, owner: str, repo: str, key_id: int):
-        return await self.request("DELETE", f"/repos/{owner}/{repo}/keys/{key_id}")
+        return await self.request(
+            Route(
+                "DELETE",
+                "/repos/{owner}/{repo}/keys/{key_id}",
+                owner=owner,
+                repo=repo,
+                key_id=key_id,
+            )
+        )
 
     # === MARKDOWN === #
 
@@ -1349,23 +2399,23 @@ class HTTPClient:
         if context:
             data["context"] = context
 
-        return await self.request("POST", "/markdown", data=data)
+        return await self.request(Route("POST", "/markdown"), data=data)
 
     # TODO: Implement Markdown raw request, idk
 
     # === META === #
 
     async def get_github_api_root(self):
-        return await self.request("GET", "/")
+        return await self.request(Route("GET", "/"))
 
     async def get_git_hub_meta_info(self):
-        return await self.request("GET", "/meta")
+        return await self.request(Route("GET", "/meta"))
 
     async def get_octocat(self):
-        return await self.request("GET", "/octocat")
+        return await self.request(Route("GET", "/octocat"))
 
     async def get_the_zen_of_github(self):
-        return await self.request("GET", "/zen")
+        return await self.request(Route("GET", "/zen"))
 
     # === SEARCH === #
 
@@ -1391,7 +2441,7 @@ class HTTPClient:
         if page:
             data["page"] = page
 
-        return await self.request("GET", "/search/code", data=data)
+        return await self.request(Route("GET", "/search/code"), data=data)
 
     async def search_commits(
         self,
@@ -1415,7 +2465,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/search/commits", params=params)
+        return await self.request(Route("GET", "/search/commits"), params=params)
 
     async def search_issues_and_pull_requests(
         self,
@@ -1453,7 +2503,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/search/issues", params=params)
+        return await self.request(Route("GET", "/search/issues"), params=params)
 
     async def search_labels(
         self,
@@ -1479,7 +2529,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/search/labels", params=params)
+        return await self.request(Route("GET", "/search/labels"), params=params)
 
     async def search_repos(
         self,
@@ -1503,7 +2553,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/search/repositories", params=params)
+        return await self.request(Route("GET", "/search/repositories"), params=params)
 
     async def search_topics(
         self,
@@ -1521,7 +2571,7 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/search/topics", params=params)
+        return await self.request(Route("GET", "/search/topics"), params=params)
 
     async def search_users(
         self,
@@ -1545,4 +2595,19 @@ class HTTPClient:
         if page:
             params["page"] = page
 
-        return await self.request("GET", "/search/users", params=params)
+        return await self.request(Route("GET", "/search/users"), params=params)
+
+    # === GRAPHQL === #
+
+    async def graphql(self, query: str, /, *, variables: Optional[Dict[str, Any]] = None):
+        """Sends a GraphQL query, returns the whole response, with 'data' and 'errors'.
+
+        GraphQL answers errors with a successful status, see GraphQL for a
+        client that raises them, batches lookups and paginates.
+        """
+        data: Dict[str, Any] = {"query": query}
+
+        if variables:
+            data["variables"] = variables
+
+        return await self.request(Route("POST", "/graphql"), json=data)
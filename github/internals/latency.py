@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+__all__ = ("LatencyTracker",)
+
+import math
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyTracker:
+    """Estimates latency from the time to first byte of real requests.
+
+    Keeps an exponentially weighted moving average and the latest ``size``
+    samples for percentiles, all in seconds.
+    """
+
+    __slots__ = ("alpha", "ewma", "last", "last_sample", "_samples")
+
+    def __init__(self, *, alpha: float = 0.2, size: int = 256) -> None:
+        self.alpha = alpha
+
+        self.ewma: Optional[float] = None
+        self.last: Optional[float] = None
+        # time.monotonic() of the latest sample
+        self.last_sample = float("-inf")
+
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} ewma: {self.ewma}, samples: {len(self._samples)}>"
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float, /) -> None:
+        ewma = self.ewma
+        self.ewma = seconds if ewma is None else ewma + self.alpha * (seconds - ewma)
+
+        self.last = seconds
+        self.last_sample = time.monotonic()
+        self._samples.append(seconds)
+
+    def idle_for(self) -> float:
+        """Seconds since the latest sample."""
+        return time.monotonic() - self.last_sample
+
+    def percentile(self, percent: float, /) -> Optional[float]:
+        """The given percentile (0-100) of the recent samples, nearest-rank."""
+        if not self._samples:
+            return None
+
+        samples = sorted(self._samples)
+        rank = max(1, math.ceil(percent / 100 * len(samples)))
+        return samples[min(len(samples), rank) - 1]
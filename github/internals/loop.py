@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+__all__ = ("has_fast_loop", "install_fast_loop", "new_event_loop", "run")
+
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None
+
+T = TypeVar("T")
+
+
+def has_fast_loop() -> bool:
+    """Whether uvloop is installed."""
+    return uvloop is not None
+
+
+def install_fast_loop() -> bool:
+    """Makes asyncio use uvloop for every new event loop, if it is installed.
+
+    Call it before any loop is made, e.g. before ``asyncio.run``. Returns
+    whether uvloop was installed, the default loop stays otherwise.
+    """
+    if uvloop is None:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def new_event_loop(*, fast: bool = False) -> asyncio.AbstractEventLoop:
+    """Makes an uvloop event loop if ``fast`` and it is installed, else a default one.
+
+    uvloop isn't a dependency, so it is opt-in everywhere.
+    """
+    if fast and uvloop is not None:
+        return uvloop.new_event_loop()
+
+    return asyncio.new_event_loop()
+
+
+def run(main: Coroutine[Any, Any, T], /, *, fast: bool = False) -> T:
+    """Like ``asyncio.run``, but on uvloop if ``fast`` and it is installed.
+
+    Unlike ``install_fast_loop``, the global event loop policy isn't changed.
+    """
+    loop = new_event_loop(fast=fast)
+
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            tasks = asyncio.all_tasks(loop)
+
+            for task in tasks:
+                task.cancel()
+
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+__all__ = ("Histogram", "Metrics", "opentelemetry_hook")
+
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .middleware import Middleware
+
+if TYPE_CHECKING:
+    from .middleware import RequestContext
+
+    Labels = Tuple[str, ...]
+    Listener = Callable[[str, float, Dict[str, str]], Any]
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# (header, metric name, help)
+RATELIMIT_FIELDS = (
+    ("X-RateLimit-Remaining", "github_ratelimit_remaining", "Requests left in the window."),
+    ("X-RateLimit-Used", "github_ratelimit_used", "Requests made in the window."),
+    ("X-RateLimit-Limit", "github_ratelimit_limit", "Requests allowed in the window."),
+    ("X-RateLimit-Reset", "github_ratelimit_reset_timestamp_seconds", "When the window resets."),
+)
+
+
+class Histogram:
+    """A histogram with fixed buckets, observing is a bisect and two additions."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float], /) -> None:
+        self.buckets = tuple(buckets)
+        # The last count is for the values over every bucket, +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} count: {self.count}, sum: {self.sum}>"
+
+    def observe(self, value: float, /) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+
+        for bucket, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            result.append((str(bucket), total))
+
+        return result
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], /) -> str:
+    def escape(value: Any) -> str:
+        return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+class Metrics(Middleware):
+    """Collects request metrics from the HTTPClients it is added to.
+
+    Everything is updated in place on the event loop, without locks. Use
+    ``render_prometheus`` to export, or ``add_listener`` to forward each
+    observation somewhere else, e.g. with ``opentelemetry_hook``.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = SIZE_BUCKETS,
+    ) -> None:
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+
+        # (method, route) -> histogram
+        self.latency: Dict[Labels, Histogram] = {}
+        self.size: Dict[Labels, Histogram] = {}
+        # (method, route, status) -> count
+        self.responses: Dict[Labels, int] = {}
+        # (method, route, error) -> count, for requests that got no response
+        self.errors: Dict[Labels, int] = {}
+
+        self.in_flight = 0
+
+        # Big JSON decodes the HTTPClient offloaded, and the loop blocking that avoided
+        self.offloaded_decodes = 0
+        self.avoided_loop_time = 0.0
+
+        # resource -> metric name -> value
+        self.ratelimits: Dict[str, Dict[str, float]] = {}
+
+        self._listeners: List[Listener] = []
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} in_flight: {self.in_flight}>"
+
+    def add_listener(self, listener: Listener, /) -> None:
+        """Calls ``listener(name, value, attributes)`` for every observation."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener, /) -> None:
+        self._listeners.remove(listener)
+
+    def _emit(self, name: str, value: float, attributes: Dict[str, str], /) -> None:
+        for listener in self._listeners:
+            listener(name, value, attributes)
+
+    async def before_send(self, ctx: RequestContext, /) -> None:
+        self.in_flight += 1
+        ctx.extras["metrics_start"] = time.perf_counter()
+
+        if self._listeners:
+            self._emit("github_requests_in_flight", self.in_flight, {})
+
+    async def after_receive(self, ctx: RequestContext, /) -> None:
+        self._finish(ctx, None)
+
+    async def on_error(self, ctx: RequestContext, error: Exception, /) -> None:
+        self._finish(ctx, error)
+
+    def _finish(self, ctx: RequestContext, error: Optional[Exception], /) -> None:
+        # after_receive runs too if another middleware recovered from the error
+        if (start := ctx.extras.pop("metrics_start", None)) is None:
+            return
+
+        elapsed = time.perf_counter() - start
+        self.in_flight -= 1
+
+        key = (ctx.route.method, ctx.route.path)
+
+        if (latency := self.latency.get(key)) is None:
+            latency = self.latency[key] = Histogram(self.latency_buckets)
+        latency.observe(elapsed)
+
+        if ctx.status is None:
+            # Answered by a middleware, or no response at all
+            if error is not None:
+                error_key = (*key, type(error).__name__)
+                self.errors[error_key] = self.errors.get(error_key, 0) + 1
+        else:
+            status_key = (*key, str(ctx.status))
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+        if (avoided := ctx.extras.get("avoided_loop_time")) is not None:
+            self.offloaded_decodes += 1
+            self.avoided_loop_time += avoided
+
+        if ctx.size is not None:
+            if (size := self.size.get(key)) is None:
+                size = self.size[key] = Histogram(self.size_buckets)
+            size.observe(ctx.size)
+
+        resource = "core"
+        ratelimits = None
+
+        if (headers := ctx.headers) is not None and "X-RateLimit-Remaining" in headers:
+            resource = headers.get("X-RateLimit-Resource", resource)
+            ratelimits = self.ratelimits.setdefault(resource, {})
+
+            for header, name, _ in RATELIMIT_FIELDS:
+                if (value := headers.get(header)) is not None:
+                    ratelimits[name] = float(value)
+
+        if self._listeners:
+            attributes = {"method": key[0], "route": key[1]}
+
+            self._emit("github_request_duration_seconds", elapsed, attributes)
+            self._emit("github_requests_in_flight", self.in_flight, {})
+
+            if ctx.status is not None:
+                self._emit("github_responses", 1, {**attributes, "status": str(ctx.status)})
+            if ctx.size is not None:
+                self._emit("github_response_size_bytes", ctx.size, attributes)
+            if avoided is not None:
+                self._emit("github_avoided_loop_seconds", avoided, attributes)
+
+            if ratelimits is not None:
+                for name, value in ratelimits.items():
+                    self._emit(name, value, {"resource": resource})
+
+    def render_prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histograms(name: str, help: str, values: Dict[Labels, Histogram]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} histogram")
+
+            for (method, route), histogram in values.items():
+                labels = _labels(("method", "route"), (method, route))
+
+                for bucket, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bucket}"}} {count}')
+
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        def counters(name: str, help: str, names: Sequence[str], values: Dict[Labels, int]):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+
+            for label_values, count in values.items():
+                lines.append(f"{name}{{{_labels(names, label_values)}}} {count}")
+
+        histograms(
+            "github_request_duration_seconds", "Time taken by requests to GitHub.", self.latency
+        )
+        histograms("github_response_size_bytes", "Size of the response bodies.", self.size)
+
+        counters(
+            "github_responses_total",
+            "Responses received, by status code.",
+            ("method", "route", "status"),
+            self.responses,
+        )
+        counters(
+            "github_request_errors_total",
+            "Requests that failed without a response.",
+            ("method", "route", "error"),
+            self.errors,
+        )
+
+        lines.append(
+            "# HELP github_offloaded_decodes_total JSON bodies decoded off the event loop."
+        )
+        lines.append("# TYPE github_offloaded_decodes_total counter")
+        lines.append(f"github_offloaded_decodes_total {self.offloaded_decodes}")
+
+        lines.append(
+            "# HELP github_avoided_loop_seconds_total Event loop blocking avoided by offloading"
+            " big JSON decodes."
+        )
+        lines.append("# TYPE github_avoided_loop_seconds_total counter")
+        lines.append(f"github_avoided_loop_seconds_total {self.avoided_loop_time}")
+
+        lines.append("# HELP github_requests_in_flight Requests currently being sent.")
+        lines.append("# TYPE github_requests_in_flight gauge")
+        lines.append(f"github_requests_in_flight {self.in_flight}")
+
+        for _, name, help in RATELIMIT_FIELDS:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+
+            for resource, values in self.ratelimits.items():
+                if (value := values.get(name)) is not None:
+                    lines.append(f'{name}{{resource="{resource}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+def opentelemetry_hook(meter: Any, /) -> Listener:
+    """Makes a Metrics listener that records into an OpenTelemetry ``Meter``.
+
+    The meter is only used through its ``create_*`` methods, so the
+    OpenTelemetry API package is not needed to import this module.
+    """
+    duration = meter.create_histogram(
+        "github_request_duration_seconds", unit="s", description="Time taken by requests."
+    )
+    size = meter.create_histogram(
+        "github_response_size_bytes", unit="By", description="Size of the response bodies."
+    )
+    responses = meter.create_counter("github_responses", description="Responses received.")
+    avoided = meter.create_counter(
+        "github_avoided_loop_seconds",
+        unit="s",
+        description="Event loop blocking avoided by offloading big JSON decodes.",
+    )
+
+    # Gauges are reported through callbacks in OpenTelemetry, these hold the latest values
+    gauges: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+
+    def observe(name: str) -> Callable[[Any], List[Any]]:
+        def callback(_: Any) -> List[Any]:
+            from opentelemetry.metrics import Observation  # type: ignore
+
+            return [
+                Observation(value, dict(attributes))
+                for attributes, value in gauges.get(name, {}).items()
+            ]
+
+        return callback
+
+    for name in ("github_requests_in_flight", *(name for _, name, _ in RATELIMIT_FIELDS)):
+        meter.create_observable_gauge(name, callbacks=[observe(name)])
+
+    recorders = {
+        "github_request_duration_seconds": duration.record,
+        "github_response_size_bytes": size.record,
+        "github_responses": responses.add,
+        "github_avoided_loop_seconds": avoided.add,
+    }
+
+    def listener(name: str, value: float, attributes: Dict[str, str]) -> None:
+        if (record := recorders.get(name)) is not None:
+            record(value, attributes)
+        else:
+            gauges.setdefault(name, {})[tuple(attributes.items())] = value
+
+    return listener
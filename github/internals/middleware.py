@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+__all__ = ("Middleware", "RequestContext")
+
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from multidict import CIMultiDictProxy
+
+    from .http import BodyType, HTTPClient
+    from .route import Route
+    from .tracing import RequestTrace
+
+
+class RequestContext:
+    """The state of one request, passed through the middlewares of an HTTPClient."""
+
+    __slots__ = (
+        "client",
+        "route",
+        "kwargs",
+        "body_type",
+        "status",
+        "headers",
+        "size",
+        "data",
+        "responded",
+        "trace",
+        "extras",
+    )
+
+    def __init__(
+        self,
+        client: HTTPClient,
+        route: Route,
+        kwargs: Dict[str, Any],
+        /,
+        *,
+        body_type: BodyType = "decoded",
+    ) -> None:
+        self.client = client
+        self.route = route
+        # The keyword arguments given to aiohttp, middlewares can change them before sending
+        self.kwargs = kwargs
+        # Whether the body is returned decoded, as bytes or as a memoryview
+        self.body_type = body_type
+
+        # Set once a response was received from GitHub
+        self.status: Optional[int] = None
+        self.headers: Optional[CIMultiDictProxy[str]] = None
+        # The size of the response body in bytes
+        self.size: Optional[int] = None
+
+        self.data: Any = None
+        self.responded = False
+
+        # Set by a Tracer, the phases are filled in while sending
+        self.trace: Optional[RequestTrace] = None
+
+        # Free space for middlewares to keep state in between stages
+        self.extras: Dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} route: {self.route!r}, status: {self.status}>"
+
+    def respond(self, data: Any, /) -> None:
+        """Answers the request with ``data``.
+
+        In ``before_send`` this skips the request to GitHub, in ``on_error`` it
+        is returned instead of raising the error.
+        """
+        self.data = data
+        self.responded = True
+
+
+class Middleware:
+    """The base class for HTTPClient middlewares.
+
+    ``before_send`` runs in the order the middlewares were added, ``after_receive``
+    and ``on_error`` in the reverse order. Only the stages that are overridden are called.
+    """
+
+    async def before_send(self, ctx: RequestContext, /) -> None:
+        pass
+
+    async def after_receive(self, ctx: RequestContext, /) -> None:
+        pass
+
+    async def on_error(self, ctx: RequestContext, error: Exception, /) -> None:
+        pass
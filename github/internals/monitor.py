@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+__all__ = ("LoopBlock", "LoopMonitor")
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import FrameType
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .http import HTTPClient
+from .latency import LatencyTracker
+
+log = logging.getLogger("github.monitor")
+
+UNATTRIBUTED = "unattributed"
+
+# Frames of these functions have the route being requested in their 'route' local
+_REQUEST_CODES = (
+    HTTPClient.request.__code__,
+    HTTPClient._HTTPClient__send.__code__,  # type: ignore
+)
+
+
+def _route_of(frame: Optional[FrameType], /) -> Optional[str]:
+    while frame is not None:
+        if frame.f_code in _REQUEST_CODES:
+            if (route := frame.f_locals.get("route")) is not None:
+                return f"{route.method} {route.path}"
+
+        frame = frame.f_back
+
+    return None
+
+
+class LoopBlock:
+    """A time the event loop was blocked, by one callback or a few in a row.
+
+    ``stacks`` are samples of the loop thread's stack taken while it was
+    blocked (none if it was shorter than the sampling interval), ``route``
+    is the request that was being handled in them, if any.
+    """
+
+    __slots__ = ("started", "duration", "route", "stacks")
+
+    def __init__(self, started: float, /) -> None:
+        # time.time() of when it was noticed, it started up to a sampling interval earlier
+        self.started = started
+        self.duration = 0.0
+        self.route: Optional[str] = None
+        self.stacks: List[traceback.StackSummary] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} duration: {self.duration}, route: {self.route!r},"
+            f" samples: {len(self.stacks)}>"
+        )
+
+    def __str__(self) -> str:
+        text = f"Event loop blocked for {self.duration * 1000:.1f}ms (route: {self.route or '-'})"
+
+        if self.stacks:
+            # The latest sample is the closest to what was still blocking
+            text += "\n" + "".join(self.stacks[-1].format())
+
+        return text
+
+
+class LoopMonitor:
+    """Measures event loop lag and catches what blocks the loop.
+
+    A timer on the loop measures how late it runs, that is the lag. A watchdog
+    thread samples the loop thread's stack whenever the timer is late by more
+    than ``threshold``, and the block is attributed to the route of the
+    HTTPClient request in the stack, if any. Blocks that last at least
+    ``threshold`` plus ``interval`` seconds are always caught.
+
+    When nothing blocks, the cost is one timer callback on the loop and one
+    wake up of the thread every ``interval`` seconds, so it can be left on.
+
+    Arguments:
+        threshold: How many seconds of lag count as the loop being blocked.
+        interval: How often the lag is measured and the thread checks, in seconds.
+        max_samples: How many stack samples are taken per block.
+        max_depth: How many frames each sample has.
+        history: How many of the latest blocks are kept in ``blocks``.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.1,
+        interval: float = 0.05,
+        max_samples: int = 10,
+        max_depth: int = 30,
+        history: int = 100,
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.max_samples = max_samples
+        self.max_depth = max_depth
+
+        self.lag = LatencyTracker()
+        self.blocks: Deque[LoopBlock] = deque(maxlen=history)
+        # route -> (blocks, seconds blocked)
+        self.by_route: Dict[str, Tuple[int, float]] = {}
+
+        self._listeners: List[Callable[[LoopBlock], Any]] = []
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        # time.monotonic() the timer should run at next
+        self._due = 0.0
+        # The block the watchdog is sampling, handed to the loop once it runs again
+        self._current: Optional[LoopBlock] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} threshold: {self.threshold}, running:"
+            f" {self.is_running}, blocks: {len(self.blocks)}>"
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._timer is not None
+
+    def add_listener(self, listener: Callable[[LoopBlock], Any], /) -> None:
+        """Calls ``listener`` on the loop with every block, after it ended."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LoopBlock], Any], /) -> None:
+        self._listeners.remove(listener)
+
+    def start(self) -> None:
+        """Starts monitoring the running event loop, call it from a coroutine."""
+        if self.is_running:
+            raise RuntimeError("This monitor is already running.")
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+
+        self._due = time.monotonic() + self.interval
+        self._timer = self._loop.call_later(self.interval, self._tick)
+
+        self._watchdog = threading.Thread(
+            target=self._watch, name="github-loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self._stopped.set()
+
+        if self._watchdog is not None and self._watchdog is not threading.current_thread():
+            self._watchdog.join()
+
+        self._watchdog = None
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        lag = max(now - self._due, 0.0)
+        self.lag.record(lag)
+
+        with self._lock:
+            block, self._current = self._current, None
+
+        # Re-armed before the listeners are called, so they can stop the monitor
+        self._due = now + self.interval
+        self._timer = self._loop.call_later(self.interval, self._tick)  # type: ignore
+
+        if lag >= self.threshold:
+            if block is None:
+                # Shorter than the watchdog noticed
+                block = LoopBlock(time.time() - lag)
+
+            block.duration = lag
+            self._record(block)
+
+    def _record(self, block: LoopBlock, /) -> None:
+        self.blocks.append(block)
+
+        route = block.route or UNATTRIBUTED
+        count, seconds = self.by_route.get(route, (0, 0.0))
+        self.by_route[route] = count + 1, seconds + block.duration
+
+        log.warning(str(block))
+
+        for listener in self._listeners:
+            listener(block)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            due = self._due
+            if time.monotonic() - due < self.threshold:
+                continue
+
+            if (frame := sys._current_frames().get(self._loop_thread)) is None:
+                continue
+
+            # The innermost frames are kept, then put in the usual traceback order
+            stack = traceback.StackSummary.extract(
+                traceback.walk_stack(frame), limit=self.max_depth, lookup_lines=False
+            )
+            stack.reverse()
+            route = _route_of(frame)
+            del frame
+
+            with self._lock:
+                # The timer ran while this was sampling, so the sample is from after the block
+                if due != self._due:
+                    continue
+
+                if (block := self._current) is None:
+                    block = self._current = LoopBlock(time.time())
+
+                if len(block.stacks) < self.max_samples:
+                    block.stacks.append(stack)
+
+                block.route = block.route or route
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+__all__ = ("Route",)
+
+import re
+from operator import itemgetter
+from string import Formatter
+from typing import Any, Dict, Literal, Tuple
+from urllib.parse import quote
+
+from yarl import URL
+
+Method = Literal["GET", "POST", "PUT", "DELETE", "PATCH"]
+
+BASE_URL = URL("https://api.github.com")
+
+# Per template, the amount of built URLs that are kept
+URL_CACHE_SIZE = 1024
+
+# Slashes are kept as-is since some parameters are paths, e.g. 'contents/{path}'
+_needs_quoting = re.compile(r"[^A-Za-z0-9_.\-~/]").search
+
+
+def _quote(value: Any, /) -> str:
+    value = str(value)
+    return quote(value, safe="/") if _needs_quoting(value) else value
+
+
+class _Template:
+    __slots__ = ("path", "names", "url", "_values", "_urls")
+
+    def __init__(self, path: str, /) -> None:
+        parsed = list(Formatter().parse(path))
+
+        self.names: Tuple[str, ...] = tuple(name for _, name, *_ in parsed if name is not None)
+
+        # The path with a '%s' for every parameter, so filling it in is one formatting call
+        self.path = "".join(
+            literal.replace("%", "%%") + ("%s" if name is not None else "")
+            for literal, name, *_ in parsed
+        )
+
+        # Templates without parameters only ever have one URL
+        self.url = None if self.names else BASE_URL.with_path(_quote(path), encoded=True)
+
+        # A tuple of the values, or the only value if there is only one
+        self._values = itemgetter(*self.names) if self.names else None
+        self._urls: Dict[str, URL] = {}
+
+    def build(self, parameters: Dict[str, Any], /) -> URL:
+        if (url := self.url) is not None:
+            return url
+
+        values = self._values(parameters)  # type: ignore
+
+        # The unquoted path is the key, as the values themselves can compare equal
+        # while formatting differently, e.g. 1, 1.0 and True
+        key = self.path % (values if len(self.names) > 1 else (values,))
+
+        if (url := self._urls.get(key)) is not None:
+            return url
+
+        # Clearing is cheaper than keeping track of the least recently used URL
+        if len(self._urls) >= URL_CACHE_SIZE:
+            self._urls.clear()
+
+        url = self._urls[key] = BASE_URL.with_path(_quote(key), encoded=True)
+        return url
+
+
+_templates: Dict[str, _Template] = {}
+
+
+class Route:
+    """A request target, a method and a path template with its parameters."""
+
+    __slots__ = ("method", "path", "url")
+
+    def __init__(self, method: Method, path: str, /, **parameters: Any) -> None:
+        self.method = method
+        self.path = path
+
+        if (template := _templates.get(path)) is None:
+            template = _templates[path] = _Template(path)
+
+        self.url = template.build(parameters)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} method: {self.method!r}, path: {self.path!r}>"
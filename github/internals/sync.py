@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+__all__ = ("SyncHTTPClient",)
+
+import asyncio
+import functools
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from .http import HTTPClient
+from .loop import new_event_loop
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+T = TypeVar("T")
+
+
+class SyncHTTPClient:
+    """A synchronous, thread-safe HTTPClient.
+
+    It owns one event loop running in a background thread, and one HTTPClient
+    (so one connection pool) on it. Every route of HTTPClient is available as a
+    blocking method, keyword arguments are passed to HTTPClient. With
+    ``fast_loop``, the loop is an uvloop one if it is installed.
+    """
+
+    def __init__(self, *, fast_loop: bool = False, **kwargs: Any) -> None:
+        self._loop = new_event_loop(fast=fast_loop)
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="github-sync-client", daemon=True
+        )
+        self._thread.start()
+
+        # The session is made on the first request, which runs on the background loop
+        self._client = HTTPClient(**kwargs)
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} closed: {self._closed}>"
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+
+        if not asyncio.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def method(*args: Any, **kwargs: Any) -> Any:
+            return self.run(attribute(*args, **kwargs))
+
+        # So the wrapper is only made once per route
+        self.__dict__[name] = method
+        return method
+
+    @property
+    def client(self) -> HTTPClient:
+        """The HTTPClient, only use it from the background loop."""
+        return self._client
+
+    def run(self, coroutine: Coroutine[Any, Any, T], /, *, timeout: Optional[float] = None) -> T:
+        """Runs ``coroutine`` on the background loop and waits for the result."""
+        if self._closed:
+            coroutine.close()
+            raise RuntimeError("This client is closed.")
+
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("Blocking calls can't be made from the client's own loop.")
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def gather(
+        self,
+        calls: Iterable[Callable[[HTTPClient], Awaitable[T]]],
+        /,
+        *,
+        concurrency: int = 10,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Runs many calls concurrently on the background loop, results in order.
+
+        Each call gets the HTTPClient, e.g. ``lambda http: http.get_repo(owner=..., repo=...)``.
+        With ``return_exceptions``, errors are returned in place of results instead of raised.
+        See ``HTTPClient.batch_calls``.
+        """
+
+        async def run_all() -> List[Any]:
+            results = []
+
+            async for result in self._client.batch_calls(calls, concurrency=concurrency):
+                if result.error is not None and not return_exceptions:
+                    raise result.error
+
+                results.append(result.error if result.error is not None else result.result)
+
+            return results
+
+        return self.run(run_all())
+
+    def batch(
+        self,
+        route: str,
+        kwargs: Iterable[Dict[str, Any]],
+        /,
+        *,
+        concurrency: int = 10,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Calls the route named ``route`` once per keyword arguments dict, concurrently.
+
+        E.g. ``client.batch("get_repo", [{"owner": "a", "repo": "b"}, ...])``.
+        """
+        method = getattr(HTTPClient, route)
+
+        return self.gather(
+            [functools.partial(method, **arguments) for arguments in kwargs],
+            concurrency=concurrency,
+            return_exceptions=return_exceptions,
+        )
+
+    def close(self) -> None:
+        if self._closed:
+            return
+
+        self.run(self._client.__aexit__(None, None, None))
+        self._closed = True
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+__all__ = ("RequestTrace", "Tracer")
+
+import logging
+import time
+from collections import deque
+from random import random
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Callable, Deque, List, Optional
+
+from aiohttp import TraceConfig
+
+from .middleware import Middleware
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+    from .middleware import RequestContext
+    from .route import Route
+
+
+log = logging.getLogger("github.tracing")
+
+
+class RequestTiming:
+    """When the connection of a request was ready, after waiting for a free one and making it.
+
+    Set by the hooks of a tracing transport, None otherwise.
+    """
+
+    __slots__ = ("connected",)
+
+    def __init__(self) -> None:
+        self.connected: Optional[float] = None
+
+
+class RequestTrace(RequestTiming):
+    """How long each phase of one request took, in seconds.
+
+    ``dns`` and ``connect`` are None when a pooled connection was reused (or the
+    transport doesn't trace), ``connect`` includes the TLS handshake since aiohttp
+    does both in one step. ``ttfb`` is counted from when the connection was ready.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "url",
+        "request_id",
+        "status",
+        "started",
+        "dns",
+        "connect",
+        "ttfb",
+        "read",
+        "decode",
+        "total",
+        "_dns_start",
+        "_connect_start",
+    )
+
+    def __init__(self, route: Route, /) -> None:
+        super().__init__()
+
+        self.method = route.method
+        self.path = route.path
+        self.url = route.url
+
+        self.request_id: Optional[str] = None
+        self.status: Optional[int] = None
+
+        self.started = time.perf_counter()
+
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.read: Optional[float] = None
+        self.decode: Optional[float] = None
+        self.total: Optional[float] = None
+
+        self._dns_start = 0.0
+        self._connect_start = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} method: {self.method!r}, path: {self.path!r}, status:"
+            f" {self.status}, total: {self.total}>"
+        )
+
+    def __str__(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.1f}ms"
+
+        return (
+            f"{self.method} {self.url} -> {self.status} (request id: {self.request_id}) total:"
+            f" {ms(self.total)}, dns: {ms(self.dns)}, connect: {ms(self.connect)}, ttfb:"
+            f" {ms(self.ttfb)}, read: {ms(self.read)}, decode: {ms(self.decode)}"
+        )
+
+
+def _trace(context: SimpleNamespace) -> Optional[RequestTrace]:
+    trace = context.trace_request_ctx
+    return trace if isinstance(trace, RequestTrace) else None
+
+
+async def _on_dns_resolvehost_start(_: ClientSession, context: SimpleNamespace, __: Any) -> None:
+    if trace := _trace(context):
+        trace._dns_start = time.perf_counter()
+
+
+async def _on_dns_resolvehost_end(_: ClientSession, context: SimpleNamespace, __: Any) -> None:
+    if trace := _trace(context):
+        trace.dns = time.perf_counter() - trace._dns_start
+
+
+async def _on_connection_create_start(_: ClientSession, context: SimpleNamespace, __: Any) -> None:
+    if trace := _trace(context):
+        trace._connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(_: ClientSession, context: SimpleNamespace, __: Any) -> None:
+    now = time.perf_counter()
+
+    if isinstance(timing := context.trace_request_ctx, RequestTiming):
+        timing.connected = now
+
+    if trace := _trace(context):
+        # Resolving happens while the connection is being made
+        trace.connect = now - trace._connect_start - (trace.dns or 0)
+
+
+async def _on_connection_reuseconn(_: ClientSession, context: SimpleNamespace, __: Any) -> None:
+    if isinstance(timing := context.trace_request_ctx, RequestTiming):
+        timing.connected = time.perf_counter()
+
+
+def trace_config() -> TraceConfig:
+    config = TraceConfig()
+
+    config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    config.on_connection_create_start.append(_on_connection_create_start)
+    config.on_connection_create_end.append(_on_connection_create_end)
+    config.on_connection_reuseconn.append(_on_connection_reuseconn)
+
+    return config
+
+
+class Tracer(Middleware):
+    """Traces the phases of requests and keeps a log of the slow ones.
+
+    Arguments:
+        slow_threshold: Requests that take longer than this many seconds are logged.
+        sample_rate: The fraction of requests that are traced, from 0 to 1.
+        slow_log_size: How many of the latest slow traces are kept in ``slow``.
+    """
+
+    def __init__(
+        self, *, slow_threshold: float = 1.0, sample_rate: float = 1.0, slow_log_size: int = 100
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+
+        self.slow: Deque[RequestTrace] = deque(maxlen=slow_log_size)
+        self._listeners: List[Callable[[RequestTrace], Any]] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} slow_threshold: {self.slow_threshold}, sample_rate:"
+            f" {self.sample_rate}>"
+        )
+
+    def add_listener(self, listener: Callable[[RequestTrace], Any], /) -> None:
+        """Calls ``listener`` with every finished trace."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[RequestTrace], Any], /) -> None:
+        self._listeners.remove(listener)
+
+    async def before_send(self, ctx: RequestContext, /) -> None:
+        if self.sample_rate < 1 and random() >= self.sample_rate:
+            return
+
+        ctx.trace = ctx.kwargs["trace_request_ctx"] = RequestTrace(ctx.route)
+
+    async def after_receive(self, ctx: RequestContext, /) -> None:
+        self._finish(ctx)
+
+    async def on_error(self, ctx: RequestContext, error: Exception, /) -> None:
+        self._finish(ctx)
+
+    def _finish(self, ctx: RequestContext, /) -> None:
+        if (trace := ctx.trace) is None or trace.total is not None:
+            return
+
+        trace.total = time.perf_counter() - trace.started
+
+        if trace.total >= self.slow_threshold:
+            self.slow.append(trace)
+            log.warning(f"Slow request: {trace}")
+
+        for listener in self._listeners:
+            listener(trace)
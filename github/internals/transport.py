@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+__all__ = ("Transport",)
+
+import asyncio
+import logging
+import os
+from typing import Dict, List
+
+from aiohttp import ClientSession, DummyCookieJar, TCPConnector
+
+from .tracing import trace_config
+
+# Bumped in forked children, sessions made before a fork can't be used after it
+_generation = 0
+
+log = logging.getLogger("github")
+
+
+def _after_fork() -> None:
+    global _generation
+    _generation += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+# Sessions made before a fork, their connections are the parent's. Closing them would
+# touch those, and so would collecting them, so they're kept around instead.
+_inherited: List[ClientSession] = []
+
+
+async def _close(session: ClientSession, loop: asyncio.AbstractEventLoop, /) -> None:
+    # Nothing is sent on a closed loop, closing only lets go of the connections then
+    if loop is asyncio.get_running_loop() or loop.is_closed():
+        await session.close()
+        return
+
+    future = asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    # A loop that isn't running closes it once it runs again
+    if loop.is_running():
+        await asyncio.wrap_future(future)
+
+
+class Transport:
+    """A connection pool that can be shared by many HTTPClients.
+
+    Each client still sends its own headers and auth, and keeps its own ratelimits.
+    A session is made for every loop the transport is used in, on its first request.
+    DNS and connect times are recorded for requests traced by a Tracer, even one that is
+    added later. Turning ``tracing`` off saves aiohttp calling the hooks for every request,
+    but latency then also counts waiting for a free connection and making one.
+    """
+
+    __slots__ = ("limit", "limit_per_host", "tracing", "_sessions", "_generation")
+
+    def __init__(self, *, limit: int = 100, limit_per_host: int = 0, tracing: bool = True) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.tracing = tracing
+
+        self._sessions: Dict[asyncio.AbstractEventLoop, ClientSession] = {}
+        self._generation = _generation
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} limit: {self.limit}>"
+
+    def _forget_inherited(self) -> None:
+        if self._generation != _generation:
+            _inherited.extend(self._sessions.values())
+            self._sessions.clear()
+            self._generation = _generation
+
+    @property
+    def session(self) -> ClientSession:
+        self._forget_inherited()
+        loop = asyncio.get_running_loop()
+
+        if (session := self._sessions.get(loop)) is None or session.closed:
+            # So the sessions of loops that are gone don't pile up
+            for other in [other for other in self._sessions if other.is_closed()]:
+                loop.create_task(_close(self._sessions.pop(other), other))
+
+            session = self._sessions[loop] = ClientSession(
+                connector=TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+                # Cookies would leak between the clients otherwise
+                cookie_jar=DummyCookieJar(),
+                trace_configs=[trace_config()] if self.tracing else None,
+            )
+
+        return session
+
+    async def close(self) -> None:
+        self._forget_inherited()
+
+        sessions = list(self._sessions.items())
+        self._sessions.clear()
+
+        for loop, session in sessions:
+            try:
+                await _close(session, loop)
+            except Exception as error:
+                log.warning(f"Couldn't close the session of another loop: {error!r}")
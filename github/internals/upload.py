@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+__all__ = ("Base64JSONPayload",)
+
+import asyncio
+import json
+from base64 import b64encode
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict
+
+from aiohttp.payload import Payload
+
+if TYPE_CHECKING:
+    from aiohttp.abc import AbstractStreamWriter
+
+    from ..objects import File
+
+# base64 turns every 3 bytes into 4 characters, so chunks of a multiple of 3 can be joined
+CHUNK_SIZE = 3 * 64 * 1024
+
+
+def _b64_size(size: int, /) -> int:
+    return (size + 2) // 3 * 4
+
+
+async def _b64_chunks(chunks: AsyncIterator[bytes], /) -> AsyncIterator[bytes]:
+    rest = b""
+
+    async for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+
+        end = len(chunk) - len(chunk) % 3
+        rest = bytes(chunk[end:])
+
+        if end:
+            yield b64encode(chunk[:end])
+
+    if rest:
+        yield b64encode(rest)
+
+
+class Base64JSONPayload(Payload):
+    """A JSON object request body with the content of a file in base64 as one of its values.
+
+    The file is read and encoded a chunk at a time while the request is being
+    sent, so only a chunk of it is ever in memory, instead of the file, its
+    base64 and the JSON document. The size is known up front, so the request
+    has a Content-Length. Create it with ``create``.
+    """
+
+    def __init__(
+        self, prefix: bytes, file: File, size: int, suffix: bytes, /, *, chunk_size: int
+    ) -> None:
+        super().__init__(file, content_type="application/json")
+
+        self._prefix = prefix
+        self._suffix = suffix
+        self._chunk_size = chunk_size
+        self._content_size = _b64_size(size)
+        self._size = len(prefix) + self._content_size + len(suffix)
+        self._replayable = file.rereadable
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} file: {self._value!r}, size: {self._size}>"
+
+    @classmethod
+    async def create(
+        cls, data: Dict[str, Any], key: str, file: File, /, *, chunk_size: int = CHUNK_SIZE
+    ) -> Base64JSONPayload:
+        """The JSON object ``data`` with the base64 content of ``file`` at ``key``."""
+        if chunk_size % 3:
+            raise ValueError("The chunk size must be a multiple of 3.")
+
+        if file.in_memory:
+            size = file.size()
+        else:
+            size = await asyncio.get_running_loop().run_in_executor(None, file.size)
+
+        # The size has to be known for the Content-Length, only text file objects aren't
+        if size is None:
+            content = await file.aread_bytes()
+            file = file.__class__(content, filename=file.name)
+            size = len(content)
+
+        data = {k: v for k, v in data.items() if k != key}
+        body = json.dumps(data)
+
+        prefix = (body[:-1] + ", " if data else "{") + json.dumps(key) + ': "'
+        return cls(prefix.encode("utf-8"), file, size, b'"}', chunk_size=chunk_size)
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        if not self._replayable:
+            self._consumed = True
+
+        written = 0
+        await writer.write(self._prefix)
+
+        async for chunk in _b64_chunks(self._value.aiter_bytes(self._chunk_size)):
+            written += len(chunk)
+            await writer.write(chunk)
+
+        await writer.write(self._suffix)
+
+        # A Content-Length that doesn't match would leave the request hanging
+        if written != self._content_size:
+            raise RuntimeError(f"The file {self._value.name!r} changed size while being sent.")
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        raise TypeError("This payload is read while being sent, it can't be decoded at once.")
@@ -1,26 +1,181 @@
+from __future__ import annotations
+
 __all__ = ("File",)
 
+import asyncio
+import mmap
 import os
-from io import BytesIO, StringIO
+from io import BytesIO, StringIO, TextIOBase
 from pathlib import Path
-from typing import Union
+from typing import IO, AsyncIterator, Literal, Optional, Union, cast
+
+FileKind = Literal["text", "bytes", "buffer", "path", "text_io", "bytes_io"]
+# What each kind is kept as, in the order of FileKind
+FileContent = Union[str, bytes, memoryview, Path, TextIOBase, IO[bytes]]
 
 
 class File:
-    def __init__(self, file: Union[str, StringIO, BytesIO], /, *, filename: str) -> None:
-        self._file = file
+    """A file to upload, like one of the files of a gist.
+
+    ``file`` can be the content itself as a str or bytes, a path as a str or
+    path-like, a file object opened in text or binary mode, or a buffer like a
+    bytearray or an mmap, which isn't copied. A str is taken as a path if such
+    a file exists. What it is is detected once here, and reading from disk or
+    a file object can be done in a thread with ``aread``, ``aread_bytes`` and
+    ``aiter_bytes``, so it doesn't block the event loop.
+    """
+
+    __slots__ = ("name", "_file", "_kind")
+
+    _file: FileContent
+    _kind: FileKind
+
+    def __init__(
+        self,
+        file: Union[str, bytes, bytearray, memoryview, mmap.mmap, os.PathLike, IO[str], IO[bytes]],
+        /,
+        *,
+        filename: str,
+    ) -> None:
         self.name = filename
 
+        if isinstance(file, bytes):
+            self._file, self._kind = file, "bytes"
+        elif isinstance(file, (bytearray, memoryview, mmap.mmap)):
+            self._file, self._kind = memoryview(file).cast("B"), "buffer"
+        elif isinstance(file, os.PathLike):
+            self._file, self._kind = Path(os.fsdecode(file)), "path"
+        elif isinstance(file, str):
+            if os.path.isfile(file):
+                self._file, self._kind = Path(file), "path"
+            else:
+                self._file, self._kind = file, "text"
+        elif isinstance(file, StringIO):
+            self._file, self._kind = file.getvalue(), "text"
+        elif isinstance(file, BytesIO):
+            self._file, self._kind = file.getvalue(), "bytes"
+        elif isinstance(file, TextIOBase):
+            self._file, self._kind = file, "text_io"
+        else:
+            # Any other file object is read as binary
+            self._file, self._kind = cast("IO[bytes]", file), "bytes_io"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name: {self.name!r}, kind: {self._kind!r}>"
+
+    @property
+    def in_memory(self) -> bool:
+        """Whether reading doesn't need a thread, the content is already in memory."""
+        return self._kind in ("text", "bytes", "buffer")
+
+    @property
+    def rereadable(self) -> bool:
+        """Whether the content can be read more than once, file objects can only be read once."""
+        return self.in_memory or self._kind == "path"
+
+    def size(self) -> Optional[int]:
+        """The size of the content in bytes, None if it can't be known without reading it.
+
+        For a file object, it's the size from its current position.
+        """
+        f = self._file
+
+        if isinstance(f, (bytes, memoryview)):
+            return len(f)
+        if isinstance(f, str):
+            return len(f.encode("utf-8"))
+        if isinstance(f, Path):
+            return os.path.getsize(f)
+        if isinstance(f, TextIOBase) or not f.seekable():
+            return None
+
+        position = f.tell()
+        size = f.seek(0, os.SEEK_END) - position
+        f.seek(position)
+        return size
+
     def read(self) -> str:
+        """Reads the file as UTF-8 text, blocking. Prefer ``aread`` in coroutines."""
+        f = self._file
+
+        if isinstance(f, str):
+            return f
+        if isinstance(f, Path):
+            return f.read_text("utf-8")
+        if isinstance(f, TextIOBase):
+            return f.read()
+
+        return self.read_bytes().decode("utf-8")
+
+    def read_bytes(self) -> bytes:
+        """Reads the file as bytes, blocking. Prefer ``aread_bytes`` in coroutines."""
         f = self._file
 
-        if isinstance(f, BytesIO):
-            return f.read().decode("utf-8")
+        if isinstance(f, bytes):
+            return f
+        if isinstance(f, memoryview):
+            return f.tobytes()
+        if isinstance(f, Path):
+            return f.read_bytes()
+        if isinstance(f, (str, TextIOBase)):
+            return self.read().encode("utf-8")
+
+        return f.read()
+
+    async def aread(self) -> str:
+        if isinstance(self._file, str):
+            return self._file
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.read)
+
+    async def aread_bytes(self) -> bytes:
+        if isinstance(self._file, bytes):
+            return self._file
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.read_bytes)
+
+    async def aiter_bytes(self, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Yields the content in chunks of up to ``chunk_size`` bytes.
+
+        Files on disk and file objects are read a chunk at a time in a thread,
+        and content in memory is copied a chunk at a time, so uploading a big
+        file doesn't need it whole in memory twice. Text is encoded a chunk at a time.
+        """
+        f = self._file
+
+        if isinstance(f, (bytes, memoryview)):
+            view = memoryview(f)
+
+            for start in range(0, len(view), chunk_size):
+                yield view[start : start + chunk_size].tobytes()
+
+            return
+
+        loop = asyncio.get_running_loop()
+
+        if isinstance(f, (str, TextIOBase)):
+            # A character is at most 4 bytes in UTF-8, so no chunk is bigger than chunk_size
+            chars = max(1, chunk_size // 4)
+
+            if isinstance(f, str):
+                for start in range(0, len(f), chars):
+                    yield f[start : start + chars].encode("utf-8")
+            else:
+                while text := await loop.run_in_executor(None, f.read, chars):
+                    yield text.encode("utf-8")
+
+            return
 
-        if isinstance(f, StringIO):
-            return f.getvalue()
+        file: IO[bytes]
 
-        if os.path.exists(f):
-            return Path(f).read_text()
+        if isinstance(f, Path):
+            file = await loop.run_in_executor(None, f.open, "rb")
+        else:
+            file = f
 
-        return f
+        try:
+            while chunk := await loop.run_in_executor(None, file.read, chunk_size):
+                yield chunk
+        finally:
+            if file is not f:
+                await loop.run_in_executor(None, file.close)
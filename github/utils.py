@@ -5,14 +5,34 @@ __all__ = (
     "str_to_datetime",
     "repr_dt",
     "bytes_to_b64",
+    "build_params",
+    "gather_or_cancel",
+    "is_sha",
 )
 
+import asyncio
+import re
 from base64 import b64encode
-from typing import TYPE_CHECKING, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 if TYPE_CHECKING:
     from datetime import datetime, timedelta
 
+T = TypeVar("T")
+
+_SHA = re.compile(r"[0-9a-f]{40}")
+
 
 def human_readable_time_until(td: timedelta, /) -> str:
     seconds = int(td.total_seconds())
@@ -30,5 +50,36 @@ def repr_dt(time: datetime, /) -> str:
     return time.strftime(r"%d-%m-%Y, %H:%M:%S")
 
 
-def bytes_to_b64(content: str, /) -> str:
-    return b64encode(content.encode("utf-8")).decode("ascii")
+def bytes_to_b64(content: Union[str, bytes, bytearray, memoryview], /) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    return b64encode(content).decode("ascii")
+
+
+def build_params(
+    required: Dict[str, Any], names: Tuple[str, ...], values: Tuple[Any, ...], /
+) -> Dict[str, Any]:
+    # Like the hand-written routes, optional values are only sent if they're truthy
+    params = dict(required)
+    params.update((name, value) for name, value in zip(names, values) if value)
+    return params
+
+
+async def gather_or_cancel(coros: Iterable[Awaitable[T]], /) -> List[T]:
+    # Unlike gather, nothing is left running when one fails
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def is_sha(ref: str, /) -> bool:
+    # Whether the ref is a full commit SHA, rather than a branch or tag name
+    return _SHA.fullmatch(ref) is not None
@@ -0,0 +1,131 @@
+"""Syncs a 10k file directory to a stand-in repository, against uploading every file.
+
+A hundred files are changed, fifty added and fifty removed after the
+repository was seeded with the directory. Run with ``python -m tools.benchmarks.dirsync``.
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from github import File, HTTPClient
+from github.ext.commit import commit_files
+from github.ext.dirsync import _hash_file, _walk, hash_directory, sync_directory
+
+from . import git_server, server
+
+DIRECTORIES = 100
+FILES_PER_DIRECTORY = 100
+CHANGED = 100
+ADDED = 50
+REMOVED = 50
+
+
+def generate(root: Path) -> None:
+    rng = random.Random(0)
+
+    for d in range(DIRECTORIES):
+        directory = root / f"section-{d:03}"
+        directory.mkdir()
+
+        for f in range(FILES_PER_DIRECTORY):
+            # Mostly small pages, a few big assets
+            size = rng.choice((1024 * 1024,)) if rng.random() < 0.002 else rng.randint(200, 8000)
+            (directory / f"page-{f:03}.html").write_bytes(rng.randbytes(size))
+
+
+def seed(repository: git_server.Repository, root: Path) -> None:
+    blobs = {}
+
+    for name, path in _walk(str(root)):
+        blobs[name] = "100644", repository.add_blob(Path(path).read_bytes())
+
+    repository.refs["heads/main"] = repository.add_commit(repository.build(blobs), [], "seed")
+
+
+def edit(root: Path) -> None:
+    rng = random.Random(1)
+    files = sorted(root.rglob("*.html"))
+
+    for path in rng.sample(files, CHANGED + REMOVED)[:CHANGED]:
+        path.write_bytes(rng.randbytes(rng.randint(200, 8000)))
+    for path in rng.sample(files, REMOVED):
+        path.unlink(missing_ok=True)
+    for i in range(ADDED):
+        (root / "section-new").mkdir(exist_ok=True)
+        (root / "section-new" / f"page-{i:03}.html").write_bytes(rng.randbytes(2000))
+
+
+def requests(repository: git_server.Repository) -> int:
+    amount = sum(repository.counts.values())
+    repository.counts.clear()
+    return amount
+
+
+async def main() -> None:
+    root = Path(tempfile.mkdtemp())
+    generate(root)
+
+    repository = git_server.Repository()
+    seed(repository, root)
+    edit(root)
+
+    runner = await git_server.start(repository)
+
+    try:
+        files = _walk(str(root))
+        print(f"{len(files)} files, {sum(os.path.getsize(p) for _, p in files) / 2**20:.0f} MiB")
+
+        start = time.perf_counter()
+        for _, path in files:
+            _hash_file(path)
+        print(f"{'hashing, one thread':<32} {time.perf_counter() - start:>8.2f} s")
+
+        start = time.perf_counter()
+        await hash_directory(root)
+        print(f"{'hashing, hash_directory':<32} {time.perf_counter() - start:>8.2f} s")
+
+        async with HTTPClient(base_url=server.BASE_URL) as client:
+            start = time.perf_counter()
+            result = await sync_directory(
+                client, root, owner="o", repo="r", branch="main", message="sync"
+            )
+            print(
+                f"{'sync_directory':<32} {time.perf_counter() - start:>8.2f} s"
+                f" {requests(repository):>6} requests, {len(result.uploaded)} uploaded,"
+                f" {len(result.changed)} changed, {len(result.deleted)} deleted"
+            )
+
+            start = time.perf_counter()
+            result = await sync_directory(
+                client, root, owner="o", repo="r", branch="main", message="sync"
+            )
+            print(
+                f"{'sync_directory, no changes':<32} {time.perf_counter() - start:>8.2f} s"
+                f" {requests(repository):>6} requests, commit: {result.commit}"
+            )
+
+            start = time.perf_counter()
+            await commit_files(
+                client,
+                owner="o",
+                repo="r",
+                branch="main",
+                message="upload everything",
+                files={name: File(Path(path), filename=name) for name, path in files},
+            )
+            print(
+                f"{'commit_files, every file':<32} {time.perf_counter() - start:>8.2f} s"
+                f" {requests(repository):>6} requests"
+            )
+    finally:
+        await runner.cleanup()
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,203 @@
+"""A local stand-in for the Git database API of one repository, for the benchmarks.
+
+Blobs and trees are stored like git does, with nested trees, so SHAs of blobs
+match what git computes. Requests are counted per route in ``Repository.counts``.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from aiohttp import web
+
+from . import server
+
+# name -> (mode, type, sha)
+Tree = Dict[str, Tuple[str, str, str]]
+
+
+def blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class Repository:
+    def __init__(self, *, truncate_after: Optional[int] = None) -> None:
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Tree] = {}
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.refs: Dict[str, str] = {}
+        self.counts: Counter = Counter()
+        # Recursive trees with more entries than this are truncated, like GitHub does
+        self.truncate_after = truncate_after
+
+    def add_blob(self, data: bytes) -> str:
+        sha = blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def add_tree(self, tree: Tree) -> str:
+        sha = hashlib.sha1(json.dumps(sorted(tree.items())).encode()).hexdigest()
+        self.trees[sha] = tree
+        return sha
+
+    def flatten(self, sha: str, prefix: str = "") -> Dict[str, Tuple[str, str]]:
+        # path -> (mode, sha) of every blob
+        blobs = {}
+
+        for name, (mode, kind, entry_sha) in self.trees[sha].items():
+            if kind == "tree":
+                blobs.update(self.flatten(entry_sha, prefix + name + "/"))
+            else:
+                blobs[prefix + name] = mode, entry_sha
+
+        return blobs
+
+    def build(self, blobs: Dict[str, Tuple[str, str]]) -> str:
+        # The nested trees of flat paths, returns the root tree SHA
+        root: Dict[str, Any] = {}
+
+        for path, entry in blobs.items():
+            *parents, name = path.split("/")
+            node = root
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[name] = entry
+
+        def store(node: Dict[str, Any]) -> str:
+            tree: Tree = {}
+            for name, value in node.items():
+                if isinstance(value, dict):
+                    tree[name] = ("040000", "tree", store(value))
+                else:
+                    tree[name] = (value[0], "blob", value[1])
+            return self.add_tree(tree)
+
+        return store(root)
+
+    def add_commit(self, tree: str, parents: list, message: str = "") -> str:
+        data = {"tree": {"sha": tree}, "parents": [{"sha": p} for p in parents]}
+        sha = hashlib.sha1(json.dumps([data, message, len(self.commits)]).encode()).hexdigest()
+        self.commits[sha] = {"sha": sha, "message": message, **data}
+        return sha
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=1024**3)
+        prefix = "/repos/{owner}/{repo}/git"
+
+        app.router.add_post(prefix + "/blobs", self.create_blob)
+        app.router.add_get(prefix + "/blobs/{sha}", self.get_blob)
+        app.router.add_post(prefix + "/trees", self.create_tree)
+        app.router.add_get(prefix + "/trees/{sha}", self.get_tree)
+        app.router.add_post(prefix + "/commits", self.create_commit)
+        app.router.add_get(prefix + "/commits/{sha}", self.get_commit)
+        app.router.add_get(prefix + "/ref/{ref:.+}", self.get_ref)
+        app.router.add_patch(prefix + "/refs/{ref:.+}", self.update_ref)
+        app.router.add_get("/repos/{owner}/{repo}/commits/{ref:.+}", self.get_commit_sha)
+
+        @web.middleware
+        async def count(request: web.Request, handler: Any) -> web.StreamResponse:
+            self.counts[f"{request.method} {request.match_info.route.resource.canonical}"] += 1
+            return await handler(request)
+
+        app.middlewares.append(count)
+        return app
+
+    async def create_blob(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        content = data["content"]
+        raw = base64.b64decode(content) if data["encoding"] == "base64" else content.encode()
+        return web.json_response({"sha": self.add_blob(raw)}, status=201)
+
+    async def get_blob(self, request: web.Request) -> web.Response:
+        if (data := self.blobs.get(request.match_info["sha"])) is None:
+            return web.json_response({"message": "Not Found"}, status=404)
+
+        if request.headers.get("Accept") == "application/vnd.github.raw":
+            return web.Response(body=data, content_type="application/vnd.github.raw")
+
+        return web.json_response(
+            {
+                "sha": request.match_info["sha"],
+                "size": len(data),
+                "encoding": "base64",
+                "content": base64.encodebytes(data).decode("ascii"),
+            }
+        )
+
+    async def create_tree(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        blobs = self.flatten(data["base_tree"]) if "base_tree" in data else {}
+
+        for entry in data["tree"]:
+            if entry["sha"] is None:
+                if blobs.pop(entry["path"], None) is None:
+                    return web.json_response({"message": "GitRPC::BadObjectState"}, status=422)
+            else:
+                blobs[entry["path"]] = entry["mode"], entry["sha"]
+
+        return web.json_response({"sha": self.build(blobs)}, status=201)
+
+    async def get_tree(self, request: web.Request) -> web.Response:
+        sha = request.match_info["sha"]
+        entries = []
+
+        def add(tree_sha: str, prefix: str, recursive: bool) -> None:
+            for name, (mode, kind, entry_sha) in self.trees[tree_sha].items():
+                entry = {"path": prefix + name, "mode": mode, "type": kind, "sha": entry_sha}
+                if kind == "blob":
+                    entry["size"] = len(self.blobs.get(entry_sha, b""))
+                entries.append(entry)
+
+                if kind == "tree" and recursive:
+                    add(entry_sha, prefix + name + "/", recursive)
+
+        recursive = "recursive" in request.query
+        add(sha, "", recursive)
+
+        truncated = recursive and self.truncate_after is not None
+        truncated = truncated and len(entries) > self.truncate_after  # type: ignore
+        if truncated:
+            del entries[self.truncate_after :]
+
+        return web.json_response({"sha": sha, "tree": entries, "truncated": truncated})
+
+    async def create_commit(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        sha = self.add_commit(data["tree"], data.get("parents", []), data["message"])
+        return web.json_response(self.commits[sha], status=201)
+
+    async def get_commit(self, request: web.Request) -> web.Response:
+        return web.json_response(self.commits[request.match_info["sha"]])
+
+    async def get_commit_sha(self, request: web.Request) -> web.Response:
+        # Only what HTTPClient.get_commit_sha asks for, with the sha media type
+        ref = request.match_info["ref"]
+        sha = self.refs.get(f"heads/{ref}", ref)
+
+        if sha not in self.commits:
+            return web.json_response({"message": "No commit found"}, status=422)
+
+        return web.Response(text=sha, content_type="application/vnd.github.sha")
+
+    async def get_ref(self, request: web.Request) -> web.Response:
+        ref = request.match_info["ref"]
+        return web.json_response({"ref": f"refs/{ref}", "object": {"sha": self.refs[ref]}})
+
+    async def update_ref(self, request: web.Request) -> web.Response:
+        ref = request.match_info["ref"]
+        data = await request.json()
+        parents = [p["sha"] for p in self.commits[data["sha"]]["parents"]]
+
+        if not data.get("force") and self.refs[ref] not in parents:
+            return web.json_response({"message": "Update is not a fast forward"}, status=422)
+
+        self.refs[ref] = data["sha"]
+        return web.json_response({"ref": f"refs/{ref}", "object": {"sha": data["sha"]}})
+
+
+async def start(repository: Repository, *, port: int = server.PORT) -> web.AppRunner:
+    return await server.start(port=port, app=repository.app())
@@ -0,0 +1,85 @@
+"""Compares request throughput and latency on the default event loop and uvloop.
+
+The stand-in server runs in its own process, so both loops are measured against
+the same server. Run with ``python -m tools.benchmarks.loop``.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from typing import List, Tuple
+
+from github import HTTPClient, Route, has_fast_loop, run
+
+from . import server
+
+REQUESTS = 5_000
+CONCURRENCY = 50
+
+
+def serve(ready) -> None:
+    async def main() -> None:
+        await server.start()
+        ready.set()
+
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def measure() -> Tuple[float, List[float]]:
+    route = Route("GET", "/user")
+    latencies: List[float] = []
+
+    async with HTTPClient(base_url=server.BASE_URL) as client:
+        # Warm up the connection pool
+        await asyncio.gather(*(client.request(route) for _ in range(CONCURRENCY)))
+
+        async def worker(amount: int) -> None:
+            for _ in range(amount):
+                start = time.perf_counter()
+                await client.request(route)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(REQUESTS // CONCURRENCY) for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+
+    return elapsed, latencies
+
+
+def percentile(values: List[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(percent / 100 * len(values)))]
+
+
+def main() -> None:
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(ready,), daemon=True)
+    process.start()
+    ready.wait()
+
+    loops = [("asyncio", False)]
+    if has_fast_loop():
+        loops.append(("uvloop", True))
+    else:
+        print("uvloop isn't installed, only the default loop is measured\n")
+
+    print(f"{REQUESTS} requests, {CONCURRENCY} at once\n")
+    print(f"{'loop':<10} {'requests/s':>12} {'p50':>10} {'p99':>10}")
+
+    try:
+        for name, fast in loops:
+            elapsed, latencies = run(measure(), fast=fast)
+
+            print(
+                f"{name:<10} {len(latencies) / elapsed:>12.0f}"
+                f" {percentile(latencies, 50) * 1000:>7.2f} ms"
+                f" {percentile(latencies, 99) * 1000:>7.2f} ms"
+            )
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measures what the middleware chain adds to HTTPClient.request.
+
+Run with ``python -m tools.benchmarks.middleware``.
+"""
+
+import asyncio
+import time
+
+from github import HTTPClient, Middleware, Route
+
+from . import server
+
+NUMBER = 200_000
+REQUESTS = 2_000
+
+
+class Noop(Middleware):
+    async def before_send(self, ctx):
+        pass
+
+    async def after_receive(self, ctx):
+        pass
+
+
+async def send(route, kwargs, ctx, body_type):
+    return None
+
+
+async def baseline() -> float:
+    # Awaiting the send coroutine directly, what a request costs without any chain
+    route = Route("GET", "/user")
+    kwargs = {}
+
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        await send(route, kwargs, None, "decoded")
+
+    return (time.perf_counter() - start) / NUMBER
+
+
+async def dispatch(client: HTTPClient) -> float:
+    # Sending is replaced with a coroutine that does nothing, so only the dispatch is measured
+    client._HTTPClient__send = send  # type: ignore
+    route = Route("GET", "/user")
+
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        await client.request(route)
+
+    return (time.perf_counter() - start) / NUMBER
+
+
+async def roundtrip(client: HTTPClient) -> float:
+    route = Route("GET", "/user")
+
+    # Warm up the connection pool
+    for _ in range(REQUESTS // 10):
+        await client.request(route)
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await client.request(route)
+
+    return (time.perf_counter() - start) / REQUESTS
+
+
+async def main() -> None:
+    runner = await server.start()
+
+    print(f"{'middlewares':<12} {'dispatch':>12} {'stand-in roundtrip':>20}")
+    print(f"{'direct':<12} {await baseline() * 1e9:>9.0f} ns {'':>20}")
+
+    for amount in (0, 1, 5):
+        async with HTTPClient(base_url=server.BASE_URL) as client:
+            for _ in range(amount):
+                client.add_middleware(Noop())
+
+            per_roundtrip = await roundtrip(client)
+            per_dispatch = await dispatch(client)
+
+        print(f"{amount:<12} {per_dispatch * 1e9:>9.0f} ns {per_roundtrip * 1e6:>17.1f} us")
+
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
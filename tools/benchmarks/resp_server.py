@@ -0,0 +1,251 @@
+"""A local stand-in for a Redis server, for the crawl queue.
+
+It keeps everything in memory and only knows the commands RESPBackend uses. Scripts
+are only run if they are like the ones RESPBackend sends, a checked call and then calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+HOST = "127.0.0.1"
+PORT = 6390
+
+
+_CHECK = re.compile(r"if redis\.call\((.*)\) ~= (.*) then return 0 end")
+_CALL = re.compile(r"redis\.call\((.*)\)")
+_VARIABLE = re.compile(r"(KEYS|ARGV)\[(\d+)\]")
+
+
+class ZSet(dict):
+    pass
+
+
+class Status(str):
+    """A simple string reply, like OK."""
+
+
+class Store:
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+        # key -> time.monotonic() it expires at
+        self.expires: Dict[str, float] = {}
+
+    def get(self, key: str, kind: type) -> Any:
+        if (expires := self.expires.get(key)) is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            del self.expires[key]
+
+        if (value := self.data.get(key)) is None:
+            return None
+        if not isinstance(value, kind):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+
+        return value
+
+    def create(self, key: str, kind: type) -> Any:
+        if (value := self.get(key, kind)) is None:
+            value = self.data[key] = kind()
+
+        return value
+
+    def eval(self, script: str, keys: List[str], argv: List[str]) -> Any:
+        lines = script.splitlines()
+
+        if len(lines) < 2 or (check := _CHECK.fullmatch(lines[0])) is None:
+            raise ValueError("ERR this stand-in can't run this script")
+        if lines[-1] != "return 1":
+            raise ValueError("ERR this stand-in can't run this script")
+
+        def value(token: str) -> Any:
+            if match := _VARIABLE.fullmatch(token.strip()):
+                return (keys if match[1] == "KEYS" else argv)[int(match[2]) - 1]
+
+            return json.loads(token)
+
+        def call(arguments: str) -> Any:
+            command, *args = (value(token) for token in arguments.split(","))
+            return self.execute(command, args)
+
+        # Nothing else runs in between, like in Redis
+        if call(check[1]) != value(check[2]):
+            return 0
+
+        for line in lines[1:-1]:
+            if (match := _CALL.fullmatch(line)) is None:
+                raise ValueError("ERR this stand-in can't run this script")
+
+            call(match[1])
+
+        return 1
+
+    def execute(self, command: str, args: List[str]) -> Any:
+        command = command.upper()
+
+        if command == "PING":
+            return Status("PONG")
+        if command in ("SELECT", "AUTH"):
+            return Status("OK")
+        if command == "FLUSHDB":
+            self.data.clear()
+            self.expires.clear()
+            return Status("OK")
+        if command == "KEYS":
+            return [key for key in list(self.data) if fnmatch.fnmatchcase(key, args[0])]
+        if command == "DEL":
+            return sum(self.data.pop(key, None) is not None for key in args)
+        if command == "PEXPIRE":
+            if self.get(args[0], object) is None:
+                return 0
+
+            self.expires[args[0]] = time.monotonic() + int(args[1]) / 1000
+            return 1
+        if command == "EVAL":
+            count = int(args[1])
+            return self.eval(args[0], args[2 : 2 + count], args[2 + count :])
+
+        if command == "GET":
+            return self.get(args[0], str)
+        if command == "SET":
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            exists = self.get(key, object) is not None
+
+            if ("NX" in options and exists) or ("XX" in options and not exists):
+                return None
+
+            self.data[key] = value
+            self.expires.pop(key, None)
+
+            if "PX" in options:
+                self.expires[key] = time.monotonic() + int(args[2 + options.index("PX") + 1]) / 1000
+
+            return Status("OK")
+
+        if command == "SADD":
+            members: Set[str] = self.create(args[0], set)
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            return added
+        if command == "SISMEMBER":
+            return int(args[1] in (self.get(args[0], set) or ()))
+        if command == "SCARD":
+            return len(self.get(args[0], set) or ())
+
+        if command == "HSET":
+            fields: Dict[str, str] = self.create(args[0], dict)
+            pairs = list(zip(args[1::2], args[2::2]))
+            added = sum(field not in fields for field, _ in pairs)
+            fields.update(pairs)
+            return added
+        if command == "HGET":
+            return (self.get(args[0], dict) or {}).get(args[1])
+        if command == "HDEL":
+            fields = self.get(args[0], dict) or {}
+            return sum(fields.pop(field, None) is not None for field in args[1:])
+        if command == "HINCRBY":
+            fields = self.create(args[0], dict)
+            fields[args[1]] = str(int(fields.get(args[1], 0)) + int(args[2]))
+            return int(fields[args[1]])
+        if command == "HLEN":
+            return len(self.get(args[0], dict) or ())
+
+        if command == "ZADD":
+            scores: Dict[str, float] = self.create(args[0], ZSet)
+            rest = args[1:]
+            flags = set()
+
+            while rest and rest[0].upper() in ("NX", "XX"):
+                flags.add(rest.pop(0).upper())
+
+            added = 0
+            for score, member in zip(rest[::2], rest[1::2]):
+                exists = member in scores
+
+                if ("NX" in flags and exists) or ("XX" in flags and not exists):
+                    continue
+
+                added += not exists
+                scores[member] = float(score)
+
+            return added
+        if command == "ZREM":
+            scores = self.get(args[0], ZSet) or {}
+            return sum(scores.pop(member, None) is not None for member in args[1:])
+        if command == "ZCARD":
+            return len(self.get(args[0], ZSet) or ())
+        if command == "ZRANGEBYSCORE":
+            scores = self.get(args[0], ZSet) or {}
+            low, high = (float(bound) for bound in args[1:3])
+            ordered: List[Tuple[float, str]] = sorted(
+                (score, member) for member, score in scores.items() if low <= score <= high
+            )
+            members_in_range = [member for _, member in ordered]
+
+            if len(args) > 3 and args[3].upper() == "LIMIT":
+                offset, count = int(args[4]), int(args[5])
+                members_in_range = members_in_range[offset : offset + count]
+
+            return members_in_range
+
+        raise ValueError(f"ERR unknown command '{command}'")
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    if isinstance(value, Status):
+        return b"+%s\r\n" % value.encode()
+
+    data = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[str]]:
+    if not (line := await reader.readline()):
+        return None
+
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2].decode())
+
+    return args
+
+
+def serve(store: Store):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while (args := await read_command(reader)) is not None:
+                try:
+                    reply = encode(store.execute(args[0], args[1:]))
+                except (TypeError, ValueError) as error:
+                    reply = f"-{error}\r\n".encode()
+
+                writer.write(reply)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def start(*, port: int = PORT, store: Optional[Store] = None) -> asyncio.AbstractServer:
+    return await asyncio.start_server(serve(store or Store()), HOST, port)
+
+
+if __name__ == "__main__":
+
+    async def main() -> None:
+        async with await start() as server:
+            await server.serve_forever()
+
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+"""Measures how long preparing the URL of a request takes.
+
+Run with ``python -m tools.benchmarks.route``.
+"""
+
+from timeit import repeat
+
+from yarl import URL
+
+from github.internals.route import Route
+
+NUMBER = 100_000
+# The best of a few runs, so other processes don't skew the numbers
+REPEAT = 5
+REPOS = [(f"owner{i % 100}", f"repo{i}") for i in range(10_000)]
+
+
+def fstring(owner: str, repo: str) -> URL:
+    # What was done before, aiohttp parses and quotes the string into an URL
+    return URL(f"https://api.github.com{f'/repos/{owner}/{repo}/contributors'}")
+
+
+def route(owner: str, repo: str) -> URL:
+    return Route("GET", "/repos/{owner}/{repo}/contributors", owner=owner, repo=repo).url
+
+
+def main() -> None:
+    print(f"{'':<10} {'same repo':>14} {'10k repos':>14}")
+
+    for name, prepare in (("f-string", fstring), ("Route", route)):
+        same = min(repeat(lambda: prepare("owner", "repo"), number=NUMBER, repeat=REPEAT))
+
+        repos = iter(REPOS * (NUMBER // len(REPOS) * REPEAT))
+        cycled = min(repeat(lambda: prepare(*next(repos)), number=NUMBER, repeat=REPEAT))
+
+        print(f"{name:<10} {same / NUMBER * 1e9:>11.0f} ns {cycled / NUMBER * 1e9:>11.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""A local stand-in for the GitHub API, for the benchmarks.
+
+It answers every request with a small JSON body and the ratelimit headers GitHub sends.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+BODY: Dict[str, Any] = {"login": "octocat", "id": 1, "type": "User", "site_admin": False}
+
+
+async def handler(request: web.Request) -> web.Response:
+    return web.json_response(
+        BODY,
+        headers={
+            "X-RateLimit-Remaining": "4999",
+            "X-RateLimit-Used": "1",
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+            "X-RateLimit-Resource": "core",
+            "X-GitHub-Request-Id": "0000:0000:0000000:0000000:00000000",
+        },
+    )
+
+
+async def start(*, port: int = PORT, app: Optional[web.Application] = None) -> web.AppRunner:
+    if app is None:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, port).start()
+
+    return runner
+
+
+BASE_URL = f"http://{HOST}:{PORT}"
@@ -1,13 +1,15 @@
+import ast
 import json
 import os
 import time
 from argparse import ArgumentParser
 
 from .parser import generate
+from .routes import generate_routes
 
 # fmt: off
 parser = ArgumentParser(
-    description="Generate TypedDicts from a json schema."
+    description="Generate TypedDicts from a json schema, or routes from an OpenAPI description."
 )
 parser.add_argument(
     "-f",
@@ -38,6 +40,31 @@ parser.add_argument(
     action="store_true",
     help="If given, the result will be printed.",
 )
+parser.add_argument(
+    "-r",
+    "--routes",
+    action="store_true",
+    help="If given, the source is treated as an OpenAPI description and routes are generated.",
+)
+parser.add_argument(
+    "--tags",
+    nargs="+",
+    help="The OpenAPI tags (route groups) to generate routes for, all of them if not given.",
+)
+parser.add_argument(
+    "--class-name",
+    default="GeneratedRoutes",
+    help="The name of the generated route mixin class.",
+)
+parser.add_argument(
+    "--exclude-from",
+    help="A Python file whose method names wont be generated again, e.g. the hand-written routes.",
+)
+parser.add_argument(
+    "--strict",
+    action="store_true",
+    help="If given, operations without a unique method name are an error instead of a warning.",
+)
 # fmt: on
 
 args = parser.parse_args()
@@ -45,8 +72,22 @@ args = parser.parse_args()
 with open(args.__getattribute__("from")) as f:
     schema = json.load(f)
 
+exclude = []
+if args.exclude_from:
+    with open(args.exclude_from) as f:
+        exclude = [
+            node.name
+            for node in ast.walk(ast.parse(f.read()))
+            if isinstance(node, ast.AsyncFunctionDef)
+        ]
+
 start = time.perf_counter()
-generated = generate(schema, no_comments=args.no_comments)
+if args.routes:
+    generated = generate_routes(
+        schema, tags=args.tags, exclude=exclude, class_name=args.class_name, strict=args.strict
+    )
+else:
+    generated = generate(schema, no_comments=args.no_comments)
 end = time.perf_counter() - start
 
 if args.print:
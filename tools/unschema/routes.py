@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+__all__ = ("generate_routes", "route_name")
+
+import keyword
+import re
+import warnings
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+METHODS = ("get", "post", "put", "patch", "delete")
+
+# The STYLE GUIDE in github/internals/http.py, as data
+SHORTENED = {
+    "information": "info",
+    "organization": "org",
+    "organizations": "orgs",
+    "repository": "repo",
+    "repositories": "repos",
+}
+DROPPED = {"a", "an", "the"}
+
+types = {
+    "string": "str",
+    "number": "float",
+    "integer": "int",
+    "boolean": "bool",
+    "object": "Dict[str, Any]",
+    "array": "List[Any]",
+}
+
+
+def route_name(summary: str, /) -> str:
+    """Makes a route method name from an operation summary.
+
+    Arguments:
+        summary: The summary of the operation, e.g. "Get a repository".
+
+    Returns:
+        The method name, e.g. "get_repo".
+    """
+    words = re.findall(r"[a-z0-9]+", summary.lower())
+    return "_".join(SHORTENED.get(word, word) for word in words if word not in DROPPED)
+
+
+def _identifier(name: str, /) -> str:
+    name = re.sub(r"\W", "_", name)
+    return f"{name}_" if keyword.iskeyword(name) else name
+
+
+def _resolve(spec: dict, obj: dict, /) -> dict:
+    while "$ref" in obj:
+        target: Any = spec
+        for part in obj["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        obj = target
+    return obj
+
+
+def _annotation(spec: dict, schema: dict, /) -> str:
+    schema = _resolve(spec, schema)
+
+    if enum := schema.get("enum"):
+        return f"Literal[{', '.join(repr(value) for value in enum if value is not None)}]"
+
+    schema_type = schema.get("type")
+
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), None)
+
+    if schema_type == "array" and (items := schema.get("items")):
+        return f"List[{_annotation(spec, items)}]"
+
+    return types.get(schema_type, "Any")  # type: ignore
+
+
+class _Parameter:
+    __slots__ = ("name", "identifier", "annotation", "required")
+
+    def __init__(self, name: str, annotation: str, required: bool) -> None:
+        self.name = name
+        self.identifier = _identifier(name)
+        self.annotation = annotation
+        self.required = required
+
+    def signature(self) -> str:
+        if self.required:
+            return f"{self.identifier}: {self.annotation}"
+
+        return f"{self.identifier}: Optional[{self.annotation}] = None"
+
+
+def _table(parameters: List[_Parameter], /) -> str:
+    required = ", ".join(f'"{p.name}": {p.identifier}' for p in parameters if p.required)
+    optional = [p for p in parameters if not p.required]
+
+    if not optional:
+        return f"{{{required}}}"
+
+    names = ", ".join(f'"{p.name}"' for p in optional)
+    values = ", ".join(p.identifier for p in optional)
+
+    # A one element tuple needs the trailing comma
+    if len(optional) == 1:
+        names += ","
+        values += ","
+
+    return f"build_params({{{required}}}, ({names}), ({values}))"
+
+
+def _method(
+    spec: dict, path: str, method: str, operation: dict, /, *, name: Optional[str] = None
+) -> Tuple[str, str]:
+    name = name or route_name(operation["summary"])
+
+    path_params: List[_Parameter] = []
+    query_params: List[_Parameter] = []
+
+    for parameter in operation.get("parameters", []):
+        parameter = _resolve(spec, parameter)
+        target = {"path": path_params, "query": query_params}.get(parameter["in"])
+
+        if target is not None:
+            target.append(
+                _Parameter(
+                    parameter["name"],
+                    _annotation(spec, parameter.get("schema", {})),
+                    parameter["in"] == "path" or parameter.get("required", False),
+                )
+            )
+
+    body_params: List[_Parameter] = []
+
+    content = _resolve(spec, operation.get("requestBody", {})).get("content", {})
+    if body := content.get("application/json"):
+        schema = _resolve(spec, body.get("schema", {}))
+        required = schema.get("required", [])
+
+        for key, value in schema.get("properties", {}).items():
+            body_params.append(_Parameter(key, _annotation(spec, value), key in required))
+
+    # Required keyword arguments first, the same order the docs use otherwise
+    arguments = sorted(path_params + query_params + body_params, key=lambda p: not p.required)
+
+    if arguments:
+        lines = [f"    async def {name}(", "        self,", "        *,"]
+        lines.extend(f"        {argument.signature()}," for argument in arguments)
+        lines.append("    ):")
+    else:
+        lines = [f"    async def {name}(self):"]
+
+    template = path
+    for parameter in path_params:
+        template = template.replace(f"{{{parameter.name}}}", f"{{{parameter.identifier}}}")
+
+    values = "".join(f", {p.identifier}={p.identifier}" for p in path_params)
+
+    call = [f'Route("{method.upper()}", "{template}"{values})']
+
+    if query_params:
+        call.append(f"params={_table(query_params)}")
+    if body_params:
+        call.append(f"json={_table(body_params)}")
+
+    lines.append(f"        return await self.request({', '.join(call)})")
+
+    return name, "\n".join(lines)
+
+
+text = """from __future__ import annotations
+
+__all__ = ("{class_name}",)
+
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
+
+from ..utils import build_params
+from .route import Route
+
+
+class {class_name}:
+    if TYPE_CHECKING:
+
+        async def request(self, route: Route, /, **kwargs: Any) -> Any:
+            ...
+
+{methods}
+"""
+
+
+def generate_routes(
+    spec: dict,
+    /,
+    *,
+    tags: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    class_name: str = "GeneratedRoutes",
+    strict: bool = False,
+) -> str:
+    """Makes a route mixin from an OpenAPI description.
+
+    Arguments:
+        spec: The OpenAPI description dict.
+        tags: If given, only operations with these tags are generated.
+        exclude: Method names that should not be generated, e.g. hand-written ones.
+        class_name: The name of the generated mixin class.
+        strict: If True, raise ValueError instead of warning about dropped operations.
+
+    Returns:
+        The source of the module containing the mixin.
+    """
+    wanted = set(tags) if tags is not None else None
+    hand_written = set(exclude or ())
+    seen: Set[str] = set()
+    dropped: List[str] = []
+
+    sections: Dict[str, List[str]] = {}
+
+    for path, item in spec["paths"].items():
+        for method in METHODS:
+            if not (operation := item.get(method)):
+                continue
+
+            tag = (operation.get("tags") or ["misc"])[0]
+            if wanted is not None and tag not in wanted:
+                continue
+
+            name, source = _method(spec, path, method, operation)
+
+            # The first operation with the name of a hand-written route is that route
+            if name in hand_written and name not in seen:
+                seen.add(name)
+                continue
+
+            # Summaries aren't unique, the operationId is
+            if name in seen:
+                operation_id = operation.get("operationId")
+                name = route_name(operation_id) if operation_id else name
+
+                if name in seen or name in hand_written:
+                    dropped.append(f"{method.upper()} {path}")
+                    continue
+
+                name, source = _method(spec, path, method, operation, name=name)
+
+            seen.add(name)
+            sections.setdefault(tag, []).append(source)
+
+    if dropped:
+        message = f"No unique method name for these operations: {', '.join(dropped)}."
+
+        if strict:
+            raise ValueError(message)
+
+        warnings.warn(message)
+
+    methods = "\n\n".join(
+        f"    # === {tag.upper().replace('-', ' ')} === #\n\n" + "\n\n".join(sources)
+        for tag, sources in sections.items()
+    )
+
+    return text.format(class_name=class_name, methods=methods)